@@ -55,6 +55,9 @@ setup(name=__meta__.__name__,
       entry_points={
           "paste.app_factory": [
               "main = {}:main".format(__meta__.__name__)
+          ],
+          "console_scripts": [
+              "weaver = {}.cli:main".format(__meta__.__name__)
           ]
       }
       )
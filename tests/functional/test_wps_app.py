@@ -9,6 +9,7 @@ Based on tests from:
 import contextlib
 import unittest
 
+import mock
 import pyramid.testing
 import pytest
 import xmltodict
@@ -23,6 +24,7 @@ from tests.utils import (
     setup_config_with_pywps,
     setup_mongodb_processstore
 )
+from weaver.datatype import Process
 from weaver.formats import CONTENT_TYPE_ANY_XML, CONTENT_TYPE_APP_XML
 from weaver.processes.wps_default import HelloWPS
 from weaver.processes.wps_testing import WpsTestProcess
@@ -157,3 +159,27 @@ class WpsAppTest(unittest.TestCase):
         resp.mustcontain("<Exception exceptionCode=\"AccessForbidden\" locator=\"service\">")
         err_desc = "Process with ID '{}' is not accessible.".format(self.process_private.identifier)
         resp.mustcontain("<ExceptionText>{}</ExceptionText>".format(err_desc))
+
+    def test_processes_created_on_demand_and_refreshed(self):
+        getcaps_url = self.make_url("service=wps&request=getcapabilities")
+        describe_url = self.make_url("service=wps&request=describeprocess&version=1.0.0&identifier={}".format(
+            self.process_public.identifier))
+        with mock.patch.object(Process, "wps", autospec=True, side_effect=Process.wps) as mocked_wps:
+            resp = self.app.get(getcaps_url)
+            resp.mustcontain("<ows:Identifier>{}</ows:Identifier>".format(self.process_public.identifier))
+            assert not mocked_wps.called, "listing processes should not require their complete definition"
+            for _ in range(2):
+                resp = self.app.get(describe_url)
+                resp.mustcontain("</wps:ProcessDescriptions>")
+            assert mocked_wps.call_count == 1, "unmodified process definition should be reused"
+
+            self.process_store.set_visibility(self.process_public.identifier, VISIBILITY_PRIVATE)
+            resp = self.app.get(getcaps_url)
+            assert "<ows:Identifier>{}</ows:Identifier>".format(self.process_public.identifier) not in resp.text
+            resp = self.app.get(describe_url, expect_errors=True)
+            assert resp.status_code == 400
+
+            self.process_store.set_visibility(self.process_public.identifier, VISIBILITY_PUBLIC)
+            resp = self.app.get(describe_url)
+            resp.mustcontain("</wps:ProcessDescriptions>")
+            assert mocked_wps.call_count == 2, "modified process definition should be created again"
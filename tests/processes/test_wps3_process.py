@@ -1,12 +1,18 @@
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import mock
 import pytest
+import requests
 from pywps.app import WPSRequest
 from requests.models import Request, Response
 
-from weaver.formats import CONTENT_TYPE_APP_NETCDF
-from weaver.processes.wps3_process import Wps3Process
+from weaver.formats import CONTENT_TYPE_APP_JSON, CONTENT_TYPE_APP_NETCDF
+from weaver.processes.wps3_process import Wps3Process, get_access_token
+from weaver.processes.wps_process_base import StepResultFsAccess, StepResultReferences, fetch_step_result_files
 from weaver.visibility import VISIBILITY_PUBLIC
 
 
@@ -75,3 +81,223 @@ def test_wps3_process_step_io_data_or_href():
                     pytest.fail(msg)
                 msg = "Other error was raised [{}], inputs where not correctly handled somewhere".format(exc)
                 pytest.fail(msg)
+
+
+def test_wps3_process_fetch_results():
+    """
+    Validates that results are all streamed to their destination by the download utility.
+    """
+    downloads = [("https://remote/result-{}.nc".format(i), "/tmp/out/result-{}.nc".format(i)) for i in range(4)]
+    with mock.patch("weaver.processes.wps3_process.download_file") as mocked_download:
+        Wps3Process.fetch_results(mock.Mock(settings={}), downloads)
+    fetched = sorted((call[0][0], call[0][1]) for call in mocked_download.call_args_list)
+    assert fetched == downloads
+
+
+@pytest.mark.parametrize("mode, consumer, passed", [
+    ("same", "ades-1", True),
+    ("same", "ades-2", False),
+    ("all", "ades-2", True),
+])
+def test_step_result_references(tmp_path, mode, consumer, passed):
+    """
+    Validates that step results are passed by reference to steps that can access them, and fetched for others.
+    """
+    references = StepResultReferences({"weaver.workflow_step_references": mode})
+    result_path = os.path.join(str(tmp_path), "result.nc")
+    head = mock.Mock(status_code=200, headers={"Content-Length": "1234"})
+    with mock.patch("weaver.processes.wps_process_base.request_extra", return_value=head):
+        assert references.add(result_path, "https://ades-1/outputs/result.nc", "ades-1")
+    assert os.path.isfile(result_path), "placeholder expected for CWL to collect step outputs"
+    assert references.size("file://" + result_path) == 1234
+
+    with mock.patch("weaver.processes.wps_process_base.download_file") as mocked_download:
+        for _ in range(2):
+            reference = references.resolve("file://" + result_path, consumer)
+            assert reference == ("https://ades-1/outputs/result.nc" if passed else None)
+    assert mocked_download.call_count == (0 if passed else 1), "result should be fetched only once if required"
+    assert references.size(result_path) == (1234 if passed else None)
+
+
+def test_step_result_references_size_unknown(tmp_path):
+    """
+    Validates that step results are not passed by reference when they cannot be described with their size.
+    """
+    references = StepResultReferences({})
+    result_path = os.path.join(str(tmp_path), "result.nc")
+    head = mock.Mock(status_code=200, headers={})
+    with mock.patch("weaver.processes.wps_process_base.request_extra", return_value=head):
+        assert not references.add(result_path, "https://ades-1/outputs/result.nc", "ades-1")
+    assert not os.path.exists(result_path)
+    assert references.size(result_path) is None
+
+
+def test_step_result_references_head_failure(tmp_path):
+    """
+    Validates that step results are fetched instead of passed by reference when their description request fails.
+    """
+    references = StepResultReferences({})
+    result_path = os.path.join(str(tmp_path), "result.nc")
+    for error in [requests.ConnectionError("refused"), requests.Timeout("timeout")]:
+        with mock.patch("weaver.processes.wps_process_base.request_extra", side_effect=error):
+            assert not references.add(result_path, "https://ades-1/outputs/result.nc", "ades-1")
+        assert not os.path.exists(result_path)
+        assert references.size(result_path) is None
+
+
+def test_step_result_references_local_read(tmp_path):
+    """
+    Validates that step results passed by reference are fetched when their contents are read locally by CWL or by a
+    local tool, but that their size is obtained without fetching them.
+    """
+    references = StepResultReferences({})
+    results = {}
+    for name in ["read.txt", "tool.txt"]:
+        results[name] = os.path.join(str(tmp_path), name)
+        head = mock.Mock(status_code=200, headers={"Content-Length": "4"})
+        with mock.patch("weaver.processes.wps_process_base.request_extra", return_value=head):
+            references.add(results[name], "https://ades-1/outputs/" + name, "ades-1")
+
+    def mock_download(_url, file_path, **__):
+        with open(file_path, "w") as file:
+            file.write("data")
+
+    fs_access = StepResultFsAccess(str(tmp_path), references=references)
+    with mock.patch("weaver.processes.wps_process_base.download_file", side_effect=mock_download) as mocked_download:
+        assert fs_access.size("file://" + results["read.txt"]) == 4
+        assert mocked_download.call_count == 0, "size should be obtained without fetching the result"
+        with fs_access.open("file://" + results["read.txt"], "r") as file:
+            assert file.read() == "data"
+        assert mocked_download.call_count == 1
+
+        runtime_context = mock.Mock(make_fs_access=partial(StepResultFsAccess, references=references))
+        job_order = {"files": [{"class": "File", "location": "file://" + results["tool.txt"]}], "value": 1}
+        fetch_step_result_files(job_order, runtime_context)
+        assert mocked_download.call_count == 2
+        with open(results["tool.txt"]) as file:
+            assert file.read() == "data"
+
+
+def test_get_access_token_cached():
+    """
+    Validates that access tokens are requested once for concurrent calls, and again only when about to expire.
+    """
+    responses = []
+
+    def mock_token_request(method, url, *_, **kwargs):
+        time.sleep(0.1)
+        resp = Response()
+        resp.status_code = 200
+        resp.headers["Content-Type"] = CONTENT_TYPE_APP_JSON
+        resp._content = json.dumps({"access_token": "token-{}".format(len(responses)), "expires_in": 120}).encode()
+        responses.append((method, url, kwargs["data"]["username"]))
+        return resp
+
+    token_args = ["https://wso2.example.com/oauth2/token", "client", "secret"]
+    with mock.patch("weaver.processes.wps3_process.request_extra", side_effect=mock_token_request), \
+            mock.patch.dict("weaver.processes.wps3_process._ACCESS_TOKENS", clear=True):
+        with mock.patch("weaver.processes.wps3_process.monotonic", return_value=1000):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                tokens = list(executor.map(lambda _: get_access_token(*token_args, "user", "pwd"), range(4)))
+            assert tokens == ["token-0"] * 4
+            assert len(responses) == 1
+            assert get_access_token(*token_args, "other-user", "pwd") == "token-1", "tokens should be cached by user"
+        with mock.patch("weaver.processes.wps3_process.monotonic", return_value=1000 + 120 - 61):
+            assert get_access_token(*token_args, "user", "pwd") == "token-0"
+        with mock.patch("weaver.processes.wps3_process.monotonic", return_value=1000 + 120 - 60):
+            assert get_access_token(*token_args, "user", "pwd") == "token-2", "token should be refreshed before expiry"
+    assert len(responses) == 3
+
+
+def test_wps3_process_deployment_cached():
+    """
+    Validates that the deployment of a remote process is verified once, and again only when its execution is refused.
+    """
+    test_process = "test-wps3-process-deployment-cached"
+    requests = []
+    deployed = {"process": False, "jobs": 0}
+
+    class TestDoneEarlyExit(Exception):
+        """Dummy exception to raise to skip job status monitoring after the execution request."""
+
+    def mock_wps_request(method, url, *_, **__):
+        method = method.upper()
+        requests.append((method, url.rsplit("/", 1)[-1]))
+        resp = Response()
+        resp.headers["Content-Type"] = CONTENT_TYPE_APP_JSON
+        resp.status_code = 200
+        resp._content = b"{}"
+        if url.endswith("/visibility") and method == "GET":
+            resp.status_code = 200 if deployed["process"] else 404
+        elif method == "POST" and url.endswith("/processes"):
+            deployed["process"] = True
+        elif method == "POST" and url.endswith("/jobs"):
+            if not deployed["process"]:
+                resp.status_code = 404
+                return resp
+            deployed["jobs"] += 1
+            deployed["process"] = deployed["jobs"] > 1  # process removed from the ADES after the first job
+            raise TestDoneEarlyExit()
+        return resp
+
+    mock_data_sources = {"localhost": {"netloc": "localhost", "ades": "https://localhost:4001", "default": True}}
+    request = mock.Mock(http_request=mock.Mock(headers={}))
+    with mock.patch("weaver.processes.wps_process_base.WpsProcessInterface.make_request",
+                    side_effect=mock_wps_request), \
+            mock.patch("weaver.processes.sources.fetch_data_sources", return_value=mock_data_sources), \
+            mock.patch.dict("weaver.processes.wps3_process._DEPLOYED_PROCESSES", clear=True):
+        for _ in range(3):
+            wps = Wps3Process({"processDescription": {"id": test_process}}, {}, test_process, request, mock.Mock())
+            with pytest.raises(TestDoneEarlyExit):
+                wps.execute({}, "", {})
+
+    deployment = [("GET", "visibility"), ("POST", "processes"), ("PUT", "visibility")]
+    assert requests == (
+        deployment + [("POST", "jobs")] +                       # first job deploys the process
+        [("POST", "jobs")] +                                    # second job submitted directly, but process removed
+        deployment + [("POST", "jobs")] +                       # deployment verified again and job resubmitted
+        [("POST", "jobs")]                                      # third job submitted directly
+    )
+
+
+def test_wps3_process_job_monitored():
+    """
+    Validates that the remote job is monitored until completion with every obtained status reported.
+
+    Delays requested by the remote server are respected, and temporary failures to obtain the status are retried.
+    """
+    test_process = "test-wps3-process-job-monitored"
+    statuses = iter([("accepted", 200), (None, 500), ("running", 200), ("successful", 200)])
+
+    def mock_wps_request(method, url, *_, **__):
+        resp = Response()
+        resp.headers["Content-Type"] = CONTENT_TYPE_APP_JSON
+        resp.status_code = 200
+        resp._content = b"{}"
+        if method.upper() == "POST" and url.endswith("/jobs"):
+            resp.status_code = 201
+            resp.headers["Location"] = "https://localhost:4001/jobs/1234"
+        elif url.endswith("/jobs/1234"):
+            job_status, resp.status_code = next(statuses)
+            resp._content = json.dumps({"status": job_status, "percentCompleted": 50}).encode()
+            if job_status == "accepted":
+                resp.headers["Retry-After"] = "7"
+        elif url.endswith("/result"):
+            resp._content = json.dumps({"outputs": []}).encode()
+        return resp
+
+    mock_data_sources = {"localhost": {"netloc": "localhost", "ades": "https://localhost:4001", "default": True}}
+    request = mock.Mock(http_request=mock.Mock(headers={}))
+    update_status = mock.Mock()
+    with mock.patch("weaver.processes.wps_process_base.WpsProcessInterface.make_request",
+                    side_effect=mock_wps_request), \
+            mock.patch("weaver.processes.sources.fetch_data_sources", return_value=mock_data_sources), \
+            mock.patch("weaver.processes.wps3_process.sleep") as mock_sleep:
+        wps = Wps3Process({}, {}, test_process, request, update_status)
+        wps.execute({}, "", {})
+
+    messages = [call[0][1] for call in update_status.call_args_list]
+    assert len([msg for msg in messages if "50%" in msg]) == 3, "every remote job status should be reported"
+    assert messages[-1] == "Execution on remote ADES completed."
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [7, 2, 3], \
+        "delay requested by the server should be used, and otherwise increase between checks"
@@ -4,16 +4,21 @@ Unit tests of functions within :mod:`weaver.processes.wps_package`.
 .. seealso::
     - :mod:`tests.functional.wps_package`.
 """
+import os
 import tempfile
+import threading
+import time
 from collections import OrderedDict
 from copy import deepcopy
 
+import mock
 from pytest import fail
 from pywps.app import WPSRequest
 
 from weaver.datatype import Process
 from weaver.processes.wps_package import _get_package_ordered_io  # noqa: W0212
-from weaver.processes.wps_package import WpsPackage
+from weaver.processes.wps_package import WpsPackage, get_package_workflow_output_sources
+from weaver.status import STATUS_RUNNING
 
 
 def test_get_package_ordered_io_with_builtin_dict_and_hints():
@@ -274,3 +279,106 @@ def test_stdout_stderr_logging_for_commandline_tool_failure():
         assert "Completed permanentFail" in exception.args[0]
     else:
         fail("\"wps_package._handler()\" was expected to throw \"PackageExecutionError\" exception")
+
+
+def test_make_location_inputs_concurrent():
+    """
+    Validate that inputs are staged concurrently within host limits, and that their order is preserved.
+    """
+    active = {"total": 0, "max": 0, "hosts": {}, "max_host": 0}
+    lock = threading.Lock()
+
+    def mock_make_location_input(input_type, input_definition, staging_dir=None):  # noqa: W0613
+        host = input_definition.url.split("/")[2]
+        with lock:
+            active["total"] += 1
+            active["hosts"][host] = active["hosts"].get(host, 0) + 1
+            active["max"] = max(active["max"], active["total"])
+            active["max_host"] = max(active["max_host"], active["hosts"][host])
+        time.sleep(0.05)
+        with lock:
+            active["total"] -= 1
+            active["hosts"][host] -= 1
+        return {"location": input_definition.url, "class": input_type}
+
+    package = mock.Mock(settings={"weaver.input_staging_workers": 8, "weaver.input_staging_host_workers": 2})
+    package.make_location_input.side_effect = mock_make_location_input
+    inputs = [("File", mock.Mock(url="https://host-{}.com/file-{}.nc".format(i % 3, i))) for i in range(12)]
+    locations = WpsPackage.make_location_inputs(package, inputs)
+
+    assert [loc["location"] for loc in locations] == [input_def.url for _, input_def in inputs]
+    assert active["max"] > 2, "inputs from different hosts should be staged concurrently"
+    assert active["max_host"] <= 2, "inputs from the same host should not exceed the limit"
+    message, _, status = package.update_status.call_args[0]
+    assert message == "Staged 12/12 file inputs." and status == STATUS_RUNNING
+
+
+def test_make_location_inputs_same_file_name():
+    """
+    Validate that concurrently staged inputs with the same file name are fetched in distinct directories.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        package = mock.Mock(settings={})
+        package.make_location_input.side_effect = lambda _type, _def, staging_dir=None: {"location": staging_dir}
+        urls = ["https://host-{}.com/data/file.nc".format(i) for i in range(3)] + ["https://host.com/other.nc"]
+        inputs = [("File", mock.Mock(url=url, workdir=workdir)) for url in urls]
+        locations = WpsPackage.make_location_inputs(package, inputs)
+
+        staging_dirs = [loc["location"] for loc in locations]
+        assert staging_dirs[0] is None and staging_dirs[3] is None, "first input of each name uses the working dir"
+        assert staging_dirs[1] != staging_dirs[2]
+        for staging_dir in staging_dirs[1:3]:
+            assert os.path.isdir(staging_dir) and os.path.dirname(staging_dir) == workdir
+
+
+def test_get_package_workflow_output_sources():
+    package = {
+        "class": "Workflow",
+        "outputs": [
+            {"id": "output", "type": "File", "outputSource": "step2/output"},
+            {"id": "merged", "type": "File[]", "outputSource": ["#main/step1/log", "step2/log"]},
+        ]
+    }
+    assert get_package_workflow_output_sources(package) == {"step1": ["log"], "step2": ["output", "log"]}
+    package["outputs"] = {"output": {"type": "File", "outputSource": "step2/output"}}
+    assert get_package_workflow_output_sources(package) == {"step2": ["output"]}
+
+
+def test_step_update_status_parallel_steps():
+    """
+    Validate that progress of steps reported concurrently is aggregated into a continuous job progress.
+    """
+    package = mock.Mock(step_packages={"step1": "step1.cwl", "step2": "step2.cwl"}, step_progress={},
+                        step_lock=threading.RLock())
+    package.get_step_progress.side_effect = lambda: WpsPackage.get_step_progress(package)
+    package.map_step_progress.side_effect = WpsPackage.map_step_progress
+    reported = []
+    package.update_status.side_effect = lambda message, progress, status: reported.append(progress)
+
+    def report_step(step_name):
+        for progress in range(0, 101, 10):
+            WpsPackage.step_update_status(package, "running", progress, step_name, "ades", STATUS_RUNNING)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=report_step, args=(step,)) for step in ["step1", "step2"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert reported == sorted(reported), "progress should never move backward"
+    assert reported[-1] == WpsPackage.map_step_progress(2, 2)
+    WpsPackage.step_update_status(package, "late", 50, "step1", "ades", STATUS_RUNNING)
+    assert reported[-1] == WpsPackage.map_step_progress(2, 2)
+
+
+def test_step_progress_scattered_steps():
+    """
+    Validate that progress of scattered step jobs outnumbering the workflow steps does not exceed their completion.
+    """
+    package = mock.Mock(step_packages={"step1": "step1.cwl", "step2": "step2.cwl"},
+                        step_progress={"step1": 100, "step2": 100, "step2_2": 100, "step2_3": 50})
+    package.map_step_progress.side_effect = WpsPackage.map_step_progress
+    assert WpsPackage.get_step_progress(package) == WpsPackage.map_step_progress(2, 2)
+    package.step_progress = {"step1": 100, "step2": 50}
+    assert WpsPackage.get_step_progress(package) == WpsPackage.map_step_progress(1.5, 2)
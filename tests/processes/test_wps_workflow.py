@@ -0,0 +1,93 @@
+"""
+Unit tests of functions within :mod:`weaver.processes.wps_workflow`.
+"""
+import json
+import os
+import tempfile
+import threading
+
+import mock
+from cwltool.factory import Factory as CWLFactory
+
+from weaver.processes.wps_process_base import StepResultFsAccess, StepResultReferences
+from weaver.processes.wps_workflow import WpsWorkflowExecutor, compute_local_checksums, get_workflow_executor
+
+
+def test_get_workflow_executor():
+    assert get_workflow_executor({"weaver.workflow_parallel_steps": "1"}) is None
+    executor = get_workflow_executor({"weaver.workflow_parallel_steps": "3"})
+    assert isinstance(executor, WpsWorkflowExecutor)
+    assert executor.max_cores == 3
+
+
+def test_workflow_executor_parallel_steps():
+    """
+    Validates that independent steps run simultaneously within the limit of parallel steps.
+    """
+    sleep_tool = {
+        "class": "CommandLineTool",
+        "baseCommand": "sleep",
+        "requirements": {"ResourceRequirement": {"coresMin": 64, "ramMin": 2 ** 30}},
+        "inputs": {"delay": {"type": "string", "inputBinding": {"position": 1}}},
+        "outputs": {},
+    }
+    workflow = {
+        "cwlVersion": "v1.0",
+        "class": "Workflow",
+        "inputs": {"delay": "string"},
+        "outputs": {},
+        "steps": {
+            "step{}".format(i): {"run": sleep_tool, "in": {"delay": "delay"}, "out": []} for i in range(3)
+        },
+    }
+    running = {"active": 0, "max": 0, "started": 0}
+    condition = threading.Condition()
+
+    def mock_run(job, runtime_context, tmpdir_lock=None):  # noqa: W0613
+        with condition:
+            running["active"] += 1
+            running["started"] += 1
+            running["max"] = max(running["max"], running["active"])
+            condition.notify_all()
+            # hold the job until either all allowed steps or every step were started to observe their concurrency
+            condition.wait_for(lambda: running["active"] >= running["limit"] or running["started"] == 3, timeout=10)
+            running["active"] -= 1
+        job.output_callback({}, "success")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        workflow_path = os.path.join(tmp_dir, "workflow.cwl")
+        with open(workflow_path, "w") as workflow_file:
+            json.dump(workflow, workflow_file)
+        concurrency = {}
+        with mock.patch("cwltool.job.CommandLineJob.run", side_effect=mock_run, autospec=True):
+            for max_steps in [3, 2]:
+                running.update({"active": 0, "max": 0, "started": 0, "limit": max_steps})
+                package = CWLFactory(executor=WpsWorkflowExecutor(max_steps)).make(workflow_path)
+                package(delay="1")
+                concurrency[max_steps] = running["max"]
+    assert concurrency[3] == 3, "all independent steps should run simultaneously"
+    assert concurrency[2] == 2, "steps exceeding the limit should wait for another one to complete"
+
+
+def test_compute_local_checksums_step_result_references(tmp_path):
+    """
+    Validates that checksums of collected outputs are not computed for step results passed by reference.
+    """
+    references = StepResultReferences({})
+    local_path = os.path.join(str(tmp_path), "local.txt")
+    with open(local_path, "w") as file:
+        file.write("data")
+    remote_path = os.path.join(str(tmp_path), "remote.txt")
+    head = mock.Mock(status_code=200, headers={"Content-Length": "4"})
+    with mock.patch("weaver.processes.wps_process_base.request_extra", return_value=head):
+        references.add(remote_path, "https://ades-1/outputs/remote.txt", "ades-1")
+
+    fs_access = StepResultFsAccess(str(tmp_path), references=references)
+    local_file = {"class": "File", "location": "file://" + local_path}
+    remote_file = {"class": "File", "location": "file://" + remote_path, "size": 4}
+    with mock.patch("weaver.processes.wps_process_base.download_file") as mocked_download:
+        compute_local_checksums(fs_access, local_file)
+        compute_local_checksums(fs_access, remote_file)
+    assert local_file["checksum"].startswith("sha1$") and local_file["size"] == 4
+    assert "checksum" not in remote_file and remote_file["size"] == 4
+    assert not mocked_download.called, "result passed by reference should not be fetched for its checksum"
@@ -1,6 +1,9 @@
 from copy import deepcopy
 
-from weaver.datatype import Process
+import mock
+
+from weaver.datatype import Job, Process
+from weaver.utils import now
 
 
 def test_package_encode_decode():
@@ -40,3 +43,72 @@ def test_package_encode_decode():
     assert "$namespace" not in process_package_encoded["executionUnits"][0]["unit"]
     assert _replace_specials("$namespace") in process_package_encoded["executionUnits"][0]["unit"]
     assert package == process.package, "package obtained from the process method should be the original decoded version"
+
+
+def test_package_encode_no_modification():
+    package = {
+        "class": "CommandLineTool",
+        "$namespaces": {"iana": "ref"},
+        "requirements": {"DockerRequirement": {"dockerPull": "debian:stretch-slim"}},
+        "steps": [{"run": "step.cwl"}, {"in": {"$ref": "input"}}],
+    }
+    original = deepcopy(package)
+    encoded = Process._encode(package)  # noqa: W0212
+    assert package == original, "original package should not be modified"
+    assert encoded["requirements"] is package["requirements"], "unchanged items should be shared with original"
+    assert encoded["steps"][0] is package["steps"][0]
+    assert encoded["steps"][1] is not package["steps"][1], "items with replaced keys should be copied"
+    assert Process._decode(encoded) == original  # noqa: W0212
+
+    # decoded once when loaded from storage
+    process = Process(id="test-package-encoded", package=encoded)
+    assert process["package"] == original
+    assert process.package == original
+    assert encoded == Process._encode(original), "stored definition should not be modified"  # noqa: W0212
+
+
+def test_package_getter_no_codec():
+    """
+    Validates that the definition decoded when loading the process is returned as is by the getter.
+    """
+    package = {
+        "class": "Workflow",
+        "\uFF04namespaces": {"iana": "ref"},
+        "steps": {"step{}".format(i): {"run": "step.cwl", "in": {"input": "input"}} for i in range(3)},
+    }
+    process = Process(id="test-package-getter", package=package, payload={"processDescription": {"id": "test"}})
+    decoded = process.package
+    assert "$namespaces" in decoded
+    assert decoded["steps"] is package["steps"], "subtree without encoded keys should not be copied when decoded"
+
+    with mock.patch.object(Process, "_replace_keys", side_effect=Process._replace_keys) as mocked_codec:
+        assert process.package is decoded
+        assert process.payload is process.payload
+        assert not mocked_codec.called, "getters should not decode or copy the definition on each access"
+        params = process.params()
+    assert mocked_codec.call_count == 2, "definitions should be encoded only when saved"
+    assert params["package"]["steps"] is package["steps"], "subtree without decoded keys should not be copied"
+
+
+def test_job_changes():
+    job = Job(task_id="test-job-changes", status="running", created=now(), results=[], logs=["existing"])
+    assert job.get_changes() == ({}, [])
+
+    job.progress = 20
+    job.results.append({"id": "output", "value": 1})
+    job.save_log(message="added")
+    fields, logs = job.get_changes()
+    assert fields == {"progress": 20, "results": [{"id": "output", "value": 1}]}
+    assert len(logs) == 1 and "added" in logs[0]
+
+    job.reset_changes()
+    assert job.get_changes() == ({}, [])
+    assert not job.has_changes()
+
+    job.progress = 20  # same value
+    job.status = "running"
+    assert not job.has_changes()
+    job.status_message = "updated"
+    assert job.has_changes()
+    assert job.has_changes("status_message", "status")
+    assert not job.has_changes("status", "progress")
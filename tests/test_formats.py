@@ -1,7 +1,7 @@
 import os
 
 import mock
-from pyramid.httpexceptions import HTTPOk, HTTPRequestTimeout
+from pyramid.httpexceptions import HTTPOk
 from pyramid.response import Response
 from pywps.inout.formats import Format
 from requests.exceptions import ConnectionError
@@ -78,35 +78,56 @@ def test_get_cwl_file_format_default():
     assert res == iana_url + fmt
 
 
-def test_get_cwl_file_format_retry_attempts():
-    """Verifies that failing request will not immediately fail the MIME-type validation."""
-    codes = {"codes": [HTTPOk.code, HTTPRequestTimeout.code]}  # note: used in reverse order (pop)
-
-    def mock_request_extra(*_, **__):
-        m_resp = Response()
-        m_resp.status_code = codes["codes"].pop()
-        return m_resp
-
-    with mock.patch("requests.Session.request", side_effect=mock_request_extra) as mocked_request:
+def test_get_cwl_file_format_offline():
+    """Verifies that MIME-types are resolved from the registry file without any request."""
+    with mock.patch("requests.Session.request", side_effect=ConnectionError()) as mocked_request:
         _, fmt = f.get_cwl_file_format(f.CONTENT_TYPE_APP_JSON)
         assert fmt == "{}:{}".format(f.IANA_NAMESPACE, f.CONTENT_TYPE_APP_JSON)
-        assert mocked_request.call_count == 2
-
-
-def test_get_cwl_file_format_retry_fallback_urlopen():
-    """Verifies that failing request because of critical error still validate the MIME-type using the fallback."""
-    def mock_connect_error(*_, **__):
-        raise ConnectionError()
-
-    def mock_urlopen(*_, **__):
-        return HTTPOk()
+        _, fmt = f.get_cwl_file_format("Application/Geo+JSON")
+        assert fmt == "{}:{}".format(f.IANA_NAMESPACE, "Application/Geo+JSON"), "case should not matter"
+        _, fmt = f.get_cwl_file_format(f.CONTENT_TYPE_TEXT_PLAIN)
+        assert fmt == "{}:{}".format(f.EDAM_NAMESPACE, f.EDAM_MAPPING[f.CONTENT_TYPE_TEXT_PLAIN])
+        assert not mocked_request.called
+    assert f.get_media_types_registry_version()
+
+
+def test_load_media_types_registry(tmp_path):
+    registry_file = os.path.join(tmp_path, "media-types.txt")
+    with open(registry_file, "w") as registry:
+        registry.write("# version: test\napplication/x-custom\n")
+    try:
+        f.load_media_types_registry({"weaver.media_types_file": registry_file})
+        assert f.get_media_types_registry_version() == "test"
+        assert f.get_cwl_file_format("application/x-custom", make_reference=True) == \
+            f.IANA_NAMESPACE_DEFINITION[f.IANA_NAMESPACE] + "application/x-custom"
+        assert f.get_cwl_file_format("text/csv") == (None, None)
+    finally:
+        f.load_media_types_registry({})
+    assert f.get_cwl_file_format("application/x-custom") == (None, None)
+    assert f.get_cwl_file_format("text/csv") != (None, None)
+
+
+def test_update_media_types_registry(tmp_path):
+    """Verifies that the registry file is generated from the IANA registry media-types that can be referenced."""
+    registries = {
+        "application": "Name,Template,Reference\njson,application/json,[RFC8259]\nreserved,,[RFC0000]\n",
+        "text": "Name,Template,Reference\ncsv,text/csv,[RFC4180][RFC7111]\n",
+    }
+
+    def mock_registry(_, url, *__, **___):
+        m_resp = Response()
+        m_resp.status_code = HTTPOk.code
+        m_resp.text = registries.get(url.rsplit("/", 1)[-1].split(".")[0], "Name,Template,Reference\n")
+        return m_resp
 
-    with mock.patch("requests.Session.request", side_effect=mock_connect_error) as mocked_request:
-        with mock.patch("weaver.formats.urlopen", side_effect=mock_urlopen) as mocked_urlopen:
-            _, fmt = f.get_cwl_file_format(f.CONTENT_TYPE_APP_JSON)
-            assert fmt == "{}:{}".format(f.IANA_NAMESPACE, f.CONTENT_TYPE_APP_JSON)
-            assert mocked_request.call_count == 4   # internally attempted 4 times (1 attempt + 3 retries)
-            assert mocked_urlopen.call_count == 1
+    registry_file = os.path.join(tmp_path, "media-types.txt")
+    with mock.patch("weaver.formats.request_extra", side_effect=mock_registry) as mocked_request:
+        assert f.update_media_types_registry(registry_file) == 2
+    assert mocked_request.call_count == len(f.IANA_MEDIA_TYPES_TOP_LEVEL)
+    with open(registry_file) as registry:
+        lines = registry.read().splitlines()
+    assert [line for line in lines if not line.startswith("#")] == ["application/json", "text/csv"]
+    assert not os.path.exists(registry_file + ".part")
 
 
 def test_get_cwl_file_format_synonym():
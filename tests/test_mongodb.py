@@ -3,12 +3,26 @@ Based on unittests in https://github.com/wndhydrnt/python-oauth2/tree/master/oau
 """
 
 import unittest
+from datetime import datetime, timezone
 
 import mock
+from pymongo import ASCENDING, DESCENDING
 from pymongo.collection import Collection
+from pymongo.database import Database
 
-from weaver.datatype import Service
-from weaver.store.mongodb import MongodbServiceStore
+from weaver.database.mongodb import (
+    get_mongodb_client,
+    get_mongodb_client_options,
+    get_mongodb_engine,
+    get_mongodb_index_report
+)
+from weaver.datatype import Job, Process, Service
+from weaver.exceptions import JobNotFound, ProcessNotFound
+from weaver.sort import SORT_STATUS
+from weaver.store.base import encode_cursor
+from weaver.store.mongodb import MongodbJobStore, MongodbProcessStore, MongodbServiceStore, MongodbStore
+from weaver.utils import now
+from weaver.visibility import VISIBILITY_PRIVATE, VISIBILITY_PUBLIC
 
 
 class MongodbServiceStoreTestCase(unittest.TestCase):
@@ -56,3 +70,263 @@ class MongodbServiceStoreTestCase(unittest.TestCase):
         store.save_service(Service(self.service_public))
 
         collection_mock.insert_one.assert_called_with(self.service_public)
+
+
+class MongodbJobStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.job = dict(id="a1b2c3d4", task_id="task", process="proc", status="running", progress=10,
+                        created=now(), logs=["log-1", "log-2"])
+
+    def test_update_job_modified_fields_only(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.update_one.return_value = mock.Mock(acknowledged=True, matched_count=1)
+        store = MongodbJobStore(collection=collection_mock)
+        job = Job(self.job)
+        job.progress = 50
+        job.status_message = "half-way"
+        result = store.update_job(job, refresh=False)
+
+        collection_mock.update_one.assert_called_once_with(
+            {"id": self.job["id"]}, {"$set": {"progress": 50, "status_message": "half-way"}})
+        collection_mock.find_one.assert_not_called()
+        assert result is job
+        assert job.get_changes() == ({}, [])
+
+    def test_update_job_append_logs(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.find_one_and_update.return_value = {"log_count": 3}
+        collection_mock.find_one.return_value = self.job
+        store = MongodbJobStore(collection=collection_mock)
+        job = Job(self.job)
+        job.save_log(message="new entry")
+        store.update_job(job)
+
+        update = collection_mock.find_one_and_update.call_args[0][1]
+        assert update == {"$inc": {"log_count": 1}}
+        log_entries = store.log_collection.insert_many.call_args[0][0]
+        assert len(log_entries) == 1
+        assert log_entries[0]["job"] == self.job["id"]
+        assert log_entries[0]["seq"] == 2
+        assert "new entry" in log_entries[0]["log"]
+        collection_mock.update_one.assert_not_called()
+        collection_mock.find_one.assert_called_with({"id": self.job["id"]}, {"logs": False})
+
+    def test_update_job_unchanged(self):
+        collection_mock = mock.Mock(spec=Collection)
+        store = MongodbJobStore(collection=collection_mock)
+        job = Job(self.job)
+        store.update_job(job, refresh=False)
+
+        collection_mock.update_one.assert_not_called()
+
+    def test_find_jobs_fields_projection(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.aggregate.return_value = [{
+            "items": [{"id": self.job["id"], "task_id": self.job["task_id"]}],
+            "total": [{"total": 1}],
+        }]
+        store = MongodbJobStore(collection=collection_mock)
+        jobs, total = store.find_jobs(tags=[], fields=["id"])
+
+        pipeline = collection_mock.aggregate.call_args[0][0]
+        projection = {"id": True, "task_id": True, "created": True, "_id": False}  # sorting field for cursor
+        assert pipeline[-1]["$facet"]["items"][-1] == {"$project": projection}
+        assert [job.id for job in jobs] == [self.job["id"]]
+        assert total == 1
+
+    def test_find_jobs_single_query(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.aggregate.return_value = [{"items": [], "total": []}]
+        store = MongodbJobStore(collection=collection_mock)
+        jobs, total = store.find_jobs(tags=[], page=2, limit=5)
+
+        facet = collection_mock.aggregate.call_args[0][0][-1]["$facet"]
+        assert facet["items"][:2] == [{"$skip": 10}, {"$limit": 5}]
+        assert facet["total"] == [{"$count": "total"}]
+        collection_mock.count_documents.assert_not_called()
+        assert jobs == []
+        assert total == 0
+
+    def test_find_jobs_request_visibility(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.aggregate.return_value = [{"items": [], "total": []}]
+        store = MongodbJobStore(collection=collection_mock)
+
+        def search_filters(is_admin, user_id, access=None):
+            request = mock.Mock(authenticated_userid=user_id)
+            request.has_permission.return_value = is_admin
+            store.find_jobs(tags=[], request=request, access=access)
+            return collection_mock.aggregate.call_args[0][0][0]["$match"]
+
+        assert search_filters(True, 1) == {"user_id": 1}, "administrator should obtain own jobs without access"
+        assert search_filters(True, 1, VISIBILITY_PRIVATE) == {"access": VISIBILITY_PRIVATE}
+        assert search_filters(False, 2) == {"user_id": 2}
+        assert search_filters(False, 2, VISIBILITY_PRIVATE) == {"user_id": 2, "access": VISIBILITY_PRIVATE}
+        assert search_filters(False, None, VISIBILITY_PRIVATE) == {"access": VISIBILITY_PUBLIC}
+
+    def test_find_jobs_cursor(self):
+        self.job["created"] = datetime(2021, 3, 1, 12, 30, 15, 123000, tzinfo=timezone.utc)  # stored precision
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.aggregate.return_value = [self.job]
+        collection_mock.count_documents.return_value = 20
+        store = MongodbJobStore(collection=collection_mock)
+        cursor = store.make_cursor(Job(self.job))
+        jobs, total = store.find_jobs(tags=[], page=3, limit=1, cursor=cursor)
+
+        pipeline = collection_mock.aggregate.call_args[0][0]
+        search, cursor_filter = pipeline[0]["$match"]["$and"]
+        assert search == {"access": VISIBILITY_PUBLIC}
+        assert cursor_filter == {"$or": [
+            {"created": {"$lt": self.job["created"]}},
+            {"created": self.job["created"], "id": {"$lt": self.job["id"]}},
+            {"created": None},
+        ]}
+        assert pipeline[1] == {"$sort": {"created": DESCENDING, "id": DESCENDING}}
+        assert not any("$skip" in stage for stage in pipeline)
+        collection_mock.count_documents.assert_called_once_with(search)
+        assert [job.id for job in jobs] == [self.job["id"]]
+        assert total == 20
+
+    def test_find_jobs_cursor_other_sort(self):
+        store = MongodbJobStore(collection=mock.Mock(spec=Collection))
+        cursor = store.make_cursor(Job(self.job), SORT_STATUS)
+        with self.assertRaises(JobNotFound):
+            store.find_jobs(tags=[], cursor=cursor)
+        with self.assertRaises(JobNotFound):
+            store.find_jobs(tags=[], cursor="random")
+
+
+class MongodbProcessStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.process = dict(identifier="test-process", package={"class": "CommandLineTool"}, inputs=[],
+                            processEndpointWPS1="http://localhost/wps", visibility=VISIBILITY_PUBLIC)
+
+    def test_fetch_by_id_cached(self):
+        stored = {"process": dict(self.process, _id="rev-1")}
+
+        def find_one(search, projection=None):
+            process = stored["process"]
+            if not process or search["identifier"] != process["identifier"]:
+                return None
+            return {"_id": process["_id"]} if projection else process
+
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.find_one.side_effect = find_one
+        store = MongodbProcessStore(collection=collection_mock)
+        process = store.fetch_by_id(self.process["identifier"])
+        process["title"] = "modified"
+        cached = store.fetch_by_id(self.process["identifier"])
+        full_fetches = [call for call in collection_mock.find_one.call_args_list if not call[1].get("projection")]
+        assert len(full_fetches) == 1, "unmodified process revision should reuse the cached definition"
+        assert isinstance(cached, Process)
+        assert cached.id == self.process["identifier"]
+        assert cached.title == cached.id
+        assert cached.package is process.package, "decoded definition should be shared without copy"
+
+        # modification by another worker
+        stored["process"] = dict(self.process, _id="rev-2", title="updated")
+        updated = store.fetch_by_id(self.process["identifier"])
+        full_fetches = [call for call in collection_mock.find_one.call_args_list if not call[1].get("projection")]
+        assert len(full_fetches) == 2, "modified process revision should be retrieved again"
+        assert updated.title == "updated"
+
+        # removal by another worker
+        stored["process"] = None
+        with self.assertRaises(ProcessNotFound):
+            store.fetch_by_id(self.process["identifier"])
+
+    def test_fetch_by_id_cache_disabled(self):
+        collection_mock = mock.Mock(spec=Collection)
+        collection_mock.find_one.return_value = self.process
+        store = MongodbProcessStore(collection=collection_mock, settings={"weaver.process_cache_size": "0"})
+        store.fetch_by_id(self.process["identifier"])
+        store.fetch_by_id(self.process["identifier"])
+        assert collection_mock.find_one.call_count == 2
+
+
+def test_mongodb_cursor_filter_null_values():
+    cursor = encode_cursor({"id": "a", "service": None}, "service")
+    assert MongodbStore._get_cursor_filter(cursor, "service", ASCENDING) == {"$or": [  # noqa: W0212
+        {"service": {"$ne": None}},
+        {"service": None, "id": {"$gt": "a"}},
+    ]}
+    assert MongodbStore._get_cursor_filter(cursor, "service", DESCENDING) == {"$or": [  # noqa: W0212
+        {"service": None, "id": {"$lt": "a"}},
+    ]}
+    cursor = encode_cursor({"id": "a"}, "id")
+    assert MongodbStore._get_cursor_filter(cursor, "id", ASCENDING) == {"id": {"$gt": "a"}}  # noqa: W0212
+
+
+def test_mongodb_index_report():
+    collections = {}
+
+    def get_collection(name):
+        if name not in collections:
+            collection = collections[name] = mock.Mock(spec=Collection)
+            collection.index_information.return_value = {"_id_": {"key": [("_id", 1)]}}
+            collection.aggregate.return_value = []
+        return collections[name]
+
+    db = mock.MagicMock(spec=Database)
+    db.__getitem__.side_effect = get_collection
+    jobs = get_collection("jobs")
+    jobs.index_information.return_value = {
+        "_id_": {"key": [("_id", 1)]},
+        "id_1": {"key": [("id", 1)], "unique": True},
+        "status_1": {"key": [("status", 1)]},
+    }
+    jobs.aggregate.return_value = [
+        {"name": "_id_", "accesses": {"ops": 0}},
+        {"name": "id_1", "accesses": {"ops": 10}},
+        {"name": "status_1", "accesses": {"ops": 0}},
+    ]
+    report = get_mongodb_index_report(db, {})
+
+    assert "user_id_1_access_1_created_-1_id_-1" in report["jobs"]["missing"]
+    assert "id_1" not in report["jobs"]["missing"]
+    assert report["jobs"]["undeclared"] == ["status_1"]
+    assert report["jobs"]["unused"] == ["status_1"]
+    assert report["services"]["missing"] == ["name_1", "url_1"]
+    assert "created_1" not in report["job_logs"]["missing"]
+
+
+def test_mongodb_client_options():
+    settings = {
+        "mongodb.max_pool_size": "50",
+        "mongodb.min_pool_size": "",
+        "mongodb.server_selection_timeout_ms": "5000",
+        "mongodb.read_preference": "secondaryPreferred",
+        "mongodb.write_concern": "majority",
+        "mongodb.journal": "true",
+    }
+    assert get_mongodb_client_options(settings) == {
+        "maxPoolSize": 50,
+        "serverSelectionTimeoutMS": 5000,
+        "readPreference": "secondaryPreferred",
+        "w": "majority",
+        "journal": True,
+    }
+    assert get_mongodb_client_options({"mongodb.write_concern": "2"}) == {"w": 2}
+
+
+def test_mongodb_client_shared_by_process():
+    settings = {"mongodb.host": "example.com", "mongodb.port": "27017", "mongodb.max_pool_size": "10"}
+    with mock.patch("weaver.database.mongodb.pymongo.MongoClient", side_effect=lambda *_, **__: mock.Mock()) as client:
+        first = get_mongodb_client(settings)
+        assert get_mongodb_client(dict(settings)) is first
+        client.assert_called_once_with("example.com", 27017, connect=False, maxPoolSize=10)
+        assert get_mongodb_client(dict(settings, **{"mongodb.max_pool_size": "20"})) is not first
+        with mock.patch("weaver.database.mongodb.os.getpid", return_value=-1):
+            assert get_mongodb_client(settings) is not first  # forked process
+
+
+def test_mongodb_engine_indexes_created_once():
+    settings = {"mongodb.host": "example.com", "mongodb.port": "27018", "mongodb.db_name": "test-indexes"}
+    with mock.patch("weaver.database.mongodb.pymongo.MongoClient", return_value=mock.MagicMock()) as client:
+        db = client.return_value.__getitem__.return_value
+        db.name = "test-indexes"
+        get_mongodb_engine(settings)
+        created = db.__getitem__.return_value.create_index.call_count
+        assert created > 0
+        get_mongodb_engine(settings)
+        assert db.__getitem__.return_value.create_index.call_count == created
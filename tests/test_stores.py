@@ -0,0 +1,226 @@
+"""
+Conformance tests that every database backend must fulfill for stores to be interchangeable.
+"""
+import os
+import sqlite3
+import threading
+from datetime import timedelta
+
+import mock
+import pytest
+
+from tests.utils import get_test_weaver_config, setup_config_with_mongodb
+from weaver.database import get_db
+from weaver.datatype import Bill, Job, Process, Quote, Service
+from weaver.exceptions import (
+    JobNotFound,
+    ProcessNotAccessible,
+    ProcessNotFound,
+    QuoteNotFound,
+    ServiceNotFound,
+    ServiceRegistrationError
+)
+from weaver.sort import SORT_CREATED, SORT_PROCESS
+from weaver.status import STATUS_RUNNING, STATUS_SUCCEEDED
+from weaver.store.base import StoreBills, StoreJobs, StoreProcesses, StoreQuotes, StoreServices
+from weaver.store.memory import MemoryJobStore, SQLiteLogTable, SQLiteTable
+from weaver.utils import now
+from weaver.visibility import VISIBILITY_PRIVATE, VISIBILITY_PUBLIC
+
+
+@pytest.fixture(params=["memory", "sqlite", "mongodb"])
+def database(request, tmp_path):
+    if request.param == "mongodb":
+        settings = setup_config_with_mongodb().registry.settings
+        settings["weaver.database"] = "mongodb"  # regardless of backend selected for other test suites
+    else:
+        settings = {"weaver.database": request.param, "weaver.database_path": os.path.join(tmp_path, "weaver.db")}
+    db = get_db(settings)
+    db.get_store(StoreServices).clear_services()
+    db.get_store(StoreProcesses).clear_processes()
+    db.get_store(StoreJobs).clear_jobs()
+    for store in [StoreQuotes, StoreBills]:
+        # no clear operation is offered by these stores, empty their storage directly
+        store = db.get_store(store)
+        if hasattr(store, "table"):
+            store.table.clear()
+        else:
+            store.collection.delete_many({})
+    return db
+
+
+def make_request(user_id=None, admin=False):
+    return mock.Mock(authenticated_userid=user_id, has_permission=lambda _: admin)
+
+
+def test_services(database):
+    store = database.get_store(StoreServices)
+    store.save_service(Service(name="svc", url="http://example.com/wps", public=True))
+    with pytest.raises(ServiceRegistrationError):
+        store.save_service(Service(name="svc", url="http://other.com/wps"), overwrite=False)
+    assert store.fetch_by_name("svc").url == "http://example.com/wps"
+    assert store.fetch_by_url("http://example.com/wps").name == "svc"
+    assert [svc.name for svc in store.list_services()] == ["svc"]
+    store.delete_service("svc")
+    with pytest.raises(ServiceNotFound):
+        store.fetch_by_name("svc")
+
+
+def test_processes(database):
+    store = database.get_store(StoreProcesses)
+    process = Process(id="proc", processEndpointWPS1="http://example.com/wps",
+                      package={"cwlVersion": "v1.0", "$namespaces": {"edam": "http://edamontology.org/"}})
+    store.save_process(process)
+    found = store.fetch_by_id("proc")
+    assert found.package["$namespaces"] == {"edam": "http://edamontology.org/"}
+    assert found.visibility == VISIBILITY_PRIVATE
+    with pytest.raises(ProcessNotAccessible):
+        store.fetch_by_id("proc", visibility=VISIBILITY_PUBLIC)
+    revisions = store.list_process_revisions()
+    assert list(revisions) == ["proc"] and not store.list_process_revisions(visibility=VISIBILITY_PUBLIC)
+    store.set_visibility("proc", VISIBILITY_PUBLIC)
+    assert store.list_process_revisions()["proc"] != revisions["proc"]
+    assert [proc.id for proc in store.list_processes(visibility=VISIBILITY_PUBLIC)] == ["proc"]
+    store.delete_process("proc")
+    with pytest.raises(ProcessNotFound):
+        store.fetch_by_id("proc")
+
+
+def test_jobs_update_and_logs(database):
+    store = database.get_store(StoreJobs)
+    job = store.save_job(task_id="task", process="proc", access=VISIBILITY_PUBLIC, custom_tags=["test"])
+    assert "test" in job.tags
+    job.status = STATUS_RUNNING
+    job.save_log(message="first")
+    job.save_log(message="second")
+    job = store.update_job(job)
+    assert job.status == STATUS_RUNNING
+    logs = store.fetch_logs(job.id)
+    assert [seq for seq, _ in logs] == [0, 1]
+    assert "first" in logs[0][1] and "second" in logs[1][1]
+    assert [seq for seq, _ in store.fetch_logs(job.id, since=1)] == [1]
+    store.delete_job(job.id)
+    with pytest.raises(JobNotFound):
+        store.fetch_by_id(job.id)
+
+
+def test_jobs_legacy_logs(database):
+    store = database.get_store(StoreJobs)
+    job = store.save_job(task_id="task", process="proc")
+    # logs embedded in the job document by previous versions
+    legacy_logs = ["first", "second", "third"]
+    if hasattr(store, "table"):
+        stored = store.table.get(job.id)
+        stored["logs"] = legacy_logs
+        store.table.put(job.id, stored)
+    else:
+        store.collection.update_one({"id": job.id}, {"$set": {"logs": legacy_logs}})
+    assert store.fetch_logs(job.id, since=1, limit=1) == [(1, "second")]
+    job = store.fetch_by_id(job.id)
+    job.save_log(message="fourth")
+    store.update_job(job)
+    logs = store.fetch_logs(job.id, since=2)
+    assert [seq for seq, _ in logs] == [2, 3]
+    assert logs[0][1] == "third" and "fourth" in logs[1][1]
+    assert store.fetch_logs(job.id, since=4) == []
+
+
+def test_jobs_concurrent_updates_sqlite(tmp_path):
+    """
+    Validates that updates of a same job by distinct processes using the same SQLite file do not lose any change.
+    """
+    path = os.path.join(str(tmp_path), "weaver.db")
+    stores = []
+    for _ in range(2):  # each process uses its own connection and lock
+        connection, lock = sqlite3.connect(path, check_same_thread=False, timeout=30), threading.RLock()
+        stores.append(MemoryJobStore(table=SQLiteTable(connection, "jobs", lock),
+                                     log_table=SQLiteLogTable(connection, "job_log_entries", lock)))
+    job_id = stores[0].save_job(task_id="task", process="proc").id
+
+    def update(store, field, count):
+        for index in range(count):
+            job = store.fetch_by_id(job_id)
+            job[field] = index
+            job.save_log(message="{} {}".format(field, index))
+            store.update_job(job, refresh=False)
+
+    threads = [threading.Thread(target=update, args=(store, field, 20))
+               for store, field in zip(stores, ["progress", "status_message"])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    job = stores[1].fetch_by_id(job_id)
+    assert job.progress == 19 and job.status_message == 19, "field updated by another process should be preserved"
+    logs = stores[0].fetch_logs(job_id)
+    assert [seq for seq, _ in logs] == list(range(40))
+    assert [seq for seq, _ in stores[1].fetch_logs(job_id, since=10, limit=5)] == list(range(10, 15))
+
+
+def test_jobs_find(database):
+    store = database.get_store(StoreJobs)
+    created = now()
+    for i, (user, access, process) in enumerate([(1, VISIBILITY_PUBLIC, "a"), (1, VISIBILITY_PRIVATE, "b"),
+                                                 (2, VISIBILITY_PUBLIC, "b"), (2, VISIBILITY_PRIVATE, "a"),
+                                                 (2, VISIBILITY_PUBLIC, "a")]):
+        job = store.save_job(task_id=str(i), process=process, user_id=user, access=access)
+        job.created = created - timedelta(minutes=i)
+        job.status = STATUS_SUCCEEDED
+        store.update_job(job)
+
+    jobs, total = store.find_jobs()
+    assert total == 3 and [job.task_id for job in jobs] == ["0", "2", "4"]
+    jobs, total = store.find_jobs(request=make_request(user_id=1))
+    assert total == 2 and [job.task_id for job in jobs] == ["0", "1"]
+    jobs, total = store.find_jobs(request=make_request(user_id=1, admin=True))
+    assert total == 2 and [job.task_id for job in jobs] == ["0", "1"], "administrator should obtain own jobs"
+    request = make_request(user_id=1, admin=True)
+    jobs, total = store.find_jobs(request=request, access=VISIBILITY_PRIVATE, status=STATUS_SUCCEEDED)
+    assert total == 2 and [job.task_id for job in jobs] == ["1", "3"]
+    jobs, total = store.find_jobs(request=request, access=VISIBILITY_PUBLIC, process="a", sort=SORT_PROCESS)
+    assert total == 2 and {job.task_id for job in jobs} == {"0", "4"}
+
+    jobs, total = store.find_jobs(limit=2)
+    assert total == 3 and len(jobs) == 2
+    cursor = store.make_cursor(jobs[0], SORT_CREATED)
+    jobs, total = store.find_jobs(limit=2, cursor=cursor)
+    assert total == 3 and [job.task_id for job in jobs] == ["2", "4"]
+    with pytest.raises(JobNotFound):
+        store.find_jobs(sort=SORT_PROCESS, cursor=cursor)
+
+    groups, total = store.find_jobs(group_by="process")
+    assert total == 3
+    assert {group["category"]["process"]: group["count"] for group in groups} == {"a": 2, "b": 1}
+    assert all(isinstance(job, Job) for group in groups for job in group["jobs"])
+
+
+def test_quotes_and_bills(database):
+    quotes = database.get_store(StoreQuotes)
+    bills = database.get_store(StoreBills)
+    for i in range(3):
+        quote = quotes.save_quote(Quote(process="proc", user="user", price=float(i), currency="CAD",
+                                        estimatedTime=0, expire=now(), steps=[]))
+        bills.save_bill(Bill(user="user", quote=quote.id, job=str(i), price=float(i), currency="CAD"))
+    items, count = quotes.find_quotes(process_id="proc", limit=2)
+    assert count == 3 and len(items) == 2
+    remaining, count = quotes.find_quotes(process_id="proc", limit=2, cursor=quotes.make_cursor(items[-1]))
+    assert count == 3 and len(remaining) == 1
+    assert {quote.id for quote in items + remaining} == {quote.id for quote in quotes.list_quotes()}
+    with pytest.raises(QuoteNotFound):
+        quotes.fetch_by_id("unknown")
+    items, count = bills.find_bills(quote_id=remaining[0].id)
+    assert count == 1 and items[0].quote == remaining[0].id
+    assert len(bills.list_bills()) == 3
+
+
+def test_get_db_reused_by_process():
+    config = get_test_weaver_config(settings={"weaver.database": "memory"})
+    db = get_db(config)
+    assert get_db(config) is db
+    assert get_db(config, reset_connection=True) is not db
+    db = get_db(config)
+    with mock.patch("weaver.database.os.getpid", return_value=-1):
+        forked_db = get_db(config)
+        assert forked_db is not db
+        assert get_db(config) is forked_db
@@ -1,11 +1,19 @@
 # pylint: disable=C0103,invalid-name
 
 import contextlib
+import errno
+import http.server
 import inspect
 import json
 import os
 import shutil
+import stat
 import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from itertools import islice
 from typing import Type
 from urllib.parse import urlparse
 
@@ -19,7 +27,8 @@ from pyramid.httpexceptions import (
     HTTPGatewayTimeout,
     HTTPInternalServerError,
     HTTPNotFound,
-    HTTPOk
+    HTTPOk,
+    HTTPPartialContent
 )
 from pywps.response.status import WPS_STATUS
 from requests import Response
@@ -29,13 +38,22 @@ from tests.utils import mocked_aws_credentials, mocked_aws_s3, mocked_aws_s3_buc
 from weaver import status, utils
 from weaver.utils import _NullType  # noqa: W0212
 from weaver.utils import (
+    LRUCache,
+    check_file_digest,
+    download_file,
     fetch_file,
+    get_inotify,
     get_path_kvp,
+    get_poll_intervals,
     get_request_options,
+    get_request_session,
+    get_request_session_stats,
+    get_retry_after,
     get_ssl_verify_option,
     make_dirs,
     null,
-    request_extra
+    request_extra,
+    wait_file_change
 )
 
 
@@ -403,6 +421,52 @@ def test_request_extra_allowed_codes():
         assert mocked.call_count == 2
 
 
+@pytest.mark.parametrize("header, delay", [
+    (None, None),
+    ("120", 120),
+    ("invalid", None),
+    (format_datetime(datetime.now(timezone.utc) - timedelta(minutes=1), usegmt=True), 0),
+])
+def test_get_retry_after(header, delay):
+    headers = {"Retry-After": header} if header else {}
+    assert get_retry_after(mock.Mock(headers=headers)) == delay
+
+
+def test_get_retry_after_date():
+    header = format_datetime(datetime.now(timezone.utc) + timedelta(minutes=2), usegmt=True)
+    assert 60 < get_retry_after(mock.Mock(headers={"Retry-After": header})) <= 120
+
+
+def test_get_poll_intervals():
+    assert list(islice(get_poll_intervals({}), 10)) == [2, 3, 4.5, 6.75, 10.125, 15.1875, 22.78125, 30, 30, 30]
+    settings = {"weaver.remote_job_poll_min_interval": 5, "weaver.remote_job_poll_max_interval": 1}
+    assert list(islice(get_poll_intervals(settings), 2)) == [5, 5], "maximum should not be lower than minimum"
+
+
+def test_request_extra_ssl_verify():
+    """Verifies that SSL verification is enabled unless explicitly disabled, and applied to the matching session."""
+    def mocked_request(*_, **__):
+        mocked_resp = Response()
+        mocked_resp.status_code = HTTPOk.code
+        return mocked_resp
+
+    cases = [
+        ({}, {}, True),
+        ({}, {"verify": False}, False),
+        ({}, {"verify": "/etc/ssl/ca-bundle.pem"}, "/etc/ssl/ca-bundle.pem"),
+        ({}, {"ssl_verify": False}, False),
+        ({"weaver.ssl_verify": False}, {}, False),
+        ({"weaver.ssl_verify": False}, {"verify": True}, False),
+    ]
+    for settings, kwargs, verify in cases:
+        with mock.patch("requests.Session.request", side_effect=mocked_request) as mocked:
+            request_extra("get", "https://whatever", settings=settings, **kwargs)
+        assert mocked.call_args[1]["verify"] == verify
+        assert get_request_session("https://whatever", settings, verify=verify).verify == verify
+    session = get_request_session("https://whatever", verify=True)
+    assert get_request_session("https://whatever", verify=False) is not session
+
+
 def test_get_request_options():
     assert get_request_options("get", "http://test.com", {
         "weaver.request_options": {"requests": [
@@ -460,6 +524,136 @@ def test_request_extra_intervals():
             assert all(called == expect for called, expect in zip(sleep_counter["called_with"], intervals))
 
 
+def test_get_request_session_shared():
+    session = get_request_session("https://test.com/path")
+    assert get_request_session("https://test.com/other") is session
+    assert get_request_session("https://other.com/path") is not session
+    assert get_request_session("https://test.com/path", verify=False) is not session
+    assert get_request_session("https://test.com/path", {"weaver.request_keep_alive": "false"}) is not session
+
+
+def test_request_extra_request_options_applied():
+    """Verifies that matched *request options* and SSL verification are passed down to the request."""
+    settings = {"weaver.request_options": {"requests": [{"url": "http://test.com/*", "timeout": 30, "verify": False}]}}
+    response = Response()
+    response.status_code = HTTPOk.code
+    with mock.patch("requests.Session.request", return_value=response) as mocked_request:
+        request_extra("get", "http://test.com/path", settings=settings)
+    assert mocked_request.call_args[1]["timeout"] == 30
+    assert mocked_request.call_args[1]["verify"] is False
+
+
+def test_request_extra_reuse_connection():
+    """
+    Verifies that successive requests to the same host reuse the kept-alive connection of the shared session, without
+    keeping cookies returned by responses.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802
+            self.send_response(HTTPOk.code)
+            self.send_header("Content-Length", "2")
+            self.send_header("Set-Cookie", "token=secret")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *_):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = "http://127.0.0.1:{}/".format(server.server_address[1])
+        before = get_request_session_stats()
+        for _ in range(3):
+            assert request_extra("get", url).content == b"ok"
+        after = get_request_session_stats()
+        assert after["requests"] - before["requests"] == 3
+        assert after["connections"] - before["connections"] == 1
+        assert after["reused"] - before["reused"] == 2
+        assert not get_request_session(url).cookies, "cookies should not be persisted by shared sessions"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("modified", [False, True])
+def test_download_file_resume(tmp_path, modified):
+    """
+    Verifies that an interrupted download is resumed from the received size with a ``Range`` request conditional to
+    the file version, and restarted from the beginning if the file was modified in the meantime.
+    """
+    versions = {"\"v1\"": b"0123456789" * 100, "\"v2\"": b"abcdefghij" * 100}
+    current = ["\"v1\""]
+    requests_headers = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802
+            requests_headers.append((self.headers.get("Range"), self.headers.get("If-Range")))
+            content = versions[current[0]]
+            if self.headers.get("Range") and self.headers.get("If-Range") == current[0]:
+                start = int(self.headers["Range"].split("=")[-1].rstrip("-"))
+                self.send_response(HTTPPartialContent.code)
+                self.send_header("ETag", current[0])
+                self.send_header("Content-Range", "bytes {}-{}/{}".format(start, len(content) - 1, len(content)))
+                self.send_header("Content-Length", str(len(content) - start))
+                self.end_headers()
+                self.wfile.write(content[start:])
+            elif len(requests_headers) == 1:
+                # send only the first chunk, then drop the connection
+                self.send_response(HTTPOk.code)
+                self.send_header("ETag", current[0])
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.wfile.write(b"%x\r\n%s\r\n" % (400, content[:400]))
+                self.close_connection = True
+                if modified:
+                    current[0] = "\"v2\""
+            else:
+                self.send_response(HTTPOk.code)
+                self.send_header("ETag", current[0])
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        def log_message(self, *_):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        file_path = os.path.join(str(tmp_path), "data.txt")
+        version = download_file("http://127.0.0.1:{}/data.txt".format(server.server_address[1]), file_path)
+        with open(file_path, "rb") as file:
+            assert file.read() == versions[current[0]]
+        assert version == current[0], "version of the downloaded content should be returned"
+        assert requests_headers == [(None, None), ("bytes=400-", "\"v1\"")]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_check_file_digest(tmp_path):
+    file_path = os.path.join(str(tmp_path), "data.txt")
+    with open(file_path, "w") as file:
+        file.write("data")
+    sha256 = "Om6weQ85rIfJTzhWst0sXREOaBFgImGpqSPTuyOtyLc="
+    check_file_digest(file_path, {})
+    check_file_digest(file_path, {"Digest": "sha-256={}".format(sha256)})
+    check_file_digest(file_path, {"Digest": "unknown=abc, SHA-256={}".format(sha256)})
+    with pytest.raises(IOError):
+        check_file_digest(file_path, {"Digest": "sha-256=invalid"})
+    with pytest.raises(IOError):
+        check_file_digest(file_path, {"Digest": "md5=invalid"})
+
+
 def test_fetch_file_local_with_protocol():
     """
     Test function :func:`weaver.utils.fetch_file` when the reference is a pre-fetched local file.
@@ -528,6 +722,92 @@ def test_fetch_file_remote_with_request():
             shutil.rmtree(res_dir, ignore_errors=True)
 
 
+def test_fetch_file_input_cache(tmp_path):
+    """
+    Test function :func:`weaver.utils.fetch_file` reusing files of the input cache while their version is unchanged.
+    """
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    settings = {"weaver.input_cache_dir": cache_dir, "weaver.input_cache_size": 1}
+    versions = {"http://test.com/data.nc": "v1", "http://test.com/other.nc": "v1"}
+
+    def mock_download(url, path, **__):
+        with open(path, "w") as file:
+            file.write("{} {}".format(url, versions[url]))
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch("weaver.utils.get_remote_file_version",
+                                       side_effect=lambda url, **_: versions[url]))
+        mocked_download = stack.enter_context(mock.patch("weaver.utils.download_file", side_effect=mock_download))
+        paths = []
+        for job in ["job1", "job2"]:
+            job_dir = os.path.join(str(tmp_path), job)
+            make_dirs(job_dir)
+            paths.append(fetch_file("http://test.com/data.nc", job_dir, settings=settings))
+        assert mocked_download.call_count == 1, "second job should reuse the cached file"
+        assert all(open(path).read() == "http://test.com/data.nc v1" for path in paths)
+        assert os.stat(paths[0]).st_ino == os.stat(paths[1]).st_ino
+
+        versions["http://test.com/data.nc"] = "v2"
+        path = fetch_file("http://test.com/data.nc", os.path.join(str(tmp_path), "job1"), settings=settings)
+        assert mocked_download.call_count == 2, "modified file should be fetched again"
+        assert open(path).read() == "http://test.com/data.nc v2"
+
+        # exceeding cache size removes least recently used files, but they remain available to jobs
+        settings["weaver.input_cache_size"] = 30 / 2 ** 20
+        fetch_file("http://test.com/other.nc", os.path.join(str(tmp_path), "job2"), settings=settings)
+        cached = [name for _, _, files in os.walk(cache_dir) for name in files]
+        assert cached == ["other.nc"]
+        assert open(path).read() == "http://test.com/data.nc v2"
+        assert not os.stat(path).st_mode & stat.S_IWUSR, "cached files shared by jobs should be read-only"
+
+        # file exceeding the cache size by itself is still placed for the job that fetched it
+        settings["weaver.input_cache_size"] = 1 / 2 ** 20
+        versions["http://test.com/data.nc"] = "v3"
+        path = fetch_file("http://test.com/data.nc", os.path.join(str(tmp_path), "job1"), settings=settings)
+        assert open(path).read() == "http://test.com/data.nc v3"
+
+        # cache located on another device is copied instead of linked
+        settings["weaver.input_cache_size"] = 1
+        with mock.patch("weaver.utils.os.link", side_effect=OSError(errno.EXDEV, "cross-device link")):
+            path = fetch_file("http://test.com/other.nc", os.path.join(str(tmp_path), "job1"), settings=settings)
+        assert open(path).read() == "http://test.com/other.nc v1"
+        assert not os.path.islink(path), "file must remain available to the job after its removal from the cache"
+        assert os.stat(path).st_mode & stat.S_IWUSR
+        assert mocked_download.call_count == 5
+
+
+def test_fetch_file_input_cache_modified_before_download(tmp_path):
+    """
+    Test function :func:`weaver.utils.fetch_file` caching a file under the version of its downloaded content when it
+    was modified after its version was obtained to look up the cache.
+    """
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    settings = {"weaver.input_cache_dir": cache_dir, "weaver.input_cache_size": 1}
+    job_dir = os.path.join(str(tmp_path), "job")
+    make_dirs(job_dir)
+
+    def mock_download(url, path, **__):
+        with open(path, "w") as file:
+            file.write("{} v2".format(url))
+        return "v2"
+
+    with contextlib.ExitStack() as stack:
+        mocked_version = stack.enter_context(mock.patch("weaver.utils.get_remote_file_version", return_value="v1"))
+        mocked_download = stack.enter_context(mock.patch("weaver.utils.download_file", side_effect=mock_download))
+        path = fetch_file("http://test.com/data.nc", job_dir, settings=settings)
+        assert open(path).read() == "http://test.com/data.nc v2"
+        assert [name for _, _, files in os.walk(cache_dir) for name in files] == ["data.nc"]
+
+        mocked_version.return_value = "v2"
+        path = fetch_file("http://test.com/data.nc", job_dir, settings=settings)
+        assert mocked_download.call_count == 1, "downloaded content should be cached under its own version"
+        assert open(path).read() == "http://test.com/data.nc v2"
+
+        mocked_version.return_value = "v1"
+        fetch_file("http://test.com/data.nc", job_dir, settings=settings)
+        assert mocked_download.call_count == 2, "content of another version should not be cached under the old one"
+
+
 @mocked_aws_credentials
 @mocked_aws_s3
 def test_fetch_file_remote_s3_bucket():
@@ -546,3 +826,86 @@ def test_fetch_file_remote_s3_bucket():
 def test_get_path_kvp():
     res = get_path_kvp("http://localhost", test1="value1", test2=["sub1", "sub2"])
     assert res == "http://localhost?test1=value1&test2=sub1,sub2"
+
+
+def test_lru_cache():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # 'b' becomes least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.pop("a") == 1
+    assert cache.get("a", null) is null
+    assert len(cache) == 1
+
+
+def test_lru_cache_expire():
+    cache = LRUCache(expire=10)
+    with mock.patch("weaver.utils.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with mock.patch("weaver.utils.time.monotonic", return_value=105):
+        assert cache.get("a") == 1
+    with mock.patch("weaver.utils.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_wait_file_change():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "status.xml")
+        assert wait_file_change(path, timeout=0.1, interval=0.01) is None  # not yet created
+        with open(path, "w") as file:
+            file.write("accepted")
+        signature = wait_file_change(path, timeout=0.1, interval=0.01)
+        assert signature is not None
+        assert wait_file_change(path, signature, timeout=0.1, interval=0.01) is None
+        with open(path, "w") as file:
+            file.write("running")
+        changed = wait_file_change(path, signature, timeout=0.1, interval=0.01)
+        assert changed is not None and changed != signature
+
+
+@pytest.mark.skipif(get_inotify() is None, reason="File system notifications not available")
+def test_wait_file_change_notified(tmp_path):
+    """
+    Verifies that file modifications are detected as soon as notified, regardless of the verification interval.
+    """
+    path = os.path.join(str(tmp_path), "status.xml")
+
+    def write_status():
+        time.sleep(0.2)
+        with open(path, "w") as file:
+            file.write("running")
+
+    thread = threading.Thread(target=write_status)
+    start = time.monotonic()
+    thread.start()
+    try:
+        assert wait_file_change(path, timeout=10, interval=10) is not None
+        assert time.monotonic() - start < 5, "modification should be notified instead of waiting the interval"
+    finally:
+        thread.join()
+
+
+def test_wait_file_change_polling(tmp_path):
+    """
+    Verifies that file modifications are detected by periodic verifications when notifications are not available.
+    """
+    path = os.path.join(str(tmp_path), "status.xml")
+
+    def write_status():
+        time.sleep(0.1)
+        with open(path, "w") as file:
+            file.write("running")
+
+    thread = threading.Thread(target=write_status)
+    with mock.patch("weaver.utils.watch_file_events", return_value=None) as mocked_watch:
+        thread.start()
+        try:
+            assert wait_file_change(path, timeout=10, interval=0.01) is not None
+        finally:
+            thread.join()
+    assert mocked_watch.call_count == 1
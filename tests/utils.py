@@ -93,9 +93,15 @@ def setup_config_from_settings(settings=None):
 
 def setup_config_with_mongodb(config=None, settings=None):
     # type: (Optional[Configurator], Optional[SettingsType]) -> Configurator
-    """Prepares the configuration in order to allow calls to a ``MongoDB`` test database."""
+    """
+    Prepares the configuration in order to allow calls to a ``MongoDB`` test database.
+
+    Another database type can be selected with ``WEAVER_TEST_DB_TYPE`` (e.g.: ``memory`` or ``sqlite``).
+    """
     settings = settings or {}
     settings.update({
+        "weaver.database":  os.getenv("WEAVER_TEST_DB_TYPE", "mongodb"),       # noqa: E241
+        "weaver.database_path": os.getenv("WEAVER_TEST_DB_PATH", ""),
         "mongodb.host":     os.getenv("WEAVER_TEST_DB_HOST", "127.0.0.1"),      # noqa: E241
         "mongodb.port":     os.getenv("WEAVER_TEST_DB_PORT", "27017"),          # noqa: E241
         "mongodb.db_name":  os.getenv("WEAVER_TEST_DB_NAME", "weaver-test"),    # noqa: E241
@@ -1,6 +1,11 @@
+import tempfile
+
 import mock
+from requests import Response
 
-from weaver.wps.utils import set_wps_language
+from tests.resources import WPS_CAPS_EMU_XML
+from weaver.utils import LRUCache
+from weaver.wps.utils import check_wps_status, get_wps_client, get_wps_document, set_wps_language
 
 
 def test_set_wps_language():
@@ -12,3 +17,79 @@ def test_set_wps_language():
 
     set_wps_language(wps, "ru, fr;q=0.5")
     assert wps.language == "fr-CA"
+
+
+def test_check_wps_status_local_file():
+    status_xml = """<?xml version="1.0" encoding="UTF-8"?>
+    <wps:ExecuteResponse xmlns:wps="http://www.opengis.net/wps/1.0.0" xmlns:ows="http://www.opengis.net/ows/1.1"
+                         service="WPS" version="1.0.0" statusLocation="http://localhost/wpsoutputs/status.xml">
+      <wps:Process><ows:Identifier>test</ows:Identifier></wps:Process>
+      <wps:Status creationTime="2020-01-01T00:00:00Z">
+        <wps:ProcessStarted percentCompleted="50">running</wps:ProcessStarted>
+      </wps:Status>
+    </wps:ExecuteResponse>
+    """.strip()
+    with tempfile.NamedTemporaryFile("w", suffix=".xml") as status_file:
+        status_file.write(status_xml)
+        status_file.flush()
+        with mock.patch("weaver.wps.utils.request_extra") as mocked_request:
+            execution = check_wps_status(location=status_file.name, sleep_secs=0, settings={})
+        assert not mocked_request.called, "local status file should be read directly"
+        assert execution.getStatus() == "ProcessStarted"
+        assert execution.percentCompleted == 50
+
+
+def make_xml_response(content, status_code=200, headers=None):
+    resp = Response()
+    resp.status_code = status_code
+    resp._content = content  # noqa: W0212
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_get_wps_document_cached_and_revalidated():
+    with open(WPS_CAPS_EMU_XML, "rb") as caps_file:
+        caps = caps_file.read()
+    params = {"service": "WPS", "request": "GetCapabilities"}
+    settings = {"weaver.wps_client_cache_expire": 10}
+    with mock.patch("weaver.wps.utils._WPS_DOCUMENT_CACHE", LRUCache()), \
+            mock.patch("weaver.wps.utils.request_extra",
+                       return_value=make_xml_response(caps, headers={"ETag": "abc"})) as mocked_request:
+        with mock.patch("weaver.wps.utils.time.monotonic", return_value=100):
+            assert get_wps_document("http://example.com/wps", params, container=settings) == caps
+            assert get_wps_document("http://example.com/wps", params, container=settings) == caps
+            assert mocked_request.call_count == 1
+            get_wps_document("http://example.com/wps", params, headers={"Cookie": "auth"}, container=settings)
+            assert mocked_request.call_count == 2, "different request headers must not share documents"
+
+        mocked_request.return_value = make_xml_response(b"", status_code=304)
+        with mock.patch("weaver.wps.utils.time.monotonic", return_value=111):
+            assert get_wps_document("http://example.com/wps", params, container=settings) == caps
+            assert mocked_request.call_count == 3
+            assert mocked_request.call_args[1]["headers"] == {"If-None-Match": "abc"}
+        with mock.patch("weaver.wps.utils.time.monotonic", return_value=115):
+            assert get_wps_document("http://example.com/wps", params, container=settings) == caps
+            assert mocked_request.call_count == 3, "revalidated document should be valid for another period"
+
+
+def test_get_wps_document_exception_report_not_cached():
+    report = b"""<ows:ExceptionReport xmlns:ows="http://www.opengis.net/ows/1.1" version="1.0.0">
+    <ows:Exception exceptionCode="NoApplicableCode"/></ows:ExceptionReport>"""
+    params = {"service": "WPS", "request": "GetCapabilities"}
+    with mock.patch("weaver.wps.utils._WPS_DOCUMENT_CACHE", LRUCache()), \
+            mock.patch("weaver.wps.utils.request_extra", return_value=make_xml_response(report)) as mocked_request:
+        get_wps_document("http://example.com/wps", params)
+        get_wps_document("http://example.com/wps", params)
+        assert mocked_request.call_count == 2
+
+
+def test_get_wps_client_cached_capabilities():
+    with open(WPS_CAPS_EMU_XML, "rb") as caps_file:
+        caps = caps_file.read()
+    with mock.patch("weaver.wps.utils._WPS_DOCUMENT_CACHE", LRUCache()), \
+            mock.patch("weaver.wps.utils.request_extra", return_value=make_xml_response(caps)) as mocked_request:
+        for _ in range(3):
+            wps = get_wps_client("http://example.com/wps?service=WPS")
+            assert "wordcounter" in [process.identifier for process in wps.processes]
+        assert mocked_request.call_count == 1
+        assert mocked_request.call_args[1]["params"]["request"] == "GetCapabilities"
@@ -32,6 +32,7 @@ from weaver.status import (
 from weaver.utils import get_path_kvp
 from weaver.visibility import VISIBILITY_PRIVATE, VISIBILITY_PUBLIC
 from weaver.warning import TimeZoneInfoAlreadySetWarning
+from weaver.wps.utils import CachedWebProcessingService
 from weaver.wps_restapi.swagger_definitions import jobs_full_uri, jobs_short_uri, process_jobs_uri
 
 if TYPE_CHECKING:
@@ -153,6 +154,7 @@ class WpsRestApiJobsTest(unittest.TestCase):
         mock_processes.return_value = processes
         return tuple([
             mock.patch.object(WebProcessingService, "getcapabilities", new=lambda *args, **kwargs: None),
+            mock.patch.object(CachedWebProcessingService, "getcapabilities", new=lambda *args, **kwargs: None),
             mock.patch.object(WebProcessingService, "processes", new_callable=mock_processes, create=True),
         ])
 
@@ -510,3 +512,28 @@ class WpsRestApiJobsTest(unittest.TestCase):
                 job_match = all(job in job_ids for job in resp.json["jobs"])
                 test_values = dict(path=path, access=access, user_id=user_id)
                 assert job_match, self.message_with_jobs_diffs(resp.json["jobs"], job_ids, test_values, index=i)
+
+    def test_get_job_logs_paged(self):
+        job = self.job_info[0]
+        for i in range(5):
+            job.save_log(message="log entry {}".format(i))
+        self.job_store.update_job(job)
+        path = "{}/{}/logs".format(jobs_short_uri, job.id)
+
+        resp = self.app.get(path, headers=self.json_headers)
+        assert resp.status_code == 200
+        assert len(resp.json) == 5
+        assert all("log entry {}".format(i) in log for i, log in enumerate(resp.json))
+        assert "Link" not in resp.headers
+
+        resp = self.app.get(get_path_kvp(path, since=1, limit=2), headers=self.json_headers)
+        assert resp.status_code == 200
+        assert len(resp.json) == 2
+        assert "log entry 1" in resp.json[0] and "log entry 2" in resp.json[1]
+        assert "since=3" in resp.headers["Link"]
+
+        resp = self.app.get(get_path_kvp(path, since=3, limit=2), headers=self.json_headers)
+        assert "log entry 3" in resp.json[0] and "log entry 4" in resp.json[1]
+
+        resp = self.app.get(get_path_kvp(path, since=-1), headers=self.json_headers, expect_errors=True)
+        assert resp.status_code == 400
@@ -0,0 +1,84 @@
+import time
+import unittest
+
+import mock
+import pyramid.testing
+
+from tests.utils import get_test_weaver_app, setup_config_with_mongodb, setup_mongodb_servicestore
+from weaver.config import WEAVER_CONFIGURATION_EMS
+from weaver.datatype import Service
+from weaver.formats import CONTENT_TYPE_APP_JSON
+
+
+class WpsProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        settings = {
+            "weaver.url": "",
+            "weaver.wps_path": "/ows/wps",
+            "weaver.configuration": WEAVER_CONFIGURATION_EMS,
+            "weaver.provider_request_timeout": 1,
+        }
+        config = setup_config_with_mongodb(settings=settings)
+        self.service_store = setup_mongodb_servicestore(config)
+        for name in ["provider-ok", "provider-slow", "provider-error", "provider-other"]:
+            service = Service(name=name, url="https://{}.example.com/wps".format(name), public=True)
+            self.service_store.save_service(service)
+        self.app = get_test_weaver_app(config=config)
+        self.json_headers = {"Accept": CONTENT_TYPE_APP_JSON, "Content-Type": CONTENT_TYPE_APP_JSON}
+
+    def tearDown(self):
+        self.service_store.clear_services()
+        pyramid.testing.tearDown()
+
+    @staticmethod
+    def mock_provider_client(service, *_, **__):
+        if service.name == "provider-slow":
+            time.sleep(3)
+        if service.name == "provider-error":
+            raise ValueError("provider failure")
+        return mock.Mock(identification=mock.Mock(title=service.name, abstract=""), processes=[])
+
+    def test_get_providers_partial_results(self):
+        """
+        Providers that fail or exceed the timeout are omitted without delaying the others beyond the timeout.
+        """
+        with mock.patch("weaver.wps_restapi.providers.providers.get_provider_client",
+                        side_effect=self.mock_provider_client):
+            start = time.monotonic()
+            resp = self.app.get("/providers", headers=self.json_headers)
+            elapsed = time.monotonic() - start
+        assert resp.status_code == 200
+        assert [prov["id"] for prov in resp.json["providers"]] == ["provider-ok", "provider-other"]
+        assert elapsed < 3
+
+    def test_get_processes_with_providers(self):
+        """
+        Providers processes are obtained directly without requests to the application itself.
+        """
+        with mock.patch("weaver.wps_restapi.providers.providers.get_provider_client",
+                        side_effect=self.mock_provider_client), \
+                mock.patch("weaver.wps_restapi.processes.processes.get_provider_client",
+                           side_effect=self.mock_provider_client), \
+                mock.patch("weaver.utils.request_extra") as mocked_request:
+            resp = self.app.get("/processes", params={"providers": "true"}, headers=self.json_headers)
+        assert resp.status_code == 200
+        assert [prov["id"] for prov in resp.json["providers"]] == ["provider-ok", "provider-other"]
+        assert all(prov["processes"] == [] for prov in resp.json["providers"])
+        assert not mocked_request.called
+
+    def test_get_providers_timeout_from_query_start(self):
+        """
+        Providers queued behind others when workers are exhausted are given the full timeout once they are queried.
+        """
+        def mock_provider_client(service, container, headers):
+            assert isinstance(container, dict), "request should not be shared across threads"
+            assert isinstance(headers, dict)
+            time.sleep(0.4)
+            return mock.Mock(identification=mock.Mock(title=service.name, abstract=""), processes=[])
+
+        self.app.app.registry.settings["weaver.provider_request_workers"] = 1
+        with mock.patch("weaver.wps_restapi.providers.providers.get_provider_client",
+                        side_effect=mock_provider_client):
+            resp = self.app.get("/providers", headers=self.json_headers)
+        assert resp.status_code == 200
+        assert len(resp.json["providers"]) == 4
@@ -11,6 +11,7 @@ from pyramid.config import Configurator
 
 from weaver import __meta__
 from weaver.config import WEAVER_DEFAULT_REQUEST_OPTIONS_CONFIG, get_weaver_config_file, get_weaver_configuration
+from weaver.formats import load_media_types_registry
 from weaver.processes.builtin import register_builtin_processes
 from weaver.processes.utils import register_wps_processes_from_config
 from weaver.utils import get_settings, parse_extra_options, setup_loggers
@@ -39,6 +40,8 @@ def main(global_config, **settings):
         with open(req_file, "r") as f:
             settings.update({"weaver.request_options": yaml.safe_load(f)})
 
+    load_media_types_registry(settings)
+
     local_config = Configurator(settings=settings)
     if global_config.get("__file__") is not None:
         local_config.include("pyramid_celery")
@@ -0,0 +1,81 @@
+"""
+Administration commands of `Weaver` operating on its configured application.
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import TYPE_CHECKING
+
+from pyramid.paster import get_appsettings
+
+from weaver.database.mongodb import get_mongodb_connection, get_mongodb_engine, get_mongodb_index_report
+from weaver.formats import update_media_types_registry
+
+LOGGER = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from typing import List, Optional
+
+
+def indexes(settings, create=False):
+    # type: (dict, bool) -> int
+    """
+    Prints the report of database indexes, optionally creating missing ones beforehand.
+
+    :returns: exit code, ``1`` if some expected indexes are missing from the database, ``0`` otherwise.
+    """
+    if create:
+        LOGGER.info("Creating missing database indexes...")
+        db = get_mongodb_engine(settings)
+    else:
+        db = get_mongodb_connection(settings)
+    report = get_mongodb_index_report(db, settings)
+    print(json.dumps(report, indent=2))
+    return int(any(info["missing"] for info in report.values()))
+
+
+def media_types(settings, output=None):
+    # type: (dict, Optional[str]) -> int
+    """
+    Updates the `IANA` media-types registry file employed to resolve formats from the live registry.
+
+    :returns: exit code, ``1`` if no file is defined by argument or by setting ``weaver.media_types_file``, ``0``
+        otherwise.
+    """
+    output = output or settings.get("weaver.media_types_file")
+    if not output:
+        LOGGER.error("Missing output file argument or setting 'weaver.media_types_file'.")
+        return 1
+    count = update_media_types_registry(output, settings=settings)
+    LOGGER.info("Updated media-types registry [%s] with %s media-types.", output, count)
+    return 0
+
+
+def main(args=None):
+    # type: (Optional[List[str]]) -> int
+    parser = argparse.ArgumentParser(prog="weaver", description=__doc__)
+    parser.add_argument("-c", "--config", required=True, metavar="INI",
+                        help="Application INI configuration file (e.g.: 'config/weaver.ini').")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+    idx_parser = commands.add_parser(
+        "indexes", help="Report missing, undeclared and unused indexes of database collections."
+    )
+    idx_parser.add_argument("--create", action="store_true",
+                            help="Create missing indexes before reporting them.")
+    mt_parser = commands.add_parser(
+        "media-types", help="Update the IANA media-types registry file employed to resolve formats."
+    )
+    mt_parser.add_argument("--output", metavar="FILE",
+                           help="Registry file to write (default: setting 'weaver.media_types_file').")
+    ns = parser.parse_args(args)
+    settings = get_appsettings(ns.config)
+    if ns.command == "indexes":
+        return indexes(settings, create=ns.create)
+    if ns.command == "media-types":
+        return media_types(settings, output=ns.output)
+    return 1  # pragma: no cover
+
+
+if __name__ == "__main__":
+    sys.exit(main())
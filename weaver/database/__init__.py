@@ -1,32 +1,62 @@
 import logging
+import os
 from typing import TYPE_CHECKING
 
 from pyramid.registry import Registry
 from pyramid.request import Request
 from pyramid.settings import asbool
 
+from weaver.database.memory import MemoryDatabase, SQLiteDatabase
 from weaver.database.mongodb import MongoDatabase
 from weaver.utils import get_registry, get_settings
 
 LOGGER = logging.getLogger(__name__)
 if TYPE_CHECKING:
+    from typing import Type, Union
+    from weaver.database.base import DatabaseInterface
     from weaver.typedefs import AnySettingsContainer
 
+    AnyDatabase = Union[MongoDatabase, MemoryDatabase, SQLiteDatabase]
+
+DATABASE_TYPES = frozenset([MongoDatabase, MemoryDatabase, SQLiteDatabase])
+
+
+def get_database_type(container):
+    # type: (AnySettingsContainer) -> Type[DatabaseInterface]
+    """
+    Obtains the database implementation selected by setting ``weaver.database`` (default: ``mongodb``).
+
+    :raises ValueError: if the setting does not refer to a known database type.
+    """
+    db_type = get_settings(container).get("weaver.database") or MongoDatabase.type
+    for database in DATABASE_TYPES:
+        if database.type == db_type:
+            return database
+    raise ValueError("Unknown database type '{}' in setting 'weaver.database', expected one of {}.".format(
+        db_type, sorted(database.type for database in DATABASE_TYPES)
+    ))
+
 
 def get_db(container, reset_connection=False):
-    # type: (AnySettingsContainer, bool) -> MongoDatabase
+    # type: (AnySettingsContainer, bool) -> AnyDatabase
     """
     Obtains the database connection from configured application settings.
 
     If :paramref:`reset_connection` is ``True``, the :paramref:`container` must be the application :class:`Registry` or
     any container that can retrieve it to accomplish reference reset. Otherwise, any settings container can be provided.
+
+    The database connection is kept in the registry when available to be reused by following calls of the process that
+    created it. A forked process (e.g.: `Celery` worker) obtains its own connection on first call instead of the one
+    inherited from its parent process.
     """
     registry = get_registry(container, nothrow=True)
-    if not reset_connection and registry and registry.db:
-        return registry.db
-    database = MongoDatabase(container)
+    database = getattr(registry, "db", None)
+    if not reset_connection and database and database.pid == os.getpid():
+        return database
     if reset_connection:
         registry = get_registry(container)
+    database = get_database_type(container)(container)
+    if registry is not None:
         registry.db = database
     return database
 
@@ -37,9 +67,10 @@ def includeme(config):
         LOGGER.info("Skipping database when building docs...")
         return
 
-    LOGGER.info("Adding database...")
+    database_type = get_database_type(settings)
+    LOGGER.info("Adding database [%s]...", database_type.type)
 
     def _add_db(request):
-        return MongoDatabase(request.registry)
+        return get_db(request.registry)
 
     config.add_request_method(_add_db, "db", reify=True)
@@ -1,4 +1,5 @@
 import abc
+import os
 from typing import TYPE_CHECKING
 
 from weaver.store.base import StoreInterface
@@ -11,12 +12,13 @@ if TYPE_CHECKING:
 
 class DatabaseInterface(metaclass=abc.ABCMeta):
     """Return the unique identifier of db type matching settings."""
-    __slots__ = ["type"]
+    __slots__ = ["type", "pid"]
 
     def __init__(self, _):
         # type: (AnySettingsContainer) -> None
         if not self.type:  # pylint: disable=E1101,no-member
             raise NotImplementedError("Database 'type' must be overridden in inheriting class.")
+        self.pid = os.getpid()  # process that created the database connection
 
     @staticmethod
     def _get_store_type(store_type):
@@ -0,0 +1,171 @@
+"""
+Databases that do not require an external server, keeping data in memory or in a local `SQLite` file.
+"""
+import os
+import sqlite3
+import threading
+import warnings
+from typing import TYPE_CHECKING
+
+from weaver.database.base import DatabaseInterface
+from weaver.store.base import StoreInterface
+from weaver.store.memory import (
+    MemoryBillStore,
+    MemoryJobStore,
+    MemoryLogTable,
+    MemoryProcessStore,
+    MemoryQuoteStore,
+    MemoryServiceStore,
+    MemoryTable,
+    SQLiteLogTable,
+    SQLiteTable
+)
+from weaver.utils import get_settings
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Tuple, Type, Union
+    from weaver.typedefs import AnySettingsContainer, JSON
+
+MemoryStores = frozenset([
+    MemoryServiceStore,
+    MemoryProcessStore,
+    MemoryJobStore,
+    MemoryQuoteStore,
+    MemoryBillStore,
+])
+
+if TYPE_CHECKING:
+    # pylint: disable=E0601,used-before-assignment
+    AnyMemoryStore = Union[MemoryStores]
+
+# tables shared by every database instance of the current process to preserve data across connection resets
+_MEMORY_TABLES = {}  # type: Dict[str, Union[MemoryTable, MemoryLogTable]]
+_MEMORY_LOCK = threading.Lock()
+# connections are not shared with forked processes since SQLite locks cannot be inherited safely
+_SQLITE_CONNECTIONS = {}  # type: Dict[Tuple[str, int], Tuple[sqlite3.Connection, threading.RLock]]
+
+
+class MemoryDatabase(DatabaseInterface):
+    """
+    Database keeping all data in memory of the current process.
+
+    Data is lost when the process terminates and is not shared between processes (e.g.: web and `Celery` workers).
+    It is therefore only appropriate for development, tests, or deployments running all jobs synchronously.
+    """
+    _settings = None
+    _stores = None
+    type = "memory"
+
+    def __init__(self, container):
+        # type: (AnySettingsContainer) -> None
+        super(MemoryDatabase, self).__init__(container)
+        self._settings = get_settings(container)
+        self._stores = dict()
+
+    def get_table(self, name):
+        # type: (str) -> MemoryTable
+        """
+        Obtains the table of documents with given name, created if missing.
+        """
+        with _MEMORY_LOCK:
+            return _MEMORY_TABLES.setdefault(name, MemoryTable())
+
+    def get_log_table(self, name):
+        # type: (str) -> MemoryLogTable
+        """
+        Obtains the table of log entries with given name, created if missing.
+        """
+        with _MEMORY_LOCK:
+            return _MEMORY_TABLES.setdefault(name, MemoryLogTable())
+
+    def reset_store(self, store_type):
+        store_type = self._get_store_type(store_type)
+        return self._stores.pop(store_type, None)
+
+    def get_store(self, store_type, *store_args, **store_kwargs):
+        # type: (Union[str, Type[StoreInterface], AnyMemoryStore], *Any, **Any) -> AnyMemoryStore
+        """
+        Retrieve a store from the database.
+
+        :param store_type: type of the store to retrieve/create.
+        :param store_args: additional arguments to pass down to the store.
+        :param store_kwargs: additional keyword arguments to pass down to the store.
+        """
+        store_type = self._get_store_type(store_type)
+
+        for store in MemoryStores:
+            if store.type == store_type:
+                if store_type not in self._stores:
+                    if "settings" not in store_kwargs:
+                        store_kwargs["settings"] = self._settings
+                    if store is MemoryJobStore:
+                        store_kwargs["log_table"] = self.get_log_table("job_log_entries")
+                    self._stores[store_type] = store(
+                        table=self.get_table(store_type),
+                        *store_args, **store_kwargs
+                    )
+                return self._stores[store_type]
+        raise NotImplementedError("Database '{}' cannot find matching store '{}'.".format(self.type, store_type))
+
+    def get_session(self):
+        # type: (...) -> Any
+        return None
+
+    def get_information(self):
+        # type: (...) -> JSON
+        """
+        :returns: {'version': version, 'type': db_type}
+        """
+        return {"version": None, "type": self.type}
+
+    def is_ready(self):
+        # type: (...) -> bool
+        return self._settings is not None
+
+    def run_migration(self):
+        # type: (...) -> None
+        warnings.warn("Not implemented {}.run_migration implementation.".format(self.type))
+
+
+class SQLiteDatabase(MemoryDatabase):
+    """
+    Database persisting data in a local `SQLite` file defined by setting ``weaver.database_path``.
+
+    Every process using the same file shares the data, which makes it suitable for single-node deployments.
+    """
+    _path = None
+    type = "sqlite"
+
+    def __init__(self, container):
+        # type: (AnySettingsContainer) -> None
+        super(SQLiteDatabase, self).__init__(container)
+        self._path = self._settings.get("weaver.database_path") or ":memory:"
+        if self._path == ":memory:":
+            warnings.warn("Setting 'weaver.database_path' not defined, SQLite data will not be persisted.")
+
+    def get_session(self):
+        # type: (...) -> Tuple[sqlite3.Connection, threading.RLock]
+        key = (self._path, os.getpid())
+        with _MEMORY_LOCK:
+            if key not in _SQLITE_CONNECTIONS:
+                # connection shared by threads of the process, accesses are serialized by the lock
+                connection = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+                _SQLITE_CONNECTIONS[key] = (connection, threading.RLock())
+            return _SQLITE_CONNECTIONS[key]
+
+    def get_table(self, name):
+        # type: (str) -> MemoryTable
+        connection, lock = self.get_session()
+        return SQLiteTable(connection, name, lock)
+
+    def get_log_table(self, name):
+        # type: (str) -> MemoryLogTable
+        connection, lock = self.get_session()
+        return SQLiteLogTable(connection, name, lock)
+
+    def get_information(self):
+        # type: (...) -> JSON
+        """
+        :returns: {'version': version, 'type': db_type}
+        """
+        return {"version": sqlite3.sqlite_version, "type": self.type}
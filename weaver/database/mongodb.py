@@ -1,9 +1,13 @@
 # MongoDB
 # http://docs.pylonsproject.org/projects/pyramid-cookbook/en/latest/database/mongodb.html
+import os
+import threading
 import warnings
 from typing import TYPE_CHECKING
 
 import pymongo
+from pymongo.errors import OperationFailure
+from pyramid.settings import asbool
 
 from weaver.database.base import DatabaseInterface
 from weaver.store.base import StoreInterface
@@ -17,13 +21,35 @@ from weaver.store.mongodb import (
 from weaver.utils import get_settings
 
 if TYPE_CHECKING:
-    from typing import Any, Optional, Type, Union
+    from typing import Any, Dict, List, Optional, Tuple, Type, Union
     from pymongo.database import Database
     from weaver.typedefs import AnySettingsContainer, JSON
     from weaver.database.base import StoreSelector
 
+    MongodbIndex = Tuple[List[Tuple[str, int]], Dict[str, Any]]
+
 # pylint: disable=C0103,invalid-name
 MongoDB = None  # type: Optional[Database]
+
+# settings of client connection options with their conversion from INI string values
+MONGODB_CLIENT_OPTIONS = {
+    "mongodb.max_pool_size": ("maxPoolSize", int),
+    "mongodb.min_pool_size": ("minPoolSize", int),
+    "mongodb.max_idle_time_ms": ("maxIdleTimeMS", int),
+    "mongodb.wait_queue_timeout_ms": ("waitQueueTimeoutMS", int),
+    "mongodb.connect_timeout_ms": ("connectTimeoutMS", int),
+    "mongodb.socket_timeout_ms": ("socketTimeoutMS", int),
+    "mongodb.server_selection_timeout_ms": ("serverSelectionTimeoutMS", int),
+    "mongodb.read_preference": ("readPreference", str),
+    "mongodb.write_concern": ("w", lambda w: int(w) if w.isdigit() else w),
+    "mongodb.write_concern_timeout_ms": ("wTimeoutMS", int),
+    "mongodb.journal": ("journal", asbool),
+}
+# clients are shared by every database reference of a process to reuse their connection pool,
+# but never by forked processes (e.g.: celery workers) since they are not fork-safe
+_MONGODB_CLIENTS = {}  # type: Dict[Tuple, pymongo.MongoClient]
+_MONGODB_INDEXED = set()
+_MONGODB_LOCK = threading.Lock()
 MongodbStores = frozenset([
     MongodbServiceStore,
     MongodbProcessStore,
@@ -108,6 +134,42 @@ class MongoDatabase(DatabaseInterface):
         warnings.warn("Not implemented {}.run_migration implementation.".format(self.type))
 
 
+def get_mongodb_client_options(container):
+    # type: (AnySettingsContainer) -> Dict[str, Any]
+    """
+    Obtains the client connection pool, timeout, read preference and write concern options defined in settings.
+
+    Options that are not defined (or empty) are omitted to employ defaults of :class:`pymongo.MongoClient`.
+    """
+    settings = get_settings(container)
+    options = {}
+    for setting, (option, convert) in MONGODB_CLIENT_OPTIONS.items():
+        value = settings.get(setting)
+        if value is not None and str(value).strip() != "":
+            options[option] = convert(str(value).strip())
+    return options
+
+
+def get_mongodb_client(container):
+    # type: (AnySettingsContainer) -> pymongo.MongoClient
+    """
+    Obtains the client of the current process connecting to the database server defined in settings.
+
+    The client (and its connection pool) is created on first use by the process and reused afterwards.
+    A process forked after a client was created obtains its own client.
+    """
+    settings = get_settings(container)
+    options = get_mongodb_client_options(settings)
+    key = (os.getpid(), settings["mongodb.host"], int(settings["mongodb.port"]), tuple(sorted(options.items())))
+    with _MONGODB_LOCK:
+        client = _MONGODB_CLIENTS.get(key)
+        if client is None:
+            client = pymongo.MongoClient(settings["mongodb.host"], int(settings["mongodb.port"]),
+                                         connect=False, **options)
+            _MONGODB_CLIENTS[key] = client
+    return client
+
+
 def get_mongodb_connection(container):
     # type: (AnySettingsContainer) -> Database
     """Obtains the basic database connection from settings."""
@@ -117,18 +179,96 @@ def get_mongodb_connection(container):
         if settings.get(setting, None) is None:
             warnings.warn("Setting '{}' not defined in registry, using default [{}].".format(setting, default))
             settings[setting] = default
-    client = pymongo.MongoClient(settings["mongodb.host"], int(settings["mongodb.port"]), connect=False)
+    client = get_mongodb_client(settings)
     return client[settings["mongodb.db_name"]]
 
 
+def get_mongodb_indexes(container):
+    # type: (AnySettingsContainer) -> Dict[str, List[MongodbIndex]]
+    """
+    Obtains the index definitions of every collection, as ``(keys, options)`` to be passed to ``create_index``.
+
+    Job indexes cover the filters and sorting applied by job searches to avoid collection scans.
+    Their key order follows equality filters first, then the sorting field and the ``id`` tie-breaker.
+    """
+    settings = get_settings(container)
+    indexes = {
+        "services": [
+            ([("name", pymongo.ASCENDING)], {"unique": True}),
+            ([("url", pymongo.ASCENDING)], {"unique": True}),
+        ],
+        "processes": [
+            ([("identifier", pymongo.ASCENDING)], {"unique": True}),
+        ],
+        "jobs": [
+            ([("id", pymongo.ASCENDING)], {"unique": True}),
+            ([("user_id", pymongo.ASCENDING), ("access", pymongo.ASCENDING),
+              ("created", pymongo.DESCENDING), ("id", pymongo.DESCENDING)], {}),
+            ([("access", pymongo.ASCENDING), ("created", pymongo.DESCENDING), ("id", pymongo.DESCENDING)], {}),
+            ([("process", pymongo.ASCENDING), ("status", pymongo.ASCENDING),
+              ("created", pymongo.DESCENDING), ("id", pymongo.DESCENDING)], {}),
+            ([("service", pymongo.ASCENDING), ("process", pymongo.ASCENDING),
+              ("created", pymongo.DESCENDING), ("id", pymongo.DESCENDING)], {}),
+            # multikey index over list items
+            ([("tags", pymongo.ASCENDING), ("created", pymongo.DESCENDING), ("id", pymongo.DESCENDING)], {}),
+        ],
+        "job_logs": [
+            ([("job", pymongo.ASCENDING), ("seq", pymongo.ASCENDING)], {"unique": True}),
+        ],
+        "quotes": [
+            ([("id", pymongo.ASCENDING)], {"unique": True}),
+        ],
+        "bills": [
+            ([("id", pymongo.ASCENDING)], {"unique": True}),
+        ],
+    }  # type: Dict[str, List[MongodbIndex]]
+    logs_expire = settings.get("mongodb.job_logs_expire")
+    if logs_expire:
+        indexes["job_logs"].append(([("created", pymongo.ASCENDING)], {"expireAfterSeconds": int(logs_expire)}))
+    return indexes
+
+
+def get_mongodb_index_report(db, container):
+    # type: (Database, AnySettingsContainer) -> JSON
+    """
+    Reports the state of indexes of every collection against their expected definitions.
+
+    For each collection, the report lists indexes that are ``missing`` from the database, those that exist but are
+    ``undeclared`` by `Weaver`, and those ``unused`` since the database server started according to ``$indexStats``.
+    """
+    report = {}
+    for name, indexes in get_mongodb_indexes(container).items():
+        collection = db[name]
+        existing = {idx_name: [(key, int(order)) for key, order in info["key"]]
+                    for idx_name, info in collection.index_information().items() if idx_name != "_id_"}
+        expected = [[(key, int(order)) for key, order in keys] for keys, _ in indexes]
+        missing = ["_".join("{}_{}".format(key, order) for key, order in keys)
+                   for keys in expected if keys not in existing.values()]
+        undeclared = [idx_name for idx_name, keys in existing.items() if keys not in expected]
+        unused = []
+        try:
+            for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and not stats["accesses"]["ops"]:
+                    unused.append(stats["name"])
+        except OperationFailure as exc:  # pragma: no cover  # insufficient permissions
+            warnings.warn("Cannot obtain index statistics of '{}' collection: [{!s}]".format(name, exc))
+        report[name] = {"missing": missing, "undeclared": undeclared, "unused": sorted(unused)}
+    return report
+
+
 def get_mongodb_engine(container):
     # type: (AnySettingsContainer) -> Database
-    """Obtains the database with configuration ready for usage."""
+    """
+    Obtains the database with configuration ready for usage.
+
+    Indexes are created only on first access to the database by the process or the process it was forked from.
+    """
     db = get_mongodb_connection(container)
-    db.services.create_index("name", unique=True)
-    db.services.create_index("url", unique=True)
-    db.processes.create_index("identifier", unique=True)
-    db.jobs.create_index("id", unique=True)
-    db.quotes.create_index("id", unique=True)
-    db.bills.create_index("id", unique=True)
+    settings = get_settings(container)
+    key = (settings["mongodb.host"], int(settings["mongodb.port"]), db.name)
+    if key not in _MONGODB_INDEXED:
+        for name, indexes in get_mongodb_indexes(container).items():
+            for keys, options in indexes:
+                db[name].create_index(keys, **options)
+        _MONGODB_INDEXED.add(key)
     return db
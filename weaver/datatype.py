@@ -32,7 +32,7 @@ from weaver.wps_restapi.utils import get_wps_restapi_base_url
 
 if TYPE_CHECKING:
     from weaver.typedefs import AnySettingsContainer, Number, CWL, JSON
-    from typing import Any, Dict, List, Optional, Union
+    from typing import Any, Dict, List, Optional, Tuple, Union
 
 LOGGER = getLogger(__name__)
 
@@ -166,12 +166,80 @@ class Job(Base):
     Dictionary that contains OWS service jobs. It always has ``id`` and ``task_id`` keys.
     """
 
+    # fields that can be updated by reference (e.g.: 'job.results.extend()') without passing by '__setitem__'
+    _reference_fields = frozenset(["inputs", "results", "exceptions", "tags"])
+    # stored fields employed by the JSON representation of the job
+    json_fields = frozenset(["id", "task_id", "service", "process", "status", "status_message",
+                             "progress", "created", "finished"])
+
     def __init__(self, *args, **kwargs):
+        dict.__setattr__(self, "_changed_fields", set())
         super(Job, self).__init__(*args, **kwargs)
         if "task_id" not in self:
             raise TypeError("Parameter 'task_id' is required for '{}' creation.".format(type(self)))
         if not isinstance(self.id, str):
             raise TypeError("Type 'str' is required for '{}.id'".format(type(self)))
+        self.reset_changes()
+
+    # immutable values that are not considered modified when set again with an equal value
+    _immutable_types = (str, bytes, bool, int, float, datetime, type(None))
+
+    def __setitem__(self, key, value):
+        unchanged = isinstance(value, self._immutable_types) and key in self and self[key] == value
+        super(Job, self).__setitem__(key, value)
+        if not unchanged:
+            self._changed_fields.add(key)
+
+    def has_changes(self, *fields):
+        # type: (*str) -> bool
+        """
+        Indicates if any of the specified fields were modified since the last call to :meth:`Job.reset_changes`.
+
+        When no field is specified, indicates if any field was modified or any log entry was added.
+        """
+        changes, logs = self.get_changes()
+        if not fields:
+            return bool(changes or logs)
+        return any(field in changes for field in fields)
+
+    def reset_changes(self):
+        # type: () -> None
+        """
+        Marks the current job fields as synchronized with their stored representation.
+
+        Following modifications of the job are tracked to allow :meth:`Job.get_changes` to report only fields that
+        require an update in storage.
+        """
+        dict.__setattr__(self, "_changed_fields", set())
+        dict.__setattr__(self, "_synced_logs", len(self.get("logs") or []))
+        dict.__setattr__(self, "_synced_references", {field: list(self.get(field) or [])
+                                                      for field in self._reference_fields})
+
+    def get_changes(self):
+        # type: () -> Tuple[Dict[str, Any], List[str]]
+        """
+        Obtains the job modifications applied since the last call to :meth:`Job.reset_changes`.
+
+        Log entries added with :meth:`Job.save_log` are returned separately since they are stored independently of
+        other job fields in an append-only log. Only entries that were not yet synchronized are returned.
+
+        :returns: modified fields with their storage values, and log entries appended since last synchronization.
+        """
+        changed = set(self._changed_fields)
+        for field, synced in self._synced_references.items():
+            if (self.get(field) or []) != synced:
+                changed.add(field)
+        params = self.params()
+        fields = {field: params[field] for field in changed if field in params}
+        logs = list(self.logs[self._synced_logs:])
+        return fields, logs
+
+    def _get_list(self, field):
+        # type: (str) -> List[Any]
+        # default empty list is not considered a modification of the job
+        if self.get(field) is None:
+            dict.__setitem__(self, field, list())
+        return self[field]
 
     def _get_log_msg(self, msg=None):
         # type: (Optional[str]) -> str
@@ -202,6 +270,8 @@ class Job(Base):
 
         .. note::
             The job object is updated with the log but still requires to be pushed to database to actually persist it.
+            Only log entries added since the job was retrieved from the database are available in :attr:`Job.logs`,
+            the complete job log must be obtained from the job store.
         """
         if isinstance(errors, str):
             log_msg = [(ERROR, self._get_log_msg(message))]
@@ -306,9 +376,7 @@ class Job(Base):
 
     def _get_inputs(self):
         # type: () -> List[Optional[Dict[str, Any]]]
-        if self.get("inputs") is None:
-            self["inputs"] = list()
-        return self["inputs"]
+        return self._get_list("inputs")
 
     def _set_inputs(self, inputs):
         # type: (List[Optional[Dict[str, Any]]]) -> None
@@ -470,9 +538,7 @@ class Job(Base):
 
     def _get_results(self):
         # type: () -> List[Optional[Dict[str, Any]]]
-        if self.get("results") is None:
-            self["results"] = list()
-        return self["results"]
+        return self._get_list("results")
 
     def _set_results(self, results):
         # type: (List[Optional[Dict[str, Any]]]) -> None
@@ -485,9 +551,7 @@ class Job(Base):
 
     def _get_exceptions(self):
         # type: () -> List[Optional[Dict[str, str]]]
-        if self.get("exceptions") is None:
-            self["exceptions"] = list()
-        return self["exceptions"]
+        return self._get_list("exceptions")
 
     def _set_exceptions(self, exceptions):
         # type: (List[Optional[Dict[str, str]]]) -> None
@@ -500,9 +564,7 @@ class Job(Base):
 
     def _get_logs(self):
         # type: () -> List[Dict[str, str]]
-        if self.get("logs") is None:
-            self["logs"] = list()
-        return self["logs"]
+        return self._get_list("logs")
 
     def _set_logs(self, logs):
         # type: (List[Dict[str, str]]) -> None
@@ -515,9 +577,7 @@ class Job(Base):
 
     def _get_tags(self):
         # type: () -> List[Optional[str]]
-        if self.get("tags") is None:
-            self["tags"] = list()
-        return self["tags"]
+        return self._get_list("tags")
 
     def _set_tags(self, tags):
         # type: (List[Optional[str]]) -> None
@@ -627,7 +687,6 @@ class Job(Base):
             "progress": self.progress,
             "results": self.results,
             "exceptions": self.exceptions,
-            "logs": self.logs,
             "tags": self.tags,
             "access": self.access,
             "request": self.request,
@@ -653,6 +712,10 @@ class Process(Base):
             self["id"] = self.pop("identifier")
         if "package" not in self:
             raise TypeError("'package' is required")
+        # definitions are kept decoded, such that they are decoded only once when loaded from storage
+        for field in ["package", "payload"]:
+            if isinstance(self.get(field), dict):
+                self[field] = self._decode(self[field])
 
     @property
     def id(self):
@@ -745,9 +808,10 @@ class Process(Base):
         # type: () -> Optional[CWL]
         """
         Package CWL definition as JSON.
+
+        The definition is decoded once when loaded or set, and is returned as is. It must be copied before modification.
         """
-        pkg = self.get("package")
-        return self._decode(pkg) if isinstance(pkg, dict) else pkg
+        return self.get("package")
 
     @package.setter
     def package(self, pkg):
@@ -759,9 +823,10 @@ class Process(Base):
         # type: () -> JSON
         """
         Deployment specification as JSON body.
+
+        The definition is decoded once when loaded or set, and is returned as is. It must be copied before modification.
         """
-        body = self.get("payload", dict())
-        return self._decode(body) if isinstance(body, dict) else body
+        return self.get("payload", dict())
 
     @payload.setter
     def payload(self, body):
@@ -770,43 +835,65 @@ class Process(Base):
 
     # encode(->)/decode(<-) characters that cannot be in a key during save to db
     _character_codes = [("$", "\uFF04"), (".", "\uFF0E")]
+    # (searched characters, translation table) of keys to encode and decode
+    _character_encode = (tuple(c_dec for c_dec, _ in _character_codes),
+                         str.maketrans({c_dec: c_enc for c_dec, c_enc in _character_codes}))
+    _character_decode = (tuple(c_enc for _, c_enc in _character_codes),
+                         str.maketrans({c_enc: c_dec for c_dec, c_enc in _character_codes}))
 
     @staticmethod
-    def _recursive_replace(pkg, index_from, index_to):
-        # type: (JSON, int, int) -> JSON
-        new = {}
-        for k in pkg:
-            # find modified key with replace matches
-            c_k = k
-            for c in Process._character_codes:
-                c_f = c[index_from]
-                c_t = c[index_to]
-                if c_f in k:
-                    c_k = k.replace(c_f, c_t)
-            # process recursive sub-items
-            if isinstance(pkg[k], dict):
-                pkg[k] = Process._recursive_replace(pkg[k], index_from, index_to)
-            if isinstance(pkg[k], list):
-                for i, pkg_i in enumerate(pkg[k]):
-                    if isinstance(pkg_i, dict):
-                        pkg[k][i] = Process._recursive_replace(pkg[k][i], index_from, index_to)
-            # apply new key to obtained sub-items with replaced keys as needed
-            new[c_k] = pkg[k]   # note: cannot use pop when using pkg keys iterator (python 3)
-        return new
+    def _replace_keys(obj, codec):
+        # type: (Any, Tuple[Tuple[str, ...], Dict[int, str]]) -> Any
+        """
+        Replaces characters of keys in nested mappings and lists according to the codec, without modifying the object.
+
+        Only mappings and lists containing a replaced key, directly or within their sub-items, are copied. Other items
+        are returned as is and shared with the original object. Each distinct key is verified only once since the same
+        keys are repeated across the definition.
+        """
+        chars, table = codec
+        keys = {}  # type: Dict[str, str]
+
+        def replace(item):
+            # type: (Union[Dict[str, Any], List[Any]]) -> Union[Dict[str, Any], List[Any]]
+            changed = False
+            if isinstance(item, dict):
+                new = {}
+                for key, value in item.items():
+                    new_key = keys.get(key)
+                    if new_key is None:
+                        new_key = key
+                        for char in chars:
+                            if char in key:
+                                new_key = key.translate(table)
+                                break
+                        keys[key] = new_key
+                    new_value = replace(value) if isinstance(value, (dict, list)) else value
+                    changed = changed or new_key is not key or new_value is not value
+                    new[new_key] = new_value
+            else:
+                new = []
+                for value in item:
+                    new_value = replace(value) if isinstance(value, (dict, list)) else value
+                    changed = changed or new_value is not value
+                    new.append(new_value)
+            return new if changed else item
+
+        return replace(obj) if isinstance(obj, (dict, list)) else obj
 
     @staticmethod
     def _encode(obj):
         # type: (Optional[JSON]) -> Optional[JSON]
         if obj is None:
             return None
-        return Process._recursive_replace(obj, 0, 1)
+        return Process._replace_keys(obj, Process._character_encode)
 
     @staticmethod
     def _decode(obj):
         # type: (Optional[JSON]) -> Optional[JSON]
         if obj is None:
             return None
-        return Process._recursive_replace(obj, 1, 0)
+        return Process._replace_keys(obj, Process._character_decode)
 
     @property
     def visibility(self):
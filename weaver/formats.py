@@ -1,17 +1,21 @@
+import csv
+import datetime
+import functools
+import io
+import logging
 import os
 from typing import TYPE_CHECKING
-from urllib.error import HTTPError
-from urllib.request import urlopen
 
-from pyramid.httpexceptions import HTTPNotFound, HTTPOk
+from pyramid.httpexceptions import HTTPOk
 from pywps.inout.formats import FORMATS, Format
-from requests.exceptions import ConnectionError
 
 from weaver.utils import request_extra
 
 if TYPE_CHECKING:
-    from weaver.typedefs import JSON
-    from typing import Dict, Optional, Tuple, Union
+    from weaver.typedefs import JSON, SettingsType
+    from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
 
 # Content-Types
 #   MIME-type nomenclature:
@@ -70,6 +74,11 @@ _CONTENT_TYPE_SYNONYM_MAPPING = {
 #   - EDAM-browser: https://ifb-elixirfr.github.io/edam-browser/
 IANA_NAMESPACE = "iana"
 IANA_NAMESPACE_DEFINITION = {IANA_NAMESPACE: "https://www.iana.org/assignments/media-types/"}
+IANA_MEDIA_TYPES_FILE = os.path.join(os.path.dirname(__file__), "media_types.txt")
+IANA_MEDIA_TYPES_TOP_LEVEL = frozenset([
+    "application", "audio", "example", "font", "haptics", "image", "message", "model", "multipart", "text", "video"
+])
+_IANA_MEDIA_TYPES_PATH = IANA_MEDIA_TYPES_FILE  # active registry file, see 'load_media_types_registry'
 EDAM_NAMESPACE = "edam"
 EDAM_NAMESPACE_DEFINITION = {EDAM_NAMESPACE: "http://edamontology.org/"}
 EDAM_SCHEMA = "http://edamontology.org/EDAM_1.24.owl"
@@ -124,6 +133,9 @@ def get_cwl_file_format(mime_type, make_reference=False, must_exist=True, allow_
     Obtains the corresponding `IANA`/`EDAM` ``format`` value to be applied under a `CWL` I/O ``File`` from
     the :paramref:`mime_type` (`Content-Type` header) using the first matched one.
 
+    Official `IANA` MIME-types are resolved from the registry file loaded in memory (see
+    :func:`load_media_types_registry`), without any request to the `IANA` website. Results are memoized.
+
     Lookup procedure is as follows:
 
     - If ``make_reference=False``:
@@ -163,40 +175,123 @@ def get_cwl_file_format(mime_type, make_reference=False, must_exist=True, allow_
         Requires ``must_exist=True``, otherwise the non-official MIME-type is employed directly as result.
     :returns: Resolved MIME-type format for `CWL` usage, accordingly to specified arguments (see description details).
     """
-    def _make_if_ref(_map, _key, _fmt):
-        return os.path.join(_map[_key], _fmt) if make_reference else (_map, "{}:{}".format(_key, _fmt))
-
-    def _request_extra_various(_mime_type):
-        """
-        Attempts multiple request-retry variants to be as permissive as possible to sporadic/temporary failures.
-        """
-        _mime_type_url = "{}{}".format(IANA_NAMESPACE_DEFINITION[IANA_NAMESPACE], _mime_type)
-        try:
-            resp = request_extra("get", _mime_type_url, retries=3, allowed_codes=[HTTPOk.code, HTTPNotFound.code])
-            if resp.status_code == HTTPOk.code:
-                return _make_if_ref(IANA_NAMESPACE_DEFINITION, IANA_NAMESPACE, _mime_type)
-        except ConnectionError:
-            pass
-        try:
-            resp = urlopen(_mime_type_url)  # nosec: B310 # is hardcoded HTTP(S)
-            if resp.code == HTTPOk.code:
-                return _make_if_ref(IANA_NAMESPACE_DEFINITION, IANA_NAMESPACE, _mime_type)
-        except HTTPError:
-            pass
-        return None
-
     mime_type = clean_mime_type_format(mime_type, strip_parameters=True)
-    result = _request_extra_various(mime_type)
-    if result is not None:
-        return result
+    namespace, fmt = _resolve_cwl_file_format(mime_type, must_exist, allow_synonym)
+    if namespace is None:
+        return None if make_reference else (None, None)
+    ns_map = IANA_NAMESPACE_DEFINITION if namespace == IANA_NAMESPACE else EDAM_NAMESPACE_DEFINITION
+    return os.path.join(ns_map[namespace], fmt) if make_reference else (ns_map, "{}:{}".format(namespace, fmt))
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_cwl_file_format(mime_type, must_exist, allow_synonym):
+    # type: (str, bool, bool) -> Tuple[Optional[str], Optional[str]]
+    """
+    Obtains the namespace and format of a cleaned up MIME-type, according to :func:`get_cwl_file_format` procedure.
+    """
+    if mime_type.lower() in get_media_types_registry():
+        return IANA_NAMESPACE, mime_type
     if mime_type in EDAM_MAPPING:
-        return _make_if_ref(EDAM_NAMESPACE_DEFINITION, EDAM_NAMESPACE, EDAM_MAPPING[mime_type])
+        return EDAM_NAMESPACE, EDAM_MAPPING[mime_type]
     if not must_exist:
-        return _make_if_ref(IANA_NAMESPACE_DEFINITION, IANA_NAMESPACE, mime_type)
-    if result is None and allow_synonym and mime_type in _CONTENT_TYPE_SYNONYM_MAPPING:
-        mime_type = _CONTENT_TYPE_SYNONYM_MAPPING.get(mime_type)
-        return get_cwl_file_format(mime_type, make_reference=make_reference, must_exist=True, allow_synonym=False)
-    return None if make_reference else (None, None)
+        return IANA_NAMESPACE, mime_type
+    if allow_synonym and mime_type in _CONTENT_TYPE_SYNONYM_MAPPING:
+        return _resolve_cwl_file_format(_CONTENT_TYPE_SYNONYM_MAPPING[mime_type], True, False)
+    return None, None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_media_types(path):
+    # type: (str) -> Tuple[str, FrozenSet[str]]
+    version = ""
+    media_types = set()
+    with open(path, "r") as media_types_file:
+        for line in media_types_file:
+            line = line.strip()
+            if line.startswith("# version:"):
+                version = line.split(":", 1)[-1].strip()
+            elif line and not line.startswith("#"):
+                media_types.add(line.lower())
+    return version, frozenset(media_types)
+
+
+def get_media_types_registry():
+    # type: () -> FrozenSet[str]
+    """
+    Obtains the lower case `IANA` media-types loaded from the active registry file.
+
+    .. seealso::
+        :func:`load_media_types_registry` to employ another file than the one distributed with `Weaver`.
+    """
+    return _load_media_types(_IANA_MEDIA_TYPES_PATH)[1]
+
+
+def get_media_types_registry_version():
+    # type: () -> str
+    """
+    Obtains the version of the active `IANA` media-types registry file.
+    """
+    return _load_media_types(_IANA_MEDIA_TYPES_PATH)[0]
+
+
+def load_media_types_registry(settings):
+    # type: (SettingsType) -> None
+    """
+    Selects the `IANA` media-types registry file defined by setting ``weaver.media_types_file``, or the one distributed
+    with `Weaver` if undefined, to resolve formats with :func:`get_cwl_file_format`.
+    """
+    global _IANA_MEDIA_TYPES_PATH  # pylint: disable=W0603,global-statement
+    path = settings.get("weaver.media_types_file") or IANA_MEDIA_TYPES_FILE
+    _load_media_types(path)  # validate before replacing the active registry
+    _IANA_MEDIA_TYPES_PATH = path
+    _resolve_cwl_file_format.cache_clear()
+    LOGGER.info("Using media-types registry [%s] version [%s].", path, get_media_types_registry_version())
+
+
+def fetch_media_types_registry(settings=None):
+    # type: (Optional[SettingsType]) -> List[str]
+    """
+    Retrieves the media-types with a registration template from the live `IANA` registry.
+
+    .. note::
+        Resolution of formats never requests the `IANA` registry. This is intended for an occasional update of the
+        registry file employed by :func:`load_media_types_registry`.
+    """
+    media_types = []
+    for top_level in sorted(IANA_MEDIA_TYPES_TOP_LEVEL):
+        url = "{}{}.csv".format(IANA_NAMESPACE_DEFINITION[IANA_NAMESPACE], top_level)
+        resp = request_extra("get", url, retries=3, allowed_codes=[HTTPOk.code], settings=settings)
+        if resp.status_code != HTTPOk.code:
+            raise IOError("Failed retrieving IANA media-types registry [{}] (status: {}).".format(
+                url, resp.status_code))
+        for row in csv.DictReader(io.StringIO(resp.text)):
+            # registrations without template (e.g.: deprecated, reserved) have no resolvable reference
+            if row.get("Template"):
+                media_types.append(row["Template"].strip())
+    return media_types
+
+
+def update_media_types_registry(path, settings=None):
+    # type: (str, Optional[SettingsType]) -> int
+    """
+    Writes the media-types retrieved from the live `IANA` registry to the file to be employed as registry.
+
+    The file is replaced only once completely written. Running instances must be restarted to employ it.
+
+    :returns: number of written media-types.
+    """
+    media_types = fetch_media_types_registry(settings)
+    header = [
+        "# Media types registered by IANA (https://www.iana.org/assignments/media-types/media-types.xhtml).",
+        "# One 'type/subtype' per line, matched without case sensitivity.",
+        "# Regenerate from the live registry with: weaver -c <config.ini> media-types --output <file>",
+        "# version: {}".format(datetime.date.today().isoformat()),
+    ]
+    tmp_path = "{}.part".format(path)
+    with open(tmp_path, "w") as media_types_file:
+        media_types_file.write("\n".join(header + media_types) + "\n")
+    os.replace(tmp_path, path)
+    return len(media_types)
 
 
 def clean_mime_type_format(mime_type, suffix_subtype=False, strip_parameters=False):
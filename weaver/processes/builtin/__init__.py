@@ -17,6 +17,7 @@ from weaver.exceptions import PackageExecutionError, PackageNotFound, ProcessNot
 from weaver.processes.constants import CWL_REQUIREMENT_APP_BUILTIN
 from weaver.processes.types import PROCESS_BUILTIN
 from weaver.processes.wps_package import PACKAGE_EXTENSIONS, get_process_definition
+from weaver.processes.wps_process_base import fetch_step_result_files
 from weaver.store.base import StoreProcesses
 from weaver.utils import clean_json_text_body, ows_context_href
 from weaver.visibility import VISIBILITY_PUBLIC
@@ -26,7 +27,7 @@ from weaver.wps_restapi.utils import get_wps_restapi_base_url
 if TYPE_CHECKING:
     from weaver.typedefs import AnySettingsContainer, CWL
     from cwltool.context import RuntimeContext
-    from typing import Any, Dict, Type, Union
+    from typing import Any, Callable, Dict, Generator, Text, Type, Union
 
 LOGGER = logging.getLogger(__name__)
 
@@ -180,6 +181,12 @@ class BuiltinProcessJobSingularity(BuiltinProcessJobBase, SingularityCommandLine
 
 # pylint: disable=W0221,arguments-differ    # naming using python like arguments
 class BuiltinProcess(CommandLineTool):
+    def job(self, job_order, output_callbacks, runtime_context):
+        # type: (Dict[Text, Any], Callable[[Any, Any], Any], RuntimeContext) -> Generator[Any, None, None]
+        # results of previous workflow steps passed by reference must be available locally for the application
+        fetch_step_result_files(job_order, runtime_context)
+        return super(BuiltinProcess, self).job(job_order, output_callbacks, runtime_context)
+
     def make_job_runner(self, runtime_context):
         # type: (RuntimeContext) -> Type[JobBase]
         job = super(BuiltinProcess, self).make_job_runner(runtime_context)
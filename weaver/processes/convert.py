@@ -16,7 +16,6 @@ from owslib.wps import (
     Input as OWS_Input_Type,
     Metadata as OWS_Metadata,
     Output as OWS_Output_Type,
-    WebProcessingService,
     is_reference
 )
 from pywps import Process as ProcessWPS
@@ -54,6 +53,7 @@ from weaver.processes.constants import (
     WPS_REFERENCE
 )
 from weaver.utils import bytes2str, fetch_file, get_any_id, get_url_without_query, null, str2bytes
+from weaver.wps.utils import get_wps_client
 
 if TYPE_CHECKING:
     from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
@@ -490,7 +490,7 @@ def xml_wps2cwl(wps_process_response):
         raise ValueError("Could not find a match for 'ProcessDescription.identifier' from WPS-1 response.")
 
     # transform WPS-1 -> WPS-3
-    wps = WebProcessingService(wps_process_response.url)
+    wps = get_wps_client(wps_process_response.url)
     wps_service_url = urlparse(wps_process_response.url)
     if wps.provider:
         wps_service_name = wps.provider.name
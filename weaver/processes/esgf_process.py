@@ -7,7 +7,7 @@ import cwt  # noqa  # package: esgf-compute-api
 
 from weaver.processes.wps1_process import Wps1Process
 from weaver.status import STATUS_FAILED, STATUS_RUNNING, STATUS_SUCCEEDED
-from weaver.utils import fetch_file
+from weaver.utils import fetch_file, get_poll_intervals
 
 if TYPE_CHECKING:
     from weaver.typedefs import JSON
@@ -128,8 +128,7 @@ class ESGFProcess(Wps1Process):
             if required_input not in workflow_inputs:
                 raise ValueError("Missing required input: {}".format(required_input))
 
-    @staticmethod
-    def _get_files_urls(workflow_inputs):
+    def _get_files_urls(self, workflow_inputs):
         # type: (JSON) -> List[Tuple[str, str]]
         """Get all netcdf files from the cwl inputs"""
         urls = []
@@ -142,6 +141,9 @@ class ESGFProcess(Wps1Process):
             if not cwl_file["class"] == "File":
                 raise ValueError("'{}' inputs must have a class named 'File'".format(InputNames.FILES))
             location = cwl_file["location"]
+            if self.references is not None:
+                # result of a previous workflow step, possibly passed by reference
+                location = self.references.resolve(location, self.provider) or location
             if not location.startswith("http"):
                 raise ValueError("ESGF processes only support urls for files inputs.")
             urls.append(location)
@@ -170,8 +172,8 @@ class ESGFProcess(Wps1Process):
 
         return process
 
-    def _wait(self, esgf_process, sleep_time=2):
-        # type: (cwt.Process, float) -> bool
+    def _wait(self, esgf_process):
+        # type: (cwt.Process) -> bool
         """Wait for an ESGF process to finish, while reporting its status"""
         status_history = set()
 
@@ -192,9 +194,10 @@ class ESGFProcess(Wps1Process):
 
         update_history()
 
+        intervals = get_poll_intervals(self.settings)
         while esgf_process.processing:
             update_history()
-            time.sleep(sleep_time)
+            time.sleep(next(intervals))
 
         update_history()
 
@@ -1,6 +1,7 @@
 import logging
 import os
-from time import sleep
+from functools import partial
+from time import monotonic, sleep
 from typing import TYPE_CHECKING
 
 import colander
@@ -35,11 +36,13 @@ from weaver.utils import (
     get_settings,
     get_ssl_verify_option,
     raise_on_xml_exception,
+    wait_file_change,
     wait_secs
 )
 from weaver.visibility import VISIBILITY_PUBLIC
 from weaver.wps.utils import (
     check_wps_status,
+    get_wps_client,
     get_wps_local_status_location,
     get_wps_output_path,
     get_wps_output_url,
@@ -82,22 +85,24 @@ def execute_process(self, job_id, url, headers=None):
 
     task_logger.debug("Job task setup.")
 
-    # reset the connection because we are in a forked celery process
-    db = get_db(app, reset_connection=True)
+    # connection of the forked celery process is created by the first task and reused by following ones
+    db = get_db(app)
     store = db.get_store(StoreJobs)
 
     job = store.fetch_by_id(job_id)
     job.task_id = self.request.id
     job.progress = JOB_PROGRESS_SETUP
     job.save_log(logger=task_logger, message="Job task setup completed.")
-    job = store.update_job(job)
+    job = store.update_job(job, refresh=False)
 
     try:
         try:
             job.progress = JOB_PROGRESS_DESCRIBE
             job.save_log(logger=task_logger, message="Execute WPS request for process [{!s}]".format(job.process))
             ssl_verify = get_ssl_verify_option("get", url, settings=settings)
-            wps = WebProcessingService(url=url, headers=get_cookie_headers(headers), verify=ssl_verify)
+            # descriptions of remote providers are cached, but local processes can be redeployed at any moment
+            wps_client = WebProcessingService if job.is_local else partial(get_wps_client, container=settings)
+            wps = wps_client(url=url, headers=get_cookie_headers(headers), verify=ssl_verify)
             set_wps_language(wps, accept_language=job.accept_language)
             raise_on_xml_exception(wps._capabilities)   # noqa
         except Exception as ex:
@@ -168,14 +173,29 @@ def execute_process(self, job_id, url, headers=None):
         job.response = execution.response
         job.progress = JOB_PROGRESS_EXECUTE_MONITOR_START
         job.save_log(logger=task_logger, message="Starting monitoring of job execution.")
-        job = store.update_job(job)
+        job = store.update_job(job, refresh=False)
 
         max_retries = 5
         num_retries = 0
         run_step = 0
+        # local status document is updated by the process itself, block until it changes instead of parsing it
+        # periodically, but still read it after the timeout in case a modification was missed or it went missing
+        watch_status = not wps_status_path.startswith("http")
+        watch_timeout = float(settings.get("weaver.job_monitor_timeout", 60))
+        watch_interval = float(settings.get("weaver.job_monitor_interval", 0.25))
+        status_signature = None
+        # progress updates are coalesced up to the maximum delay, while status changes and logs are written immediately
+        update_delay = float(settings.get("weaver.job_monitor_update_delay", 5))
+        update_time = monotonic()
         while execution.isNotComplete() or run_step == 0:
             if num_retries >= max_retries:
                 raise Exception("Could not read status document after {} retries. Giving up.".format(max_retries))
+            if watch_status:
+                timeout = 1 if num_retries else watch_timeout  # retry reading quickly if it previously failed
+                if job.has_changes():  # do not wait past the maximum delay of pending coalesced updates
+                    timeout = min(timeout, max(update_delay - (monotonic() - update_time), 0))
+                status_signature = wait_file_change(wps_status_path, status_signature,
+                                                    timeout=timeout, interval=watch_interval) or status_signature
             try:
                 # NOTE:
                 #   Don't actually log anything here until process is completed (success or fail) so that underlying
@@ -183,14 +203,14 @@ def execute_process(self, job_id, url, headers=None):
                 #   Only update internal job fields in case they get referenced elsewhere.
                 job.progress = JOB_PROGRESS_EXECUTE_MONITOR_LOOP
                 execution = check_wps_status(location=wps_status_path, settings=settings,
-                                             sleep_secs=wait_secs(run_step))
+                                             sleep_secs=0 if watch_status else wait_secs(run_step))
                 job_msg = (execution.statusMessage or "").strip()
                 job.response = execution.response
                 job.status = map_status(execution.getStatus())
                 job.status_message = "Job execution monitoring (progress: {}%, status: {})."\
                                      .format(execution.percentCompleted, job_msg or "n/a")
                 # job.save_log(logger=task_logger)
-                # job = store.update_job(job)
+                # job = store.update_job(job, refresh=False)
 
                 if execution.isComplete():
                     job.mark_finished()
@@ -224,7 +244,11 @@ def execute_process(self, job_id, url, headers=None):
                 num_retries = 0
                 run_step += 1
             finally:
-                job = store.update_job(job)
+                fields, logs = job.get_changes()
+                stale = monotonic() - update_time >= update_delay
+                if logs or "status" in fields or "exceptions" in fields or (fields and stale):
+                    job = store.update_job(job, refresh=False)
+                    update_time = monotonic()
 
     except Exception as exc:
         LOGGER.exception("Failed running [%s]", job)
@@ -254,7 +278,7 @@ def execute_process(self, job_id, url, headers=None):
 
         job.progress = JOB_PROGRESS_DONE
         job.save_log(logger=task_logger, message="Job task complete.")
-        job = store.update_job(job)
+        job = store.update_job(job, refresh=False)
 
     return job.status
 
@@ -2,7 +2,7 @@ import logging
 from time import sleep
 from typing import TYPE_CHECKING
 
-from owslib.wps import ComplexDataInput, WebProcessingService
+from owslib.wps import ComplexDataInput
 
 from weaver import status
 from weaver.execute import EXECUTE_MODE_ASYNC
@@ -16,14 +16,16 @@ from weaver.utils import (
     get_any_value,
     get_job_log_msg,
     get_log_monitor_msg,
+    get_poll_intervals,
     raise_on_xml_exception,
-    request_extra,
-    wait_secs
+    request_extra
 )
-from weaver.wps.utils import check_wps_status
+from weaver.wps.utils import check_wps_status, get_wps_client
 
 if TYPE_CHECKING:
+    from typing import Optional
     from pywps.app import WPSRequest
+    from weaver.processes.wps_process_base import StepResultReferences
     from weaver.typedefs import UpdateStatusPartialFunction
 
 LOGGER = logging.getLogger(__name__)
@@ -41,8 +43,9 @@ class Wps1Process(WpsProcessInterface):
                  process,           # type: str
                  request,           # type: WPSRequest
                  update_status,     # type: UpdateStatusPartialFunction
+                 references=None,   # type: Optional[StepResultReferences]
                  ):
-        super(Wps1Process, self).__init__(request)
+        super(Wps1Process, self).__init__(request, references=references)
         self.provider = provider
         self.process = process
         self.update_status = lambda _message, _progress, _status: update_status(
@@ -54,7 +57,7 @@ class Wps1Process(WpsProcessInterface):
         LOGGER.debug("Execute process WPS request for %s", self.process)
         try:
             try:
-                wps = WebProcessingService(url=self.provider, headers=self.cookies, verify=self.verify)
+                wps = get_wps_client(self.provider, self.settings, headers=self.cookies, verify=self.verify)
                 raise_on_xml_exception(wps._capabilities)  # noqa: W0212
             except Exception as ex:
                 raise OWSNoApplicableCode("Failed to retrieve WPS capabilities. Error: [{}].".format(str(ex)))
@@ -118,6 +121,7 @@ class Wps1Process(WpsProcessInterface):
             self.update_status("Monitoring job on remote WPS1 provider : [{0}]".format(self.provider),
                                REMOTE_JOB_PROGRESS_MONITORING, status.STATUS_RUNNING)
 
+            intervals = get_poll_intervals(self.settings)
             max_retries = 5
             num_retries = 0
             run_step = 0
@@ -127,7 +131,7 @@ class Wps1Process(WpsProcessInterface):
                     raise Exception("Could not read status document after {} retries. Giving up.".format(max_retries))
                 try:
                     execution = check_wps_status(location=execution.statusLocation, verify=self.verify,
-                                                 sleep_secs=wait_secs(run_step))
+                                                 sleep_secs=next(intervals))
                     job_id = execution.statusLocation.replace(".xml", "").split("/")[-1]
                     LOGGER.debug(get_log_monitor_msg(job_id, status.map_status(execution.getStatus()),
                                                      execution.percentCompleted, execution.statusMessage,
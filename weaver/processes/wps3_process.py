@@ -1,7 +1,11 @@
+import hashlib
+import json
 import logging
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from time import sleep
+from time import monotonic, sleep
 from typing import TYPE_CHECKING
 
 from pyramid.httpexceptions import (
@@ -24,11 +28,14 @@ from weaver.processes.sources import get_data_source_from_url, retrieve_data_sou
 from weaver.processes.utils import map_progress
 from weaver.processes.wps_process_base import WpsProcessInterface
 from weaver.utils import (
+    download_file,
     get_any_id,
     get_any_message,
     get_any_value,
     get_job_log_msg,
     get_log_monitor_msg,
+    get_poll_intervals,
+    get_retry_after,
     pass_http_error,
     request_extra
 )
@@ -43,11 +50,16 @@ from weaver.wps_restapi.swagger_definitions import (
 )
 
 if TYPE_CHECKING:
-    from typing import Union
+    from typing import Dict, Iterable, List, Optional, Tuple, Union
 
     from pywps.app import WPSRequest
+    from requests import Response
 
-    from weaver.typedefs import JSON, UpdateStatusPartialFunction
+    from weaver.processes.wps_process_base import StepResultReferences
+    from weaver.typedefs import JSON, SettingsType, UpdateStatusPartialFunction
+
+    AccessTokenKey = Tuple[str, str, str]
+    DeployedProcessKey = Tuple[str, str, str]  # ADES URL, process ID, deployment body hash
 
 LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +72,58 @@ REMOTE_JOB_PROGRESS_MONITORING = 10
 REMOTE_JOB_PROGRESS_FETCH_OUT = 90
 REMOTE_JOB_PROGRESS_COMPLETED = 100
 
+# access tokens reused by every remote step and job of the worker until they are about to expire
+ACCESS_TOKEN_EXPIRY_MARGIN = 60  # seconds, or half the token lifetime if shorter
+_ACCESS_TOKENS = {}         # type: Dict[AccessTokenKey, Tuple[str, float]]
+_ACCESS_TOKEN_LOCKS = {}    # type: Dict[AccessTokenKey, threading.Lock]
+_ACCESS_TOKENS_LOCK = threading.Lock()
+
+# processes known to be deployed and public on their ADES, reused by every remote step and job of the worker
+DEPLOYED_PROCESS_EXPIRE = 3600  # seconds, default of setting 'weaver.workflow_deployment_cache_expire'
+_DEPLOYED_PROCESSES = {}        # type: Dict[DeployedProcessKey, float]
+_DEPLOYED_PROCESS_LOCKS = {}    # type: Dict[DeployedProcessKey, threading.Lock]
+_DEPLOYED_PROCESSES_LOCK = threading.Lock()
+
+
+def get_access_token(token_url, client_id, client_secret, username, password, settings=None):
+    # type: (str, str, str, str, str, Optional[SettingsType]) -> Optional[str]
+    """
+    Obtains an access token with the password grant, reusing a previously obtained one unless it is about to expire.
+
+    A single request is sent for concurrent calls with the same token URL, client and user, the other ones wait for
+    its resulting token. Tokens without expiry details are not reused.
+
+    :raises HTTPUnauthorized: if the token endpoint does not respond with a token.
+    """
+    key = (token_url, client_id, username)
+    with _ACCESS_TOKENS_LOCK:
+        key_lock = _ACCESS_TOKEN_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        token, expiry = _ACCESS_TOKENS.get(key, (None, 0))
+        if token and monotonic() < expiry:
+            return token
+        body = {
+            "grant_type": "password",
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "username": username,
+            "password": password,
+            "scope": "openid",
+        }
+        headers = {"Content-Type": CONTENT_TYPE_APP_FORM, "Accept": CONTENT_TYPE_APP_JSON}
+        cred_resp = request_extra("post", token_url, data=body, headers=headers, settings=settings)
+        cred_resp.raise_for_status()
+        if CONTENT_TYPE_APP_JSON not in cred_resp.headers.get("Content-Type"):
+            raise HTTPUnauthorized("Cannot retrieve valid access token using credential or ADES configurations.")
+        cred_body = cred_resp.json()
+        token = cred_body.get("access_token", None)
+        expires_in = cred_body.get("expires_in", None)
+        _ACCESS_TOKENS.pop(key, None)
+        if token and isinstance(expires_in, (int, float)) and expires_in > 0:
+            margin = min(ACCESS_TOKEN_EXPIRY_MARGIN, expires_in / 2)
+            _ACCESS_TOKENS[key] = (token, monotonic() + expires_in - margin)
+        return token
+
 
 class Wps3Process(WpsProcessInterface):
     def __init__(self,
@@ -68,8 +132,15 @@ class Wps3Process(WpsProcessInterface):
                  process,           # type: str
                  request,           # type: WPSRequest
                  update_status,     # type: UpdateStatusPartialFunction
+                 references=None,   # type: Optional[StepResultReferences]
+                 fetched_outputs=None,  # type: Optional[Iterable[str]]
                  ):
-        super(Wps3Process, self).__init__(request)
+        """
+        :param references: remote results of workflow steps, used to pass results of this step by reference.
+        :param fetched_outputs: outputs that must be fetched locally even if results can be passed by reference.
+        """
+        super(Wps3Process, self).__init__(request, references=references)
+        self.fetched_outputs = set(fetched_outputs or [])
         self.provider = None    # overridden if data source properly resolved
         self.update_status = lambda _message, _progress, _status: update_status(
             self.provider, _message, _progress, _status)
@@ -115,22 +186,9 @@ class Wps3Process(WpsProcessInterface):
         ades_secret = self.settings.get("ades.wso2_client_secret", None)
         access_token = None
         if ades_usr and ades_pwd and ades_url and ades_client and ades_secret:
-            ades_body = {
-                "grant_type": "password",
-                "client_id": ades_client,
-                "client_secret": ades_secret,
-                "username": ades_usr,
-                "password": ades_pwd,
-                "scope": "openid",
-            }
-            ades_headers = {"Content-Type": CONTENT_TYPE_APP_FORM, "Accept": CONTENT_TYPE_APP_JSON}
             ades_access_token_url = "{}/oauth2/token".format(ades_url)
-            cred_resp = request_extra("post", ades_access_token_url,
-                                      data=ades_body, headers=ades_headers, settings=self.settings)
-            cred_resp.raise_for_status()
-            if CONTENT_TYPE_APP_JSON not in cred_resp.headers.get("Content-Type"):
-                raise HTTPUnauthorized("Cannot retrieve valid access token using credential or ADES configurations.")
-            access_token = cred_resp.json().get("access_token", None)
+            access_token = get_access_token(ades_access_token_url, ades_client, ades_secret, ades_usr, ades_pwd,
+                                            settings=self.settings)
             if not access_token:
                 warnings.warn("Could not retrieve valid access token although response is expected to contain one.",
                               MissingParameterWarning)
@@ -219,27 +277,79 @@ class Wps3Process(WpsProcessInterface):
                                      status_code_mock=HTTPOk.code)
         response.raise_for_status()
 
-    def execute(self, workflow_inputs, out_dir, expected_outputs):
-        # TODO: test
-        visible = self.is_visible()
-        if not visible:  # includes private visibility and non-existing cases
-            if visible is None:
-                LOGGER.info("Process [%s] access is unauthorized on [%s] - deploying as admin.", self.process, self.url)
-            elif visible is False:
-                LOGGER.info("Process [%s] is not deployed on [%s] - deploying.", self.process, self.url)
-            # TODO: Maybe always redeploy? What about cases of outdated deployed process?
+    @property
+    def deployment_key(self):
+        # type: () -> DeployedProcessKey
+        body = json.dumps(self.deploy_body, sort_keys=True, default=str)
+        return self.url, self.process, hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def _get_deployment_lock(self):
+        # type: () -> threading.Lock
+        with _DEPLOYED_PROCESSES_LOCK:
+            return _DEPLOYED_PROCESS_LOCKS.setdefault(self.deployment_key, threading.Lock())
+
+    def prepare_process(self):
+        # type: () -> Optional[float]
+        """
+        Ensures that the process is deployed with public visibility on the remote ADES.
+
+        The process is not verified again by following steps and jobs with the same deployment on the same ADES until
+        ``weaver.workflow_deployment_cache_expire`` seconds elapsed (disabled if zero). Concurrent steps of the same
+        process wait for a single deployment.
+
+        :returns: expiry of the known deployment that was reused, or ``None`` if it was verified with the ADES.
+        """
+        key = self.deployment_key
+        with self._get_deployment_lock():
+            expiry = _DEPLOYED_PROCESSES.get(key)
+            if expiry is not None and monotonic() < expiry:
+                LOGGER.debug("Process [%s] already deployed with public visibility on [%s].", self.process, self.url)
+                return expiry
+
+            visible = self.is_visible()
+            if not visible:  # includes private visibility and non-existing cases
+                if visible is None:
+                    LOGGER.info("Process [%s] access is unauthorized on [%s] - deploying as admin.",
+                                self.process, self.url)
+                elif visible is False:
+                    LOGGER.info("Process [%s] is not deployed on [%s] - deploying.", self.process, self.url)
+                # TODO: Maybe always redeploy? What about cases of outdated deployed process?
+                try:
+                    self.deploy()
+                except Exception as exc:
+                    # FIXME: support for Spacebel, avoid conflict error incorrectly handled, remove 500 when fixed
+                    pass_http_error(exc, [HTTPConflict, HTTPInternalServerError])
+
+            LOGGER.info("Process [%s] enforced to public visibility.", self.process)
             try:
-                self.deploy()
+                self.set_visibility(visibility=VISIBILITY_PUBLIC)
+            # TODO: support for Spacebel, remove when visibility route properly implemented on ADES
             except Exception as exc:
-                # FIXME: support for Spacebel, avoid conflict error incorrectly handled, remove 500 when fixed
-                pass_http_error(exc, [HTTPConflict, HTTPInternalServerError])
+                pass_http_error(exc, HTTPNotFound)
 
-        LOGGER.info("Process [%s] enforced to public visibility.", self.process)
-        try:
-            self.set_visibility(visibility=VISIBILITY_PUBLIC)
-        # TODO: support for Spacebel, remove when visibility route properly implemented on ADES
-        except Exception as exc:
-            pass_http_error(exc, HTTPNotFound)
+            expire = int(self.settings.get("weaver.workflow_deployment_cache_expire", DEPLOYED_PROCESS_EXPIRE))
+            _DEPLOYED_PROCESSES.pop(key, None)
+            if expire > 0:
+                _DEPLOYED_PROCESSES[key] = monotonic() + expire
+            return None
+
+    def invalidate_process(self, expiry):
+        # type: (float) -> None
+        """
+        Forgets the known deployment of the process reused with given expiry, such that it gets verified again.
+
+        Deployments already verified again by another step since then are preserved.
+        """
+        key = self.deployment_key
+        with self._get_deployment_lock():
+            if _DEPLOYED_PROCESSES.get(key) == expiry:
+                LOGGER.info("Process [%s] is not accessible anymore on [%s] - verifying deployment.",
+                            self.process, self.url)
+                _DEPLOYED_PROCESSES.pop(key, None)
+
+    def execute(self, workflow_inputs, out_dir, expected_outputs):
+        # TODO: test
+        deployed_expiry = self.prepare_process()
 
         self.update_status("Preparing execute request for remote ADES.",
                            REMOTE_JOB_PROGRESS_REQ_PREP, status.STATUS_RUNNING)
@@ -288,21 +398,35 @@ class Wps3Process(WpsProcessInterface):
                                      url=request_url,
                                      json=execute_body,
                                      retry=True)
+        if response.status_code in (HTTPNotFound.code, HTTPForbidden.code) and deployed_expiry is not None:
+            # process removed or made private on the ADES since its deployment was verified
+            self.invalidate_process(deployed_expiry)
+            self.prepare_process()
+            response = self.make_request(method="POST",
+                                         url=request_url,
+                                         json=execute_body,
+                                         retry=True)
         if response.status_code != 201:
             raise Exception("Was expecting a 201 status code from the execute request : {0}".format(request_url))
 
         job_status_uri = response.headers["Location"]
-        job_status = self.get_job_status(job_status_uri)
-        job_status_value = status.map_status(job_status["status"])
-
         self.update_status("Monitoring job on remote ADES : {0}".format(job_status_uri),
                            REMOTE_JOB_PROGRESS_MONITORING, status.STATUS_RUNNING)
-
-        while job_status_value not in status.JOB_STATUS_CATEGORIES[status.STATUS_CATEGORY_FINISHED]:
-            sleep(5)
-            job_status = self.get_job_status(job_status_uri)
-            job_status_value = status.map_status(job_status["status"])
-
+        intervals = get_poll_intervals(self.settings)
+        max_retries = 5
+        num_retries = 0
+        while True:
+            try:
+                job_status, response = self.get_job_status(job_status_uri)
+            except Exception as exc:
+                num_retries += 1
+                if num_retries > max_retries:
+                    raise
+                LOGGER.debug("Could not obtain remote job status (%s/%s retries): %r", num_retries, max_retries, exc)
+                sleep(next(intervals))
+                continue
+            num_retries = 0
+            job_status_value = job_status["status"]
             LOGGER.debug(get_log_monitor_msg(job_status["jobID"], job_status_value,
                                              job_status.get("percentCompleted", 0),
                                              get_any_message(job_status), job_status.get("statusLocation")))
@@ -313,6 +437,11 @@ class Wps3Process(WpsProcessInterface):
                                map_progress(job_status.get("percentCompleted", 0),
                                             REMOTE_JOB_PROGRESS_MONITORING, REMOTE_JOB_PROGRESS_FETCH_OUT),
                                status.STATUS_RUNNING)
+            if job_status_value in status.JOB_STATUS_CATEGORIES[status.STATUS_CATEGORY_FINISHED]:
+                break
+            # delay requested by the remote server if any, otherwise check less often as the job takes longer
+            retry_after = get_retry_after(response)
+            sleep(next(intervals) if retry_after is None else retry_after)
 
         if job_status_value != status.STATUS_SUCCEEDED:
             LOGGER.debug(get_log_monitor_msg(job_status["jobID"], job_status_value,
@@ -323,23 +452,52 @@ class Wps3Process(WpsProcessInterface):
         self.update_status("Fetching job outputs from remote ADES.",
                            REMOTE_JOB_PROGRESS_FETCH_OUT, status.STATUS_RUNNING)
         results = self.get_job_results(job_status["jobID"])
+        downloads = []
         for result in results:
             if get_any_id(result) in expected_outputs:
                 # This is where cwl expect the output file to be written
                 # TODO We will probably need to handle multiple output value...
                 dst_fn = "/".join([out_dir.rstrip("/"), expected_outputs[get_any_id(result)]])
-
                 # TODO Should we handle other type than File reference?
-                resp = request_extra("get", get_any_value(result), allow_redirects=True, settings=self.settings)
-                LOGGER.debug("Fetching result output from [%s] to cwl output destination: [%s]",
-                             get_any_value(result), dst_fn)
-                with open(dst_fn, mode="wb") as dst_fh:
-                    dst_fh.write(resp.content)
+                passed = (self.references is not None and self.references.enabled
+                          and get_any_id(result) not in self.fetched_outputs
+                          and self.references.add(dst_fn, get_any_value(result), self.provider))
+                if not passed:
+                    downloads.append((get_any_value(result), dst_fn))
+        self.fetch_results(downloads)
 
         self.update_status("Execution on remote ADES completed.",
                            REMOTE_JOB_PROGRESS_COMPLETED, status.STATUS_SUCCEEDED)
 
+    def fetch_results(self, downloads):
+        # type: (List[Tuple[str, str]]) -> None
+        """
+        Downloads the remote results to their local destination.
+
+        Results are streamed to disk with resumption of interrupted transfers and verification of their size, and
+        multiple results are downloaded concurrently by at most ``weaver.input_staging_workers`` threads.
+
+        :param downloads: pairs of result reference and local file destination.
+        """
+        def fetch(download):
+            # type: (Tuple[str, str]) -> None
+            reference, destination = download
+            LOGGER.debug("Fetching result output from [%s] to cwl output destination: [%s]", reference, destination)
+            download_file(reference, destination, settings=self.settings, allow_redirects=True)
+
+        if len(downloads) <= 1:
+            for download in downloads:
+                fetch(download)
+            return
+        workers = int(self.settings.get("weaver.input_staging_workers", 8))
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(downloads)))) as executor:
+            list(executor.map(fetch, downloads))  # consume results to raise any download error
+
     def get_job_status(self, job_status_uri, retry=True):
+        # type: (str, bool) -> Tuple[JSON, Response]
+        """
+        Obtains the status of the remote job with the response it was obtained from.
+        """
         response = self.make_request(method="GET",
                                      url=job_status_uri,
                                      retry=True,
@@ -359,7 +517,7 @@ class Wps3Process(WpsProcessInterface):
         if "jobID" not in job_status:
             job_status["jobID"] = job_id
         job_status["status"] = status.map_status(job_status["status"])
-        return job_status
+        return job_status, response
 
     def get_job_results(self, job_id):
         result_url = self.url + process_results_uri.format(process_id=self.process, job_id=job_id)
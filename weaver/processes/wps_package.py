@@ -15,10 +15,13 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 import time
 import uuid
 from collections import OrderedDict  # pylint: disable=E0611,no-name-in-module   # moved to .abc in Python 3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
+from functools import partial
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
@@ -69,6 +72,7 @@ from weaver.processes.convert import (
 from weaver.processes.sources import retrieve_data_source_url
 from weaver.processes.types import PROCESS_APPLICATION, PROCESS_WORKFLOW
 from weaver.processes.utils import map_progress
+from weaver.processes.wps_process_base import StepResultFsAccess, StepResultReferences
 from weaver.status import (
     STATUS_COMPLIANT_PYWPS,
     STATUS_EXCEPTION,
@@ -97,6 +101,7 @@ from weaver.wps_restapi.swagger_definitions import process_uri
 if TYPE_CHECKING:
     from typing import Any, Deque, Dict, List, Optional, Tuple, Type, Union
 
+    from cwltool.executors import JobExecutor
     from cwltool.factory import Callable as CWLFactoryCallable
     from cwltool.process import Process as ProcessCWL
     from owslib.wps import WPSExecution
@@ -211,6 +216,27 @@ def get_package_workflow_steps(package_dict_or_url):
     return workflow_steps_ids
 
 
+def get_package_workflow_output_sources(package_dict):
+    # type: (CWL) -> Dict[str, List[str]]
+    """
+    :param package_dict: workflow package definition.
+    :return: mapping of workflow step names to their outputs that are used as workflow outputs.
+    """
+    outputs = package_dict.get("outputs", [])
+    if isinstance(outputs, dict):
+        outputs = list(outputs.values())
+    step_outputs = dict()
+    for output in outputs:
+        if not isinstance(output, dict):
+            continue
+        sources = output.get("outputSource", [])
+        for source in [sources] if isinstance(sources, str) else sources:
+            parts = source.lstrip("#").split("/")
+            if len(parts) >= 2:
+                step_outputs.setdefault(parts[-2], []).append(parts[-1])
+    return step_outputs
+
+
 def _fetch_process_info(process_info_url, fetch_error):
     # type: (str, Type[Exception]) -> JSON
     """
@@ -384,6 +410,7 @@ def _load_package_content(package_dict,                             # type: Dict
                           loading_context=None,                     # type: Optional[LoadingContext]
                           runtime_context=None,                     # type: Optional[RuntimeContext]
                           process_offering=None,                    # type: Optional[JSON]
+                          executor=None,                            # type: Optional[JobExecutor]
                           ):  # type: (...) -> Optional[Tuple[CWLFactoryCallable, str, Dict]]
     """
     Loads the package content to file in a temporary directory.
@@ -397,6 +424,7 @@ def _load_package_content(package_dict,                             # type: Dict
     :param loading_context: cwltool context used to create the cwl package (required if ``only_dump_file=False``)
     :param runtime_context: cwltool context used to execute the cwl package (required if ``only_dump_file=False``)
     :param process_offering: JSON body of the process description payload (used as I/O hint ordering)
+    :param executor: cwltool executor of the package jobs (sequential execution of workflow steps if ``None``)
     :return:
         if ``only_dump_file`` is ``True``: ``None``
         otherwise, tuple of:
@@ -436,7 +464,7 @@ def _load_package_content(package_dict,                             # type: Dict
     if only_dump_file:
         return
 
-    factory = CWLFactory(loading_context=loading_context, runtime_context=runtime_context)
+    factory = CWLFactory(executor=executor, loading_context=loading_context, runtime_context=runtime_context)
     package = factory.make(tmp_json_cwl)  # type: CWLFactoryCallable
     shutil.rmtree(tmp_dir)
     return package, package_type, step_packages
@@ -645,6 +673,9 @@ class WpsPackage(Process):
     logger = None                   # type: Optional[logging.Logger]
     step_packages = None            # type: Optional[List[CWL]]
     step_launched = None            # type: Optional[List[str]]
+    step_progress = None            # type: Optional[Dict[str, Number]]
+    step_lock = None                # type: Optional[threading.RLock]
+    step_references = None          # type: Optional[StepResultReferences]
     request = None                  # type: Optional[WPSRequest]
     response = None                 # type: Optional[ExecuteResponse]
 
@@ -657,22 +688,23 @@ class WpsPackage(Process):
 
         Provided ``kw`` should correspond to :meth:`weaver.datatype.Process.params_wps`
         """
-        self.payload = kw.pop("payload")
-        self.package = kw.pop("package")
+        # definitions are shared with the process they come from, copy them since they get updated
+        self.payload = deepcopy(kw.pop("payload"))
+        self.package = deepcopy(kw.pop("package"))
         self.settings = get_settings(app)
         if not self.package:
             raise PackageRegistrationError("Missing required package definition for package process.")
         if not isinstance(self.package, dict):
             raise PackageRegistrationError("Unknown parsing of package definition for package process.")
 
-        inputs = kw.pop("inputs", [])
+        inputs = deepcopy(kw.pop("inputs", []))
 
         # handle EOImage inputs
         inputs = opensearch.replace_inputs_describe_process(inputs=inputs, payload=self.payload)
 
         inputs = [json2wps_io(i, WPS_INPUT) for i in inputs]
-        outputs = [json2wps_io(o, WPS_OUTPUT) for o in kw.pop("outputs", list())]
-        metadata = [json2wps_field(meta_kw, "metadata") for meta_kw in kw.pop("metadata", list())]
+        outputs = [json2wps_io(o, WPS_OUTPUT) for o in deepcopy(kw.pop("outputs", list()))]
+        metadata = [json2wps_field(meta_kw, "metadata") for meta_kw in deepcopy(kw.pop("metadata", list()))]
 
         super(WpsPackage, self).__init__(
             self._handler,
@@ -897,14 +929,30 @@ class WpsPackage(Process):
         self.response._update_status(pywps_status_id, message, self.percent)  # noqa: W0212
         self.log_message(status=status, message=message, progress=progress)
 
-    def step_update_status(self, message, progress, start_step_progress, end_step_progress, step_name,
-                           target_host, status):
-        # type: (str, Number, Number, Number, str, AnyValue, str) -> None
-        self.update_status(
-            message="{0} [{1}] - {2}".format(target_host, step_name, str(message).strip()),
-            progress=map_progress(progress, start_step_progress, end_step_progress),
-            status=status,
-        )
+    def step_update_status(self, message, progress, step_name, target_host, status):
+        # type: (str, Number, str, AnyValue, str) -> None
+        """
+        Updates the job status with the progress of a step, possibly reported concurrently with other steps.
+        """
+        with self.step_lock:
+            self.step_progress[step_name] = max(progress or 0, self.step_progress.get(step_name, 0))
+            self.update_status(
+                message="{0} [{1}] - {2}".format(target_host, step_name, str(message).strip()),
+                progress=self.get_step_progress(),
+                status=status,
+            )
+
+    def get_step_progress(self):
+        # type: () -> Number
+        """
+        Calculates the percentage progression of the full process from the progress of every launched step.
+
+        Scattered steps report one progress entry per job, which can outnumber the workflow steps.
+        The result is therefore limited to the completion of all steps.
+        """
+        steps_total = max(1, len(self.step_packages))
+        steps_done = min(sum(self.step_progress.values()) / 100, steps_total)
+        return self.map_step_progress(steps_done, steps_total)
 
     def log_message(self, status, message, progress=None, level=logging.INFO):
         # type: (AnyStatusType, str, Optional[Number], int) -> None
@@ -927,14 +975,14 @@ class WpsPackage(Process):
 
     @classmethod
     def map_step_progress(cls, step_index, steps_total):
-        # type: (int, int) -> Number
+        # type: (Number, int) -> Number
         """Calculates the percentage progression of a single step of the full process.
 
         .. note::
             The step procession is adjusted according to delimited start/end of the underlying `CWL` execution to
             provide a continuous progress percentage over the complete execution. Otherwise, we would have values
             that jump around according to whichever progress the underlying remote `WPS` or monitored `CWL` employs,
-            if any is provided.
+            if any is provided. Fractional indices represent the summed progress of steps running in parallel.
         """
         return map_progress(100 * step_index / steps_total, PACKAGE_PROGRESS_CWL_RUN, PACKAGE_PROGRESS_CWL_DONE)
 
@@ -964,12 +1012,15 @@ class WpsPackage(Process):
 
             self.is_ems = get_weaver_configuration(self.settings) == WEAVER_CONFIGURATION_EMS
             if self.is_ems:
-                # EMS dispatch the execution to the ADES
+                # EMS dispatch the execution to the ADES, independent workflow steps can be dispatched in parallel
+                from weaver.processes.wps_workflow import get_workflow_executor
                 loading_context = LoadingContext()
                 loading_context.construct_tool_object = self.make_tool
+                executor = get_workflow_executor(self.settings)
             else:
                 # ADES execute the cwl locally
                 loading_context = None
+                executor = None
 
             self.update_effective_user()
             self.update_requirements()
@@ -999,14 +1050,20 @@ class WpsPackage(Process):
             }
             self.logger.debug("Using cwltool.RuntimeContext args:\n%s", json.dumps(runtime_params, indent=2))
             runtime_context = RuntimeContext(kwargs=runtime_params)
+            # results of workflow steps passed by reference are fetched when CWL needs to read their contents
+            self.step_references = StepResultReferences(self.settings)
+            runtime_context.make_fs_access = partial(StepResultFsAccess, references=self.step_references)
             try:
                 package_inst, _, self.step_packages = _load_package_content(self.package,
                                                                             package_name=self.package_id,
                                                                             # no data source for local package
                                                                             data_source=None,
                                                                             loading_context=loading_context,
-                                                                            runtime_context=runtime_context)
+                                                                            runtime_context=runtime_context,
+                                                                            executor=executor)
                 self.step_launched = []
+                self.step_progress = {}
+                self.step_lock = threading.RLock()
 
             except Exception as ex:
                 raise PackageRegistrationError("Exception occurred on package instantiation: '{!r}'".format(ex))
@@ -1099,6 +1156,7 @@ class WpsPackage(Process):
         :return: CWL input values
         """
         cwl_inputs = dict()
+        location_inputs = []  # type: List[Tuple[str, Optional[int], str, ComplexInput]]
         for input_id in wps_inputs:
             # skip empty inputs (if that is even possible...)
             input_occurs = wps_inputs[input_id]
@@ -1110,14 +1168,16 @@ class WpsPackage(Process):
             is_array, elem_type, _, _ = is_cwl_array_type(cwl_inputs_info[input_id])
             if isinstance(input_i, ComplexInput) or elem_type == "File":
                 # extend array data that allow max_occur > 1
+                # locations are generated afterwards all at once to stage their files concurrently
                 if is_array:
                     input_type = elem_type
-                    cwl_inputs[input_id] = [
-                        self.make_location_input(input_type, input_def) for input_def in input_occurs
-                    ]
+                    cwl_inputs[input_id] = [None] * len(input_occurs)
+                    location_inputs.extend(
+                        (input_id, index, input_type, input_def) for index, input_def in enumerate(input_occurs)
+                    )
                 else:
                     input_type = cwl_inputs_info[input_id]["type"]
-                    cwl_inputs[input_id] = self.make_location_input(input_type, input_i)
+                    location_inputs.append((input_id, None, input_type, input_i))
             elif isinstance(input_i, (LiteralInput, BoundingBoxInput)):
                 # extend array data that allow max_occur > 1
                 if is_array:
@@ -1127,13 +1187,89 @@ class WpsPackage(Process):
                 cwl_inputs[input_id] = input_data
             else:
                 raise PackageTypeError("Undefined package input for execution: {}.".format(type(input_i)))
+        locations = self.make_location_inputs([(in_type, in_def) for _, _, in_type, in_def in location_inputs])
+        for (input_id, index, _, _), location in zip(location_inputs, locations):
+            if index is None:
+                cwl_inputs[input_id] = location
+            else:
+                cwl_inputs[input_id][index] = location
         return cwl_inputs
 
-    def make_location_input(self, input_type, input_definition):
-        # type: (str, ComplexInput) -> JSON
+    def make_location_inputs(self, location_inputs):
+        # type: (List[Tuple[str, ComplexInput]]) -> List[JSON]
+        """
+        Generates the JSON contents of multiple `CWL` ``File`` inputs, staging their files concurrently.
+
+        Files are fetched by at most ``weaver.input_staging_workers`` threads, with at most
+        ``weaver.input_staging_host_workers`` of them simultaneously fetching from the same host.
+        Progress of staged inputs is reported in the job status. Inputs sharing the same file name with a previous one
+        are staged in distinct sub-directories of their working directory to avoid overwriting each other.
+
+        .. seealso::
+            - :meth:`make_location_input`
+
+        :param location_inputs: pairs of `CWL` input type and corresponding `WPS` input definition.
+        :return: JSON contents of `CWL` inputs, in the same order as provided definitions.
+        """
+        total = len(location_inputs)
+        if total <= 1:
+            return [self.make_location_input(input_type, input_def) for input_type, input_def in location_inputs]
+        workers = int(self.settings.get("weaver.input_staging_workers", 8))
+        host_workers = int(self.settings.get("weaver.input_staging_host_workers", 4))
+        host_semaphores = {}  # type: Dict[str, threading.BoundedSemaphore]
+        host_lock = threading.Lock()
+
+        def stage(input_type, input_definition, staging_dir):
+            # type: (str, ComplexInput, Optional[str]) -> JSON
+            host = urlparse(str(getattr(input_definition, "url", None) or "")).netloc
+            with host_lock:
+                semaphore = host_semaphores.setdefault(host, threading.BoundedSemaphore(max(1, host_workers)))
+            with semaphore:
+                return self.make_location_input(input_type, input_definition, staging_dir=staging_dir)
+
+        staging_dirs = []  # type: List[Optional[str]]
+        file_names = set()
+        for index, (_, input_def) in enumerate(location_inputs):
+            file_name = os.path.basename(urlparse(str(getattr(input_def, "url", None) or "")).path)
+            staging_dir = None
+            workdir = getattr(input_def, "workdir", None)
+            if file_name in file_names and isinstance(workdir, str):
+                staging_dir = os.path.join(workdir, "input-{}".format(index))
+                os.makedirs(staging_dir, exist_ok=True)
+            file_names.add(file_name)
+            staging_dirs.append(staging_dir)
+
+        locations = [None] * total  # type: List[Optional[JSON]]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, total))) as executor:
+            futures = {
+                executor.submit(stage, input_type, input_def, staging_dirs[index]): index
+                for index, (input_type, input_def) in enumerate(location_inputs)
+            }
+            reported = time.monotonic()
+            try:
+                for count, future in enumerate(as_completed(futures), start=1):
+                    locations[futures[future]] = future.result()
+                    # status updates are written from this thread only, limited to avoid rewriting it for every file
+                    if count == total or time.monotonic() - reported >= 1:
+                        reported = time.monotonic()
+                        progress = map_progress(100 * count / total,
+                                                PACKAGE_PROGRESS_ADD_EO_IMAGES, PACKAGE_PROGRESS_CONVERT_INPUT)
+                        self.update_status("Staged {}/{} file inputs.".format(count, total), progress, STATUS_RUNNING)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+        return locations
+
+    def make_location_input(self, input_type, input_definition, staging_dir=None):
+        # type: (str, ComplexInput, Optional[str]) -> JSON
         """
         Generates the JSON content required to specify a `CWL` ``File`` input definition from a location.
 
+        :param input_type: `CWL` type of the input.
+        :param input_definition: `WPS` input definition with the location of the file.
+        :param staging_dir: directory where to fetch the file instead of the working directory of the input.
+
         .. note::
             If the process requires ``OpenSearch`` references that should be preserved as is, use scheme defined by
             :py:data:`weaver.processes.constants.OPENSEARCH_LOCAL_FILE_SCHEME` prefix instead of ``http(s)://``.
@@ -1169,7 +1305,7 @@ class WpsPackage(Process):
                 input_location = input_definition.data
         if self.must_fetch(input_location):
             self.logger.info("File input (%s) ATTEMPT fetch: [%s]", input_definition.identifier, input_location)
-            input_location = fetch_file(input_location, input_definition.workdir, settings=self.settings)
+            input_location = fetch_file(input_location, staging_dir or input_definition.workdir, settings=self.settings)
         else:
             self.logger.info("File input (%s) SKIPPED fetch: [%s]", input_definition.identifier, input_location)
         location = {"location": input_location, "class": input_type}
@@ -1295,18 +1431,15 @@ class WpsPackage(Process):
             process = self.step_packages[jobname]
             jobtype = "step"
 
-        # Progress made with steps presumes that they are done sequentially and have the same progress weight
-        start_step_progress = self.map_step_progress(len(self.step_launched), max(1, len(self.step_packages)))
-        end_step_progress = self.map_step_progress(len(self.step_launched) + 1, max(1, len(self.step_packages)))
-
-        self.step_launched.append(jobname)
-        self.update_status("Preparing to launch {type} {name}.".format(type=jobtype, name=jobname),
-                           start_step_progress, STATUS_RUNNING)
+        # Progress made with steps presumes that they have the same progress weight, but they can run in parallel
+        with self.step_lock:
+            self.step_launched.append(jobname)
+            self.step_progress[jobname] = 0
+            self.update_status("Preparing to launch {type} {name}.".format(type=jobtype, name=jobname),
+                               self.get_step_progress(), STATUS_RUNNING)
 
         def _update_status_dispatch(_provider, _message, _progress, _status):
-            self.step_update_status(
-                _message, _progress, start_step_progress, end_step_progress, jobname, _provider, _status
-            )
+            self.step_update_status(_message, _progress, jobname, _provider, _status)
 
         def _get_wps1_params(_requirement):
             _wps_params = {}
@@ -1329,6 +1462,7 @@ class WpsPackage(Process):
                 process=params["process"],
                 request=self.request,
                 update_status=_update_status_dispatch,
+                references=self.step_references,
             )
         elif req_class.endswith(CWL_REQUIREMENT_APP_ESGF_CWT):
             self.logger.info("ESGF-CWT Package resolved from requirement/hint: %s", req_class)
@@ -1339,13 +1473,19 @@ class WpsPackage(Process):
                 process=params["process"],
                 request=self.request,
                 update_status=_update_status_dispatch,
+                references=self.step_references,
             )
         else:
             # implements both `PROCESS_APPLICATION` with `CWL_REQUIREMENT_APP_DOCKER` and `PROCESS_WORKFLOW`
             self.logger.info("WPS-3 Package resolved from requirement/hint: %s", req_class)
             from weaver.processes.wps3_process import Wps3Process
+            # results of a step can be passed by reference to following steps, except for workflow outputs
+            references = self.step_references if jobtype == "step" else None
+            fetched_outputs = get_package_workflow_output_sources(self.package).get(jobname, [])
             return Wps3Process(step_payload=step_payload,
                                joborder=joborder,
                                process=process,
                                request=self.request,
-                               update_status=_update_status_dispatch)
+                               update_status=_update_status_dispatch,
+                               references=references,
+                               fetched_outputs=fetched_outputs)
@@ -1,20 +1,176 @@
+import logging
+import threading
 from abc import abstractmethod
 from time import sleep
 from typing import TYPE_CHECKING
 
+import requests
+from cwltool.pathmapper import adjustFileObjs
+from cwltool.stdfsaccess import StdFsAccess
 from pyramid.httpexceptions import HTTPBadGateway
 from pyramid.settings import asbool
 from pyramid_celery import celery_app as app
 
 from weaver.formats import CONTENT_TYPE_APP_JSON
-from weaver.utils import get_cookie_headers, get_settings, request_extra
+from weaver.utils import download_file, get_cookie_headers, get_settings, request_extra
 from weaver.wps.utils import get_wps_output_dir, get_wps_output_url
 
 if TYPE_CHECKING:
-    from weaver.typedefs import CWL
-    from typing import Dict
+    from weaver.typedefs import AnySettingsContainer, CWL
+    from typing import IO, Any, Dict, Optional, Tuple
+    from cwltool.context import RuntimeContext
     from pywps.app import WPSRequest
 
+LOGGER = logging.getLogger(__name__)
+
+
+class StepResultReferences(object):
+    """
+    Remote results of workflow steps that are passed by reference to following steps instead of being fetched locally.
+
+    Referenced results are placed as empty files at their expected local path for `CWL` to collect them as step
+    outputs, described with the size of the remote result. Steps that consume them obtain the remote reference directly
+    if they can access it according to setting ``weaver.workflow_step_references``, and otherwise fetch the result to
+    its local path at that moment:
+
+        - ``same``: only steps dispatched to the same provider (data source) as the one that produced the result.
+        - ``all``: any step, for results accessible from anywhere.
+        - ``none``: never pass results by reference, all results are fetched once produced.
+
+    Results are also fetched as soon as their contents are read locally, either by `CWL` itself through
+    :class:`StepResultFsAccess` or by tools running locally (see :meth:`fetch_files`).
+    """
+
+    def __init__(self, settings):
+        # type: (AnySettingsContainer) -> None
+        self.settings = get_settings(settings)
+        self.mode = str(self.settings.get("weaver.workflow_step_references", "same")).lower()
+        self._references = {}  # type: Dict[str, Tuple[str, str, int]]
+        self._locks = {}  # type: Dict[str, threading.Lock]
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        # type: () -> bool
+        return self.mode in ["same", "all"]
+
+    def add(self, file_path, reference, provider):
+        # type: (str, str, str) -> bool
+        """
+        Registers the remote reference of a result produced by the provider in place of its local file path.
+
+        :returns: whether the result is passed by reference, or must be fetched since its size could not be obtained.
+        """
+        try:
+            resp = request_extra("head", reference, allow_redirects=True, settings=self.settings)
+            size = int(resp.headers["Content-Length"]) if resp.status_code == 200 else None
+        except (KeyError, ValueError):
+            size = None
+        except requests.RequestException as exc:
+            LOGGER.debug("Failed obtaining size of result [%s] from [%s]: [%r]", file_path, reference, exc)
+            size = None
+        if size is None:
+            LOGGER.debug("Result [%s] cannot be passed by reference without its size: [%s]", file_path, reference)
+            return False
+        open(file_path, "wb").close()
+        with self._lock:
+            self._references[file_path] = (reference, provider, size)
+        LOGGER.debug("Result [%s] passed by reference: [%s]", file_path, reference)
+        return True
+
+    def size(self, file_path):
+        # type: (str) -> Optional[int]
+        """
+        Obtains the size of the remote result if the file is a result that is still passed by reference.
+        """
+        with self._lock:
+            reference = self._references.get(file_path.replace("file://", ""))
+        return None if reference is None else reference[2]
+
+    def resolve(self, file_path, provider):
+        # type: (str, str) -> Optional[str]
+        """
+        Obtains the remote reference of the result if the provider can access it, or fetches it locally otherwise.
+
+        :returns: remote reference, or ``None`` if the file is not a referenced result or was fetched.
+        """
+        file_path = file_path.replace("file://", "")
+        with self._lock:
+            reference = self._references.get(file_path)
+        if reference is None:
+            return None
+        if self.mode == "all" or reference[1] == provider:
+            return reference[0]
+        self.fetch(file_path)
+        return None
+
+    def fetch(self, file_path):
+        # type: (str) -> None
+        """
+        Fetches the remote result to its local file path if it was passed by reference.
+        """
+        file_path = file_path.replace("file://", "")
+        with self._lock:
+            if file_path not in self._references:
+                return
+            lock = self._locks.setdefault(file_path, threading.Lock())
+        with lock:
+            with self._lock:
+                reference = self._references.get(file_path)
+            if reference is None:  # fetched by another step in the meantime
+                return
+            LOGGER.debug("Fetching result [%s] passed by reference: [%s]", file_path, reference[0])
+            download_file(reference[0], file_path, settings=self.settings, allow_redirects=True)
+            with self._lock:
+                del self._references[file_path]
+
+    def fetch_files(self, job_order):
+        # type: (CWL) -> None
+        """
+        Fetches all results passed by reference amongst `CWL` ``File`` inputs of a tool that runs locally.
+        """
+        if self._references:
+            adjustFileObjs(job_order, lambda cwl_file: self.fetch(cwl_file["location"]))
+
+
+class StepResultFsAccess(StdFsAccess):
+    """
+    File system access of `CWL` that fetches results passed by reference (see :class:`StepResultReferences`) before
+    their contents are read, while providing their size without fetching them.
+    """
+
+    def __init__(self, basedir, references):
+        # type: (str, StepResultReferences) -> None
+        super(StepResultFsAccess, self).__init__(basedir)
+        self.references = references
+
+    def open(self, fn, mode):
+        # type: (str, str) -> IO[Any]
+        self.references.fetch(self._abs(fn))
+        return super(StepResultFsAccess, self).open(fn, mode)
+
+    def size(self, fn):
+        # type: (str) -> int
+        size = self.reference_size(fn)
+        return super(StepResultFsAccess, self).size(fn) if size is None else size
+
+    def reference_size(self, fn):
+        # type: (str) -> Optional[int]
+        """
+        Obtains the size of the remote result if the file is a result that is still passed by reference.
+        """
+        return self.references.size(self._abs(fn))
+
+
+def fetch_step_result_files(job_order, runtime_context):
+    # type: (CWL, RuntimeContext) -> None
+    """
+    Fetches results of previous workflow steps passed by reference amongst inputs of a tool that runs locally.
+    """
+    fs_access = runtime_context.make_fs_access("")
+    if isinstance(fs_access, StepResultFsAccess):
+        fs_access.references.fetch_files(job_order)
+
 
 class WpsProcessInterface(object):
     """
@@ -38,9 +194,10 @@ class WpsProcessInterface(object):
         """
         raise NotImplementedError
 
-    def __init__(self, request):
-        # type: (WPSRequest) -> None
+    def __init__(self, request, references=None):
+        # type: (WPSRequest, Optional[StepResultReferences]) -> None
         self.request = request
+        self.references = references
         self.cookies = get_cookie_headers(self.request.http_request.headers)
         self.headers = {"Accept": CONTENT_TYPE_APP_JSON, "Content-Type": CONTENT_TYPE_APP_JSON}
         self.settings = get_settings(app)
@@ -57,8 +214,18 @@ class WpsProcessInterface(object):
             response.status_code = status_code_mock
         return response
 
-    @staticmethod
-    def host_file(file_name):
+    def host_file(self, file_name):
+        # type: (str) -> str
+        """
+        Obtains the URL of a local file for the remote process to access it.
+
+        Results of previous workflow steps passed by reference are obtained directly at their remote location if
+        accessible by the remote process (see :class:`StepResultReferences`).
+        """
+        if self.references is not None:
+            reference = self.references.resolve(file_name, getattr(self, "provider", None))
+            if reference:
+                return reference
         settings = get_settings(app)
         weaver_output_url = get_wps_output_url(settings)
         weaver_output_dir = get_wps_output_dir(settings)
@@ -14,6 +14,7 @@ from cwltool import command_line_tool
 from cwltool.builder import CONTENT_LIMIT, Builder, substitute
 from cwltool.context import LoadingContext, RuntimeContext, getdefault
 from cwltool.errors import WorkflowException
+from cwltool.executors import MultithreadedJobExecutor
 from cwltool.job import JobBase, relink_initialworkdir
 from cwltool.pathmapper import adjustDirObjs, adjustFileObjs, get_listing, trim_listing, visit_class
 from cwltool.process import (
@@ -38,6 +39,7 @@ from weaver.processes.constants import (
     CWL_REQUIREMENT_APP_ESGF_CWT,
     CWL_REQUIREMENT_APP_WPS1
 )
+from weaver.processes.wps_process_base import StepResultFsAccess, fetch_step_result_files
 from weaver.utils import get_settings, make_dirs, now
 from weaver.wps.utils import get_wps_output_dir
 
@@ -46,7 +48,13 @@ if TYPE_CHECKING:
     from cwltool.command_line_tool import OutputPorts
     from cwltool.provenance import ProvenanceProfile
     from threading import Lock as ThreadLock
-    from weaver.typedefs import AnyValue, ExpectedOutputType, GetJobProcessDefinitionFunction, ToolPathObjectType
+    from weaver.typedefs import (
+        AnySettingsContainer,
+        AnyValue,
+        ExpectedOutputType,
+        GetJobProcessDefinitionFunction,
+        ToolPathObjectType
+    )
     from weaver.processes.wps_process_base import WpsProcessInterface
 
 LOGGER = logging.getLogger(__name__)
@@ -77,7 +85,7 @@ def default_make_tool(toolpath_object,              # type: ToolPathObjectType
                 return BuiltinProcess(toolpath_object, loading_context)
             return WpsWorkflow(toolpath_object, loading_context, get_job_process_definition)
         if toolpath_object["class"] == "ExpressionTool":
-            return command_line_tool.ExpressionTool(toolpath_object, loading_context)
+            return WpsExpressionTool(toolpath_object, loading_context)
         if toolpath_object["class"] == "Workflow":
             return Workflow(toolpath_object, loading_context)
 
@@ -86,6 +94,65 @@ def default_make_tool(toolpath_object,              # type: ToolPathObjectType
         toolpath_object["id"])
 
 
+def compute_local_checksums(fs_access, file_obj):
+    # type: (StdFsAccess, Dict[Text, Any]) -> None
+    """
+    Computes the checksum of a collected output file, unless it is a step result passed by reference.
+
+    Results passed by reference would otherwise be fetched only to compute their checksum.
+    """
+    if not isinstance(fs_access, StepResultFsAccess) or fs_access.reference_size(file_obj["location"]) is None:
+        compute_checksums(fs_access, file_obj)
+
+
+class WpsExpressionTool(command_line_tool.ExpressionTool):
+    """
+    Expression of a workflow evaluated locally, with results of previous steps passed by reference fetched beforehand.
+    """
+
+    # pylint: disable=W0221,arguments-differ    # naming using python like arguments
+    def job(self, joborder, output_callbacks, runtime_context):
+        # type: (Dict[Text, AnyValue], Callable[[Any, Any], Any], RuntimeContext) -> Generator[Any, None, None]
+        fetch_step_result_files(joborder, runtime_context)
+        return super(WpsExpressionTool, self).job(joborder, output_callbacks, runtime_context)
+
+
+class WpsWorkflowExecutor(MultithreadedJobExecutor):
+    """
+    Executor running independent steps of a workflow dispatched by the `EMS` in parallel.
+
+    Steps are executed by remote `ADES` or providers, local resources requested by their package are therefore
+    not accounted for. Only the amount of simultaneously running steps is limited.
+    """
+
+    def __init__(self, max_steps):
+        # type: (int) -> None
+        super(WpsWorkflowExecutor, self).__init__()
+        self.max_cores = max_steps
+
+    def select_resources(self, request, runtime_context):  # pylint: disable=W0613,unused-argument
+        # type: (Dict[Text, int], RuntimeContext) -> Dict[Text, int]
+        return {"cores": 1, "ram": 0, "tmpdirSize": request["tmpdirMin"], "outdirSize": request["outdirMin"]}
+
+    def run_jobs(self, process, job_order_object, logger, runtime_context):
+        # type: (ProcessCWL, Dict[Text, Any], logging.Logger, RuntimeContext) -> None
+        runtime_context.select_resources = self.select_resources
+        super(WpsWorkflowExecutor, self).run_jobs(process, job_order_object, logger, runtime_context)
+
+
+def get_workflow_executor(container):
+    # type: (AnySettingsContainer) -> Optional[WpsWorkflowExecutor]
+    """
+    Obtains the executor of workflow steps according to setting ``weaver.workflow_parallel_steps``.
+
+    Returns ``None`` to employ the default sequential executor when steps must not run in parallel.
+    """
+    max_steps = int(get_settings(container).get("weaver.workflow_parallel_steps", 4))
+    if max_steps > 1:
+        return WpsWorkflowExecutor(max_steps)
+    return None
+
+
 class CallbackJob(object):
     def __init__(self, job, output_callback, cachebuilder, jobcache):
         # type: (WpsWorkflow, Callable[[Any, Any], Any], Builder, Text) -> None
@@ -218,7 +285,7 @@ class WpsWorkflow(ProcessCWL):
                 visit_class(ret, ("File", "Directory"), partial(command_line_tool.check_valid_locations, fs_access))
 
                 if compute_checksum:
-                    adjustFileObjs(ret, partial(compute_checksums, fs_access))
+                    adjustFileObjs(ret, partial(compute_local_checksums, fs_access))
 
             validate.validate_ex(
                 self.names.get_name("outputs_record_schema", ""), ret,
@@ -298,6 +365,10 @@ class WpsWorkflow(ProcessCWL):
                         load_listing = builder.loadListing or (binding and binding.get("loadListing"))
                         if load_listing and load_listing != "no_listing":
                             get_listing(fs_access, files, (load_listing == "deep_listing"))
+                    elif not binding.get("loadContents") and isinstance(fs_access, StepResultFsAccess) \
+                            and fs_access.reference_size(rfile["location"]) is not None:
+                        # result passed by reference is not fetched, it is described only by its remote size
+                        files["size"] = fs_access.reference_size(rfile["location"])
                     else:
                         with fs_access.open(rfile["location"], "rb") as f:
                             contents = b""
@@ -1,8 +1,11 @@
 import abc
+import base64
 from typing import TYPE_CHECKING
 
+from bson import json_util
+
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Optional, Tuple, Union
+    from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
     from pyramid.request import Request
     from pywps import Process as ProcessWPS
     from weaver.datatype import Bill, Job, Process, Quote, Service
@@ -12,6 +15,38 @@ if TYPE_CHECKING:
     JobCategory = Dict[str, Union[AnyValue, Job]]
     JobCategoriesAndCount = Tuple[List[JobCategory], int]
 
+# serialization of cursor values, dates are always resolved to UTC
+CURSOR_JSON_OPTIONS = json_util.JSONOptions(tz_aware=True)
+
+
+def encode_cursor(item, field):
+    # type: (Dict[str, Any], str) -> str
+    """
+    Generates the opaque cursor token that positions a listing just after the given item.
+
+    The token encodes the sorting ``field``, its value for the item and the item ``id`` used as tie-breaker.
+    """
+    data = json_util.dumps([field, item.get(field), item["id"]], json_options=CURSOR_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor, field):
+    # type: (str, str) -> Tuple[Any, str]
+    """
+    Obtains the sorting value and ``id`` of the item at the position of a cursor generated by :func:`encode_cursor`.
+
+    :raises ValueError: if the cursor is invalid or was generated for another sorting field.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode("utf-8"))
+        cursor_field, value, item_id = json_util.loads(data, json_options=CURSOR_JSON_OPTIONS)
+    except Exception:  # noqa: W0703 # nosec: B110
+        raise ValueError("Invalid cursor: '{!s}'".format(cursor))
+    if cursor_field != field:
+        raise ValueError("Cursor generated for sorting by '{!s}' cannot be used to sort by '{!s}'."
+                         .format(cursor_field, field))
+    return value, item_id
+
 
 class StoreInterface(object, metaclass=abc.ABCMeta):
     type = None
@@ -73,6 +108,11 @@ class StoreProcesses(StoreInterface):
         # type: (Optional[str]) -> List[Process]
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def list_process_revisions(self, visibility=None):
+        # type: (Optional[str]) -> Dict[str, str]
+        raise NotImplementedError
+
     @abc.abstractmethod
     def fetch_by_id(self, process_id, visibility=None):
         # type: (str, Optional[str]) -> Process
@@ -115,8 +155,8 @@ class StoreJobs(StoreInterface):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def update_job(self, job):
-        # type: (Job) -> Job
+    def update_job(self, job, refresh=True):
+        # type: (Job, bool) -> Job
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -129,6 +169,11 @@ class StoreJobs(StoreInterface):
         # type: (str) -> Job
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def fetch_logs(self, job_id, since=0, limit=None):
+        # type: (str, int, Optional[int]) -> List[Tuple[int, str]]
+        raise NotImplementedError
+
     @abc.abstractmethod
     def list_jobs(self):
         # type: () -> List[Job]
@@ -147,9 +192,16 @@ class StoreJobs(StoreInterface):
                   limit=10,                 # type: int
                   group_by=None,            # type: Optional[Union[str, List[str]]]
                   request=None,             # type: Optional[Request]
+                  fields=None,              # type: Optional[Iterable[str]]
+                  cursor=None,              # type: Optional[str]
                   ):                        # type: (...) -> Union[JobListAndCount, JobCategoriesAndCount]
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def make_cursor(self, job, sort=None):
+        # type: (Job, Optional[str]) -> str
+        raise NotImplementedError
+
     @abc.abstractmethod
     def clear_jobs(self):
         # type: () -> bool
@@ -175,8 +227,13 @@ class StoreQuotes(StoreInterface):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def find_quotes(self, process_id=None, page=0, limit=10, sort=None):
-        # type: (Optional[str], int, int, Optional[str]) -> Tuple[List[Quote], int]
+    def find_quotes(self, process_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Quote], int]
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def make_cursor(self, quote, sort=None):
+        # type: (Quote, Optional[str]) -> str
         raise NotImplementedError
 
 
@@ -199,6 +256,11 @@ class StoreBills(StoreInterface):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def find_bills(self, quote_id=None, page=0, limit=10, sort=None):
-        # type: (Optional[str], int, int, Optional[str]) -> Tuple[List[Bill], int]
+    def find_bills(self, quote_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Bill], int]
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def make_cursor(self, bill, sort=None):
+        # type: (Bill, Optional[str]) -> str
         raise NotImplementedError
@@ -0,0 +1,1079 @@
+"""
+Stores to read/write data to/from memory, optionally persisted in a `SQLite` database file.
+
+These stores are intended for single-node deployments and tests that do not need a `MongoDB` server.
+Contents of in-memory tables are only shared by the workers of a same process, while `SQLite` tables are shared by
+every process that uses the same database file.
+"""
+
+import logging
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
+from typing import TYPE_CHECKING
+
+from bson import json_util
+from pywps import Process as ProcessWPS
+
+from weaver.datatype import Bill, Job, Process, Quote, Service
+from weaver.exceptions import (
+    BillInstanceError,
+    BillNotFound,
+    BillRegistrationError,
+    JobNotFound,
+    JobRegistrationError,
+    JobUpdateError,
+    ProcessInstanceError,
+    ProcessNotAccessible,
+    ProcessNotFound,
+    ProcessRegistrationError,
+    QuoteInstanceError,
+    QuoteNotFound,
+    QuoteRegistrationError,
+    ServiceNotAccessible,
+    ServiceNotFound,
+    ServiceRegistrationError
+)
+from weaver.execute import EXECUTE_MODE_ASYNC, EXECUTE_MODE_SYNC
+from weaver.processes.types import PROCESS_APPLICATION, PROCESS_WORKFLOW, PROCESS_WPS
+from weaver.sort import (
+    BILL_SORT_VALUES,
+    JOB_SORT_VALUES,
+    QUOTE_SORT_VALUES,
+    SORT_CREATED,
+    SORT_FINISHED,
+    SORT_ID,
+    SORT_USER
+)
+from weaver.status import JOB_STATUS_CATEGORIES, STATUS_ACCEPTED, map_status
+from weaver.store.base import (
+    CURSOR_JSON_OPTIONS,
+    StoreBills,
+    StoreJobs,
+    StoreProcesses,
+    StoreQuotes,
+    StoreServices,
+    decode_cursor,
+    encode_cursor
+)
+from weaver.utils import get_base_url, get_sane_name, get_weaver_url, now
+from weaver.visibility import VISIBILITY_PRIVATE, VISIBILITY_PUBLIC, VISIBILITY_VALUES
+from weaver.wps.utils import get_wps_url
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+    from pyramid.request import Request
+
+    from weaver.store.base import JobCategoriesAndCount, JobListAndCount
+    from weaver.typedefs import AnyValue
+
+    AnyProcess = Union[Process, ProcessWPS]
+    Document = Dict[str, Any]
+    DocumentFilter = Callable[[Document], bool]
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MemoryTable(object):
+    """
+    Documents of a store kept in memory, indexed by a unique key.
+
+    Documents are copied when written and read such that modifications by the caller never alter stored contents.
+    """
+
+    def __init__(self):
+        self._documents = {}  # type: Dict[str, Document]
+        self._lock = threading.RLock()
+
+    def _iter_documents(self):
+        # type: () -> Iterator[Document]
+        return iter(list(self._documents.values()))
+
+    @staticmethod
+    def _copy(document):
+        # type: (Document) -> Document
+        return deepcopy(document)
+
+    def get(self, key):
+        # type: (str) -> Optional[Document]
+        with self._lock:
+            document = self._documents.get(key)
+            return self._copy(document) if document is not None else None
+
+    def put(self, key, document):
+        # type: (str, Document) -> None
+        with self._lock:
+            self._documents[key] = deepcopy(document)
+
+    def update(self, key, fields):
+        # type: (str, Document) -> bool
+        """
+        Replaces the given fields of the document without rewriting other fields.
+
+        :returns: whether the document exists.
+        """
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                return False
+            document.update(deepcopy(fields))
+            return True
+
+    def pop(self, key, field):
+        # type: (str, str) -> Any
+        """
+        Removes the field from the document and returns its value, or ``None`` if either of them is missing.
+        """
+        with self._lock:
+            document = self._documents.get(key)
+            return document.pop(field, None) if document is not None else None
+
+    def delete(self, key):
+        # type: (str) -> bool
+        with self._lock:
+            return self._documents.pop(key, None) is not None
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._documents.clear()
+
+    @contextmanager
+    def transaction(self):
+        # type: () -> Iterator[None]
+        """
+        Applies all operations of the context atomically, also for other tables of the same database.
+        """
+        with self._lock:
+            yield
+
+    def find(self,
+             search=None,       # type: Optional[DocumentFilter]
+             sort=None,         # type: Optional[Callable[[Document], Any]]
+             reverse=False,     # type: bool
+             skip=0,            # type: int
+             limit=None,        # type: Optional[int]
+             ):                 # type: (...) -> List[Document]
+        """
+        Obtains copies of documents matching the search filter, sorted and sliced as requested.
+        """
+        with self._lock:
+            found = [doc for doc in self._iter_documents() if search is None or search(doc)]
+            if sort is not None:
+                found.sort(key=sort, reverse=reverse)
+            found = found[skip:skip + limit] if limit else found[skip:]
+            return [self._copy(doc) for doc in found]
+
+    def count(self, search=None):
+        # type: (Optional[DocumentFilter]) -> int
+        with self._lock:
+            return sum(1 for doc in self._iter_documents() if search is None or search(doc))
+
+
+class MemoryLogTable(object):
+    """
+    Log entries kept in memory, identified by the key of their document and their sequence number.
+
+    Entries are only appended, and are retrieved by ranges of sequence numbers.
+    """
+
+    def __init__(self):
+        self._entries = {}  # type: Dict[str, List[str]]
+        self._lock = threading.RLock()
+
+    def append(self, key, entries):
+        # type: (str, Sequence[str]) -> None
+        with self._lock:
+            self._entries.setdefault(key, []).extend(entries)
+
+    def fetch(self, key, since=0, limit=None):
+        # type: (str, int, Optional[int]) -> List[Tuple[int, str]]
+        """
+        Obtains pairs of sequence number and entry starting at ``since``, up to ``limit`` entries if specified.
+        """
+        with self._lock:
+            entries = self._entries.get(key, [])
+            stop = since + limit if limit else len(entries)
+            return list(enumerate(entries[since:stop], start=since))
+
+    def delete(self, key):
+        # type: (str) -> bool
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._entries.clear()
+
+
+@contextmanager
+def sqlite_transaction(connection, lock):
+    # type: (sqlite3.Connection, threading.RLock) -> Iterator[None]
+    """
+    Applies all statements of the context in a single transaction, committed when it exits without error.
+
+    The database is reserved for writing from the start of the transaction such that concurrent transactions of other
+    processes using the same file are serialized. Nested contexts are part of the active transaction.
+    """
+    with lock:
+        if connection.in_transaction:
+            yield
+            return
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            yield
+
+
+class SQLiteTable(MemoryTable):
+    """
+    Documents of a store persisted in a table of a `SQLite` database, indexed by a unique key.
+
+    Documents are stored as `JSON` such that modifications of some of their fields are applied directly by `SQLite`.
+    """
+    # maximum fields replaced by a single statement, to remain within the limit of function arguments
+    update_fields = 30
+
+    def __init__(self, connection, name, lock):
+        # type: (sqlite3.Connection, str, threading.RLock) -> None
+        super(SQLiteTable, self).__init__()
+        self._connection = connection
+        self._lock = lock
+        self._name = name
+        with self.transaction():
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS {} (key TEXT PRIMARY KEY, document TEXT NOT NULL)".format(name)
+            )
+
+    @staticmethod
+    def _dumps(document):
+        # type: (Document) -> str
+        return json_util.dumps(document, json_options=CURSOR_JSON_OPTIONS)
+
+    @staticmethod
+    def _loads(data):
+        # type: (str) -> Document
+        return json_util.loads(data, json_options=CURSOR_JSON_OPTIONS)
+
+    def _iter_documents(self):
+        # type: () -> Iterator[Document]
+        rows = self._connection.execute("SELECT document FROM {}".format(self._name)).fetchall()
+        return (self._loads(row[0]) for row in rows)
+
+    @staticmethod
+    def _copy(document):
+        # type: (Document) -> Document
+        return document  # already a new object when loaded
+
+    def get(self, key):
+        # type: (str) -> Optional[Document]
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT document FROM {} WHERE key = ?".format(self._name), (key, )
+            ).fetchone()
+        return self._loads(row[0]) if row else None
+
+    def put(self, key, document):
+        # type: (str, Document) -> None
+        with self.transaction():
+            self._connection.execute(
+                "INSERT OR REPLACE INTO {} (key, document) VALUES (?, ?)".format(self._name),
+                (key, self._dumps(document))
+            )
+
+    @staticmethod
+    def _path(field):
+        # type: (str) -> str
+        return "$.\"{}\"".format(field)
+
+    def update(self, key, fields):
+        # type: (str, Document) -> bool
+        """
+        Replaces the given fields of the document without rewriting other fields.
+
+        :returns: whether the document exists.
+        """
+        items = list(fields.items())
+        with self.transaction():
+            if not items:
+                return self._connection.execute(
+                    "SELECT 1 FROM {} WHERE key = ?".format(self._name), (key, )
+                ).fetchone() is not None
+            for start in range(0, len(items), self.update_fields):
+                chunk = items[start:start + self.update_fields]
+                params = []
+                for field, value in chunk:
+                    params.extend([self._path(field), self._dumps(value)])
+                cursor = self._connection.execute(
+                    "UPDATE {} SET document = json_set(document, {}) WHERE key = ?".format(
+                        self._name, ", ".join(["?, json(?)"] * len(chunk))
+                    ),
+                    params + [key]
+                )
+                if cursor.rowcount == 0:
+                    return False
+            return True
+
+    def pop(self, key, field):
+        # type: (str, str) -> Any
+        """
+        Removes the field from the document and returns its value, or ``None`` if either of them is missing.
+        """
+        path = self._path(field)
+        with self.transaction():
+            row = self._connection.execute(
+                "SELECT json_type(document, ?), json_extract(document, ?) FROM {} WHERE key = ?".format(self._name),
+                (path, path, key)
+            ).fetchone()
+            if not row or row[0] is None:
+                return None
+            self._connection.execute(
+                "UPDATE {} SET document = json_remove(document, ?) WHERE key = ?".format(self._name), (path, key)
+            )
+        return self._loads(row[1]) if row[0] in ["array", "object"] else row[1]
+
+    def delete(self, key):
+        # type: (str) -> bool
+        with self.transaction():
+            cursor = self._connection.execute("DELETE FROM {} WHERE key = ?".format(self._name), (key, ))
+            return cursor.rowcount > 0
+
+    def clear(self):
+        # type: () -> None
+        with self.transaction():
+            self._connection.execute("DELETE FROM {}".format(self._name))
+
+    def transaction(self):
+        # type: () -> Iterator[None]
+        return sqlite_transaction(self._connection, self._lock)
+
+
+class SQLiteLogTable(MemoryLogTable):
+    """
+    Log entries persisted in a table of a `SQLite` database, with a row per entry identified by the key of their
+    document and their sequence number.
+    """
+
+    def __init__(self, connection, name, lock):
+        # type: (sqlite3.Connection, str, threading.RLock) -> None
+        super(SQLiteLogTable, self).__init__()
+        self._connection = connection
+        self._lock = lock
+        self._name = name
+        with sqlite_transaction(self._connection, self._lock):
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS {} "
+                "(key TEXT NOT NULL, seq INTEGER NOT NULL, entry TEXT NOT NULL, PRIMARY KEY (key, seq))".format(name)
+            )
+
+    def append(self, key, entries):
+        # type: (str, Sequence[str]) -> None
+        with sqlite_transaction(self._connection, self._lock):
+            start = self._connection.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM {} WHERE key = ?".format(self._name), (key, )
+            ).fetchone()[0]
+            self._connection.executemany(
+                "INSERT INTO {} (key, seq, entry) VALUES (?, ?, ?)".format(self._name),
+                [(key, start + index, entry) for index, entry in enumerate(entries)]
+            )
+
+    def fetch(self, key, since=0, limit=None):
+        # type: (str, int, Optional[int]) -> List[Tuple[int, str]]
+        """
+        Obtains pairs of sequence number and entry starting at ``since``, up to ``limit`` entries if specified.
+        """
+        with self._lock:
+            return [tuple(row) for row in self._connection.execute(
+                "SELECT seq, entry FROM {} WHERE key = ? AND seq >= ? ORDER BY seq LIMIT ?".format(self._name),
+                (key, since, limit or -1)
+            ).fetchall()]
+
+    def delete(self, key):
+        # type: (str) -> bool
+        with sqlite_transaction(self._connection, self._lock):
+            cursor = self._connection.execute("DELETE FROM {} WHERE key = ?".format(self._name), (key, ))
+            return cursor.rowcount > 0
+
+    def clear(self):
+        # type: () -> None
+        with sqlite_transaction(self._connection, self._lock):
+            self._connection.execute("DELETE FROM {}".format(self._name))
+
+
+def _sort_value(value):
+    # type: (AnyValue) -> Tuple[bool, AnyValue]
+    """
+    Sorting key of a value such that missing or ``null`` values are placed before any other value.
+    """
+    return value is not None, value if value is not None else 0
+
+
+class MemoryStore(object):
+    """
+    Base class extended by all concrete in-memory store implementations.
+    """
+
+    def __init__(self, table, sane_name_config=None):
+        # type: (MemoryTable, Optional[Dict[str, Any]]) -> None
+        if not isinstance(table, MemoryTable):
+            raise TypeError("Table not of expected type.")
+        self.table = table  # type: MemoryTable
+        self.sane_name_config = sane_name_config or {}
+
+    @classmethod
+    def get_args_kwargs(cls, *args, **kwargs):
+        # type: (*Any, **Any) -> Tuple[Tuple, Dict]
+        """
+        Filters :class:`MemoryStore`-specific arguments to safely pass them down its ``__init__``.
+        """
+        table = None
+        if len(args):
+            table = args[0]
+        elif "table" in kwargs:    # pylint: disable=R1715
+            table = kwargs["table"]
+        sane_name_config = kwargs.get("sane_name_config", None)
+        return tuple([table]), {"sane_name_config": sane_name_config}
+
+    @staticmethod
+    def _sort_key(field):
+        # type: (str) -> Callable[[Document], Tuple]
+        """
+        Sorting key by ``field`` followed by ``id`` as tie-breaker, consistently with cursor positions.
+        """
+        return lambda doc: (_sort_value(doc.get(field)), doc["id"])
+
+    def _find(self, search, sort, descending=False, page=0, limit=10, cursor=None):
+        # type: (DocumentFilter, str, bool, int, int, Optional[str]) -> Tuple[List[Document], int]
+        """
+        Obtains the page of documents matching the search filter and their total count.
+
+        :raises ValueError: if the cursor is invalid or was generated for another sorting field.
+        """
+        total = self.table.count(search)
+        sort_key = self._sort_key(sort)
+        skip = page * limit
+        if cursor:
+            value, item_id = decode_cursor(cursor, sort)
+            position = (_sort_value(value), item_id)
+            matches = search
+
+            def search(doc):  # pylint: disable=E0102,function-redefined
+                after = sort_key(doc) < position if descending else sort_key(doc) > position
+                return after and matches(doc)
+            skip = 0
+        items = self.table.find(search, sort=sort_key, reverse=descending, skip=skip, limit=limit)
+        return items, total
+
+
+class MemoryServiceStore(StoreServices, MemoryStore):
+    """
+    Registry for OWS services. Uses memory to store service url and attributes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        db_args, db_kwargs = MemoryStore.get_args_kwargs(*args, **kwargs)
+        StoreServices.__init__(self)
+        MemoryStore.__init__(self, *db_args, **db_kwargs)
+
+    def save_service(self, service, overwrite=True):
+        # type: (Service, bool) -> Service
+        """
+        Stores an OWS service in memory.
+        """
+        service_url = get_base_url(service.url)
+        service_name = get_sane_name(service.name, **self.sane_name_config)
+        for other in self.table.find(lambda doc: doc["url"] == service_url or doc["name"] == service_name):
+            if not overwrite:
+                field = "url" if other["url"] == service_url else "name"
+                raise ServiceRegistrationError("service {} already registered.".format(field))
+            self.table.delete(other["name"])
+        self.table.put(service_name, Service(
+            url=service_url,
+            name=service_name,
+            type=service.type,
+            public=service.public,
+            auth=service.auth).params())
+        return self.fetch_by_url(url=service_url)
+
+    def delete_service(self, name):
+        # type: (str) -> bool
+        """
+        Removes service from memory.
+        """
+        self.table.delete(name)
+        return True
+
+    def list_services(self):
+        # type: () -> List[Service]
+        """
+        Lists all services in memory.
+        """
+        return [Service(service) for service in self.table.find(sort=lambda doc: doc["name"])]
+
+    def fetch_by_name(self, name, visibility=None):
+        # type: (str, Optional[str]) -> Service
+        """
+        Gets service for given ``name`` from memory.
+        """
+        service = self.table.get(name)
+        if not service:
+            raise ServiceNotFound("Service '{}' could not be found.".format(name))
+        service = Service(service)
+        same_visibility = (service.public and visibility == VISIBILITY_PUBLIC) or \
+                          (not service.public and visibility == VISIBILITY_PRIVATE)
+        if visibility is not None and not same_visibility:
+            raise ServiceNotAccessible("Service '{}' cannot be accessed.".format(name))
+        return service
+
+    def fetch_by_url(self, url):
+        # type: (str) -> Service
+        """
+        Gets service for given ``url`` from memory.
+        """
+        service_url = get_base_url(url)
+        services = self.table.find(lambda doc: doc["url"] == service_url)
+        if not services:
+            raise ServiceNotFound
+        return Service(services[0])
+
+    def clear_services(self):
+        # type: () -> bool
+        """
+        Removes all OWS services from memory.
+        """
+        self.table.clear()
+        return True
+
+
+class MemoryProcessStore(StoreProcesses, MemoryStore):
+    """
+    Registry for processes. Uses memory to store processes and attributes.
+    """
+    def __init__(self, *args, **kwargs):
+        db_args, db_kwargs = MemoryStore.get_args_kwargs(*args, **kwargs)
+        StoreProcesses.__init__(self)
+        MemoryStore.__init__(self, *db_args, **db_kwargs)
+        registry = kwargs.get("registry")
+        settings = kwargs.get("settings", {}) if not registry else registry.settings
+        default_processes = kwargs.get("default_processes")
+        self.default_host = get_weaver_url(settings)
+        self.default_wps_endpoint = get_wps_url(settings)
+
+        # enforce default process re-registration to receive any applicable update
+        if default_processes:
+            for process in default_processes:
+                self._add_process(process)
+
+    def _add_process(self, process):
+        # type: (AnyProcess) -> None
+        if isinstance(process, ProcessWPS):
+            new_process = Process.from_wps(process, processEndpointWPS1=self.default_wps_endpoint)
+        elif isinstance(process, Process):
+            new_process = process
+        else:
+            raise ProcessInstanceError("Unsupported process type '{}'".format(type(process)))
+
+        # apply defaults if not specified
+        new_process["type"] = getattr(process, "type", PROCESS_WPS).lower()
+        new_process["identifier"] = process.identifier
+        new_process["processEndpointWPS1"] = new_process.processEndpointWPS1 or self.default_wps_endpoint
+        new_process["visibility"] = new_process.visibility
+        # revision replaced on every modification, similarly to the document identifier of other databases
+        self.table.put(new_process.identifier, dict(new_process.params(), _id=uuid.uuid4().hex))
+
+    def save_process(self, process, overwrite=True):
+        # type: (Union[Process, ProcessWPS], bool) -> Process
+        """
+        Stores a process in memory.
+
+        :param process: An instance of :class:`weaver.datatype.Process`.
+        :param overwrite: Overwrite the matching process instance by name if conflicting.
+        """
+        if not isinstance(process, (Process, ProcessWPS)):
+            raise ProcessInstanceError("Unsupported process type '{}'".format(type(process)))
+        sane_name = get_sane_name(process.identifier, **self.sane_name_config)
+        if self.table.get(sane_name) is not None and not overwrite:
+            raise ProcessRegistrationError("Process '{}' already registered.".format(sane_name))
+        process.identifier = sane_name  # must use property getter/setter to match both 'Process' types
+        self._add_process(process)
+        return self.fetch_by_id(sane_name)
+
+    def delete_process(self, process_id, visibility=None):
+        # type: (str, Optional[str]) -> bool
+        """
+        Removes process from memory, optionally filtered by visibility.
+        If ``visibility=None``, the process is deleted (if existing) regardless of its visibility value.
+        """
+        sane_name = get_sane_name(process_id, **self.sane_name_config)
+        self.fetch_by_id(sane_name, visibility=visibility)
+        return self.table.delete(sane_name)
+
+    def list_processes(self, visibility=None):
+        # type: (Optional[str]) -> List[Process]
+        """
+        Lists all processes in memory, optionally filtered by `visibility`.
+
+        :param visibility: One value amongst `weaver.visibility`.
+        """
+        found = self.table.find(self._get_visibility_filter(visibility), sort=lambda doc: doc["identifier"])
+        return [Process(process) for process in found]
+
+    def list_process_revisions(self, visibility=None):
+        # type: (Optional[str]) -> Dict[str, str]
+        """
+        Lists the revision of every process in memory, optionally filtered by `visibility`.
+
+        :param visibility: One value amongst `weaver.visibility`.
+        :return: revisions of processes by identifier, ordered by identifier.
+        """
+        found = self.table.find(self._get_visibility_filter(visibility), sort=lambda doc: doc["identifier"])
+        return OrderedDict((process["identifier"], process.get("_id")) for process in found)
+
+    @staticmethod
+    def _get_visibility_filter(visibility):
+        # type: (Optional[str]) -> DocumentFilter
+        if visibility is None:
+            visibility = VISIBILITY_VALUES
+        if isinstance(visibility, str):
+            visibility = [visibility]
+        for v in visibility:
+            if v not in VISIBILITY_VALUES:
+                raise ValueError("Invalid visibility value '{0!s}' is not one of {1!s}"
+                                 .format(v, list(VISIBILITY_VALUES)))
+        return lambda doc: doc.get("visibility") in visibility
+
+    def fetch_by_id(self, process_id, visibility=None):
+        # type: (str, Optional[str]) -> Process
+        """
+        Get process for given `process_id` from memory, optionally filtered by `visibility`.
+        If ``visibility=None``, the process is retrieved (if existing) regardless of its visibility value.
+
+        :param process_id: process identifier
+        :param visibility: one value amongst `weaver.visibility`.
+        :return: An instance of :class:`weaver.datatype.Process`.
+        """
+        sane_name = get_sane_name(process_id, **self.sane_name_config)
+        process = self.table.get(sane_name)
+        if not process:
+            raise ProcessNotFound("Process '{}' could not be found.".format(sane_name))
+        process = Process(process)
+        if visibility is not None and process.visibility != visibility:
+            raise ProcessNotAccessible("Process '{}' cannot be accessed.".format(sane_name))
+        return process
+
+    def get_visibility(self, process_id):
+        # type: (str) -> str
+        """
+        Get `visibility` of a process.
+
+        :return: One value amongst `weaver.visibility`.
+        """
+        process = self.fetch_by_id(process_id)
+        return process.visibility
+
+    def set_visibility(self, process_id, visibility):
+        # type: (str, str) -> None
+        """
+        Set `visibility` of a process.
+
+        :param visibility: One value amongst `weaver.visibility`.
+        :param process_id:
+        :raises TypeError: when :paramref:`visibility` is not :class:`str`.
+        :raises ValueError: when :paramref:`visibility` is not one of :py:data:`weaver.visibility.VISIBILITY_VALUES`.
+        """
+        process = self.fetch_by_id(process_id)
+        process.visibility = visibility
+        self.save_process(process, overwrite=True)
+
+    def clear_processes(self):
+        # type: () -> bool
+        """
+        Clears all processes from the store.
+        """
+        self.table.clear()
+        return True
+
+
+class MemoryJobStore(StoreJobs, MemoryStore):
+    """
+    Registry for process jobs tracking. Uses memory to store job attributes.
+    """
+    def __init__(self, *args, **kwargs):
+        db_args, db_kwargs = MemoryStore.get_args_kwargs(*args, **kwargs)
+        StoreJobs.__init__(self)
+        MemoryStore.__init__(self, *db_args, **db_kwargs)
+        self.log_table = kwargs.get("log_table") or MemoryLogTable()  # type: MemoryLogTable
+
+    def save_job(self,
+                 task_id,                   # type: str
+                 process,                   # type: str
+                 service=None,              # type: Optional[str]
+                 inputs=None,               # type: Optional[List[Any]]
+                 is_workflow=False,         # type: bool
+                 is_local=False,            # type: bool
+                 user_id=None,              # type: Optional[int]
+                 execute_async=True,        # type: bool
+                 custom_tags=None,          # type: Optional[List[str]]
+                 access=None,               # type: Optional[str]
+                 notification_email=None,   # type: Optional[str]
+                 accept_language=None,      # type: Optional[str]
+                 ):                         # type: (...) -> Job
+        """
+        Stores a job in memory.
+        """
+        try:
+            tags = ["dev"]
+            tags.extend(list(filter(lambda t: bool(t), custom_tags or [])))  # remove empty tags
+            tags.append(PROCESS_WORKFLOW if is_workflow else PROCESS_APPLICATION)
+            tags.append(EXECUTE_MODE_ASYNC if execute_async else EXECUTE_MODE_SYNC)
+            new_job = Job({
+                "task_id": task_id,
+                "user_id": user_id,
+                "service": service,     # provider identifier (WPS service)
+                "process": process,     # process identifier (WPS request)
+                "inputs": inputs,
+                "status": map_status(STATUS_ACCEPTED),
+                "execute_async": execute_async,
+                "is_workflow": is_workflow,
+                "is_local": is_local,
+                "created": now(),
+                "tags": list(set(tags)),  # remove duplicates
+                "access": access or VISIBILITY_PRIVATE,
+                "notification_email": notification_email,
+                "accept_language": accept_language,
+            })
+            self.table.put(new_job.id, new_job.params())
+            job = self.fetch_by_id(job_id=new_job.id)
+        except Exception as ex:
+            raise JobRegistrationError("Error occurred during job registration: [{}]".format(repr(ex)))
+        return job
+
+    def update_job(self, job, refresh=True):
+        # type: (Job, bool) -> Job
+        """
+        Updates a job parameters in memory.
+
+        Only fields modified since the job was retrieved or last updated are written, and new log entries are appended,
+        all within a single transaction.
+
+        :param job: instance of ``weaver.datatype.Job``.
+        :param refresh: retrieve the updated job from storage, otherwise return the same (synchronized) instance.
+        """
+        try:
+            fields, logs = job.get_changes()
+            if fields or logs:
+                with self.table.transaction():
+                    if logs:
+                        self._move_embedded_logs(job.id)
+                    if not self.table.update(job.id, fields):
+                        raise JobNotFound("Could not find job matching: '{}'".format(job.id))
+                    if logs:
+                        self.log_table.append(job.id, logs)
+            if refresh:
+                return self.fetch_by_id(job.id)
+            job.reset_changes()
+            return job
+        except Exception as ex:
+            raise JobUpdateError("Error occurred during job update: [{}]".format(repr(ex)))
+
+    def delete_job(self, job_id):
+        # type: (str) -> bool
+        """
+        Removes job and its logs from memory.
+        """
+        self.table.delete(job_id)
+        self.log_table.delete(job_id)
+        return True
+
+    def fetch_by_id(self, job_id):
+        # type: (str) -> Job
+        """
+        Gets job for given ``job_id`` from memory.
+        """
+        job = self.table.get(job_id)
+        if not job:
+            raise JobNotFound("Could not find job matching: '{}'".format(job_id))
+        job.pop("logs", None)
+        return Job(job)
+
+    def fetch_logs(self, job_id, since=0, limit=None):
+        # type: (str, int, Optional[int]) -> List[Tuple[int, str]]
+        """
+        Gets log entries of the job for given ``job_id`` from memory.
+
+        :param job_id: job for which to retrieve log entries.
+        :param since: sequence number of the first log entry to retrieve.
+        :param limit: maximum number of log entries to retrieve (all remaining entries if not specified).
+        :returns: pairs of sequence number and log entry.
+        """
+        logs = self.log_table.fetch(job_id, since=since, limit=limit)
+        if not logs:
+            if self.table.get(job_id) is None:
+                raise JobNotFound("Could not find job matching: '{}'".format(job_id))
+            if self._move_embedded_logs(job_id):
+                logs = self.log_table.fetch(job_id, since=since, limit=limit)
+        return logs
+
+    def _move_embedded_logs(self, job_id):
+        # type: (str) -> bool
+        """
+        Moves log entries embedded in the job document by previous versions to the log table.
+
+        :returns: whether any log entry was moved.
+        """
+        with self.table.transaction():
+            logs = self.table.pop(job_id, "logs")
+            if not logs:
+                return False
+            self.log_table.append(job_id, logs)
+            return True
+
+    def list_jobs(self):
+        # type: () -> List[Job]
+        """
+        Lists all jobs in memory.
+        For user-specific access to available jobs, use :meth:`MemoryJobStore.find_jobs` instead.
+        """
+        return [Job(job) for job in self.table.find(sort=lambda doc: doc["id"])]
+
+    def find_jobs(self,
+                  process=None,             # type: Optional[str]
+                  service=None,             # type: Optional[str]
+                  tags=None,                # type: Optional[List[str]]
+                  access=None,              # type: Optional[str]
+                  notification_email=None,  # type: Optional[str]
+                  status=None,              # type: Optional[str]
+                  sort=None,                # type: Optional[str]
+                  page=0,                   # type: int
+                  limit=10,                 # type: int
+                  group_by=None,            # type: Optional[Union[str, List[str]]]
+                  request=None,             # type: Optional[Request]
+                  fields=None,              # type: Optional[Iterable[str]]
+                  cursor=None,              # type: Optional[str]
+                  ):                        # type: (...) -> Union[JobListAndCount, JobCategoriesAndCount]
+        """
+        Finds all jobs in memory matching search filters to obtain results with requested paging or grouping.
+
+        Filters, paging, grouping and cursor behave as in :meth:`weaver.store.mongodb.MongodbJobStore.find_jobs`.
+        Complete jobs are always returned regardless of ``fields``, and ``total`` is always exact.
+        """
+        if any(v in (tags or []) for v in VISIBILITY_VALUES):
+            raise ValueError("Visibility values not acceptable in 'tags', use 'access' instead.")
+
+        search_filters = {}
+        if not request:
+            search_filters["access"] = VISIBILITY_PUBLIC
+        else:
+            if request.has_permission("admin") and access in VISIBILITY_VALUES:
+                search_filters["access"] = access
+            else:
+                user_id = request.authenticated_userid
+                if user_id is not None:
+                    search_filters["user_id"] = user_id
+                    if access in VISIBILITY_VALUES:
+                        search_filters["access"] = access
+                else:
+                    search_filters["access"] = VISIBILITY_PUBLIC
+        for field, value in [("notification_email", notification_email), ("process", process), ("service", service)]:
+            if value is not None:
+                search_filters[field] = value
+        statuses = JOB_STATUS_CATEGORIES.get(status, [status] if status else None)
+
+        def search(job):
+            # type: (Document) -> bool
+            return (
+                all(job.get(key) == val for key, val in search_filters.items())
+                and (not tags or all(tag in (job.get("tags") or []) for tag in tags))
+                and (not statuses or job.get("status") in statuses)
+            )
+
+        if sort is None:
+            sort = SORT_CREATED
+        elif sort == SORT_USER:
+            sort = "user_id"
+        if sort not in JOB_SORT_VALUES:
+            raise JobNotFound("Invalid sorting method: '{}'".format(repr(sort)))
+        descending = sort in (SORT_FINISHED, SORT_CREATED)
+
+        if group_by:
+            group_by = [group_by] if isinstance(group_by, str) else group_by  # type: List[str]
+            groups = {}  # type: Dict[str, Dict[str, Any]]
+            for job in self.table.find(search, sort=self._sort_key(sort), reverse=descending):
+                job.pop("logs", None)
+                category = {field: job.get(field) for field in group_by}
+                group = groups.setdefault(json_util.dumps(category, sort_keys=True),
+                                          {"category": category, "jobs": [], "count": 0})
+                group["jobs"].append(Job(job))
+                group["count"] += 1
+            items = list(groups.values())
+            return items, sum(group["count"] for group in items)
+
+        try:
+            found, total = self._find(search, sort, descending=descending, page=page, limit=limit, cursor=cursor)
+        except ValueError as exc:
+            raise JobNotFound(str(exc))
+        for job in found:
+            job.pop("logs", None)
+        return [Job(job) for job in found], total
+
+    def make_cursor(self, job, sort=None):
+        # type: (Job, Optional[str]) -> str
+        if sort is None:
+            sort = SORT_CREATED
+        elif sort == SORT_USER:
+            sort = "user_id"
+        return encode_cursor(job, sort)
+
+    def clear_jobs(self):
+        # type: () -> bool
+        """
+        Removes all jobs and their logs from memory.
+        """
+        self.table.clear()
+        self.log_table.clear()
+        return True
+
+
+class MemoryQuoteStore(StoreQuotes, MemoryStore):
+    """
+    Registry for quotes. Uses memory to store quote attributes.
+    """
+    def __init__(self, *args, **kwargs):
+        db_args, db_kwargs = MemoryStore.get_args_kwargs(*args, **kwargs)
+        StoreQuotes.__init__(self)
+        MemoryStore.__init__(self, *db_args, **db_kwargs)
+
+    def save_quote(self, quote):
+        # type: (Quote) -> Quote
+        """
+        Stores a quote in memory.
+        """
+        if not isinstance(quote, Quote):
+            raise QuoteInstanceError("Invalid quote object: '{}'".format(repr(quote)))
+        try:
+            self.table.put(quote.id, quote.params())
+            quote = self.fetch_by_id(quote_id=quote.id)
+        except Exception as ex:
+            raise QuoteRegistrationError("Error occurred during quote registration: [{}]".format(repr(ex)))
+        return quote
+
+    def fetch_by_id(self, quote_id):
+        # type: (str) -> Quote
+        """
+        Gets quote for given ``quote_id`` from memory.
+        """
+        quote = self.table.get(quote_id)
+        if not quote:
+            raise QuoteNotFound("Could not find quote matching: '{}'".format(quote_id))
+        return Quote(quote)
+
+    def list_quotes(self):
+        # type: (...) -> List[Quote]
+        """
+        Lists all quotes in memory.
+        """
+        return [Quote(quote) for quote in self.table.find(sort=lambda doc: doc["id"])]
+
+    def find_quotes(self, process_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Quote], int]
+        """
+        Finds all quotes in memory matching search filters.
+
+        Returns a tuple of filtered ``items`` and their ``count``, where ``items`` can have paging and be limited
+        to a maximum per page, but ``count`` always indicate the `total` number of matches.
+
+        When a ``cursor`` obtained from :meth:`make_cursor` is provided, ``items`` following it are returned instead
+        of the ``page``.
+        """
+        if sort is None:
+            sort = SORT_ID
+        if sort not in QUOTE_SORT_VALUES:
+            raise QuoteNotFound("Invalid sorting method: '{!s}'".format(sort))
+
+        def search(quote):
+            # type: (Document) -> bool
+            return not isinstance(process_id, str) or quote.get("process") == process_id
+
+        try:
+            found, count = self._find(search, sort, page=page, limit=limit, cursor=cursor)
+        except ValueError as exc:
+            raise QuoteNotFound(str(exc))
+        return [Quote(quote) for quote in found], count
+
+    def make_cursor(self, quote, sort=None):
+        # type: (Quote, Optional[str]) -> str
+        return encode_cursor(quote, sort or SORT_ID)
+
+
+class MemoryBillStore(StoreBills, MemoryStore):
+    """
+    Registry for bills. Uses memory to store bill attributes.
+    """
+    def __init__(self, *args, **kwargs):
+        db_args, db_kwargs = MemoryStore.get_args_kwargs(*args, **kwargs)
+        StoreBills.__init__(self)
+        MemoryStore.__init__(self, *db_args, **db_kwargs)
+
+    def save_bill(self, bill):
+        # type: (Bill) -> Bill
+        """
+        Stores a bill in memory.
+        """
+        if not isinstance(bill, Bill):
+            raise BillInstanceError("Invalid bill object: '{}'".format(repr(bill)))
+        try:
+            self.table.put(bill.id, bill.params())
+            bill = self.fetch_by_id(bill_id=bill.id)
+        except Exception as ex:
+            raise BillRegistrationError("Error occurred during bill registration: [{}]".format(repr(ex)))
+        return bill
+
+    def fetch_by_id(self, bill_id):
+        # type: (str) -> Bill
+        """
+        Gets bill for given ``bill_id`` from memory.
+        """
+        bill = self.table.get(bill_id)
+        if not bill:
+            raise BillNotFound("Could not find bill matching: '{}'".format(bill_id))
+        return Bill(bill)
+
+    def list_bills(self):
+        # type: (...) -> List[Bill]
+        """
+        Lists all bills in memory.
+        """
+        return [Bill(bill) for bill in self.table.find(sort=lambda doc: doc["id"])]
+
+    def find_bills(self, quote_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Bill], int]
+        """
+        Finds all bills in memory matching search filters.
+
+        Returns a tuple of filtered ``items`` and their ``count``, where ``items`` can have paging and be limited
+        to a maximum per page, but ``count`` always indicate the `total` number of matches.
+
+        When a ``cursor`` obtained from :meth:`make_cursor` is provided, ``items`` following it are returned instead
+        of the ``page``.
+        """
+        if sort is None:
+            sort = SORT_ID
+        if sort not in BILL_SORT_VALUES:
+            raise BillNotFound("Invalid sorting method: '{}'".format(repr(sort)))
+
+        def search(bill):
+            # type: (Document) -> bool
+            return not isinstance(quote_id, str) or bill.get("quote") == quote_id
+
+        try:
+            found, count = self._find(search, sort, page=page, limit=limit, cursor=cursor)
+        except ValueError as exc:
+            raise BillNotFound(str(exc))
+        return [Bill(bill) for bill in found], count
+
+    def make_cursor(self, bill, sort=None):
+        # type: (Bill, Optional[str]) -> str
+        return encode_cursor(bill, sort or SORT_ID)
@@ -3,10 +3,13 @@ Stores to read/write data to from/to `MongoDB` using pymongo.
 """
 
 import logging
+from collections import OrderedDict
+from copy import copy
+from datetime import timedelta, timezone
 from typing import TYPE_CHECKING
 
 import pymongo
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from pyramid.request import Request
 from pywps import Process as ProcessWPS
 
@@ -41,20 +44,31 @@ from weaver.sort import (
     SORT_USER
 )
 from weaver.status import JOB_STATUS_CATEGORIES, STATUS_ACCEPTED, map_status
-from weaver.store.base import StoreBills, StoreJobs, StoreProcesses, StoreQuotes, StoreServices
-from weaver.utils import get_base_url, get_sane_name, get_weaver_url, islambda, now
+from weaver.store.base import (
+    StoreBills,
+    StoreJobs,
+    StoreProcesses,
+    StoreQuotes,
+    StoreServices,
+    decode_cursor,
+    encode_cursor
+)
+from weaver.utils import LRUCache, get_base_url, get_sane_name, get_weaver_url, islambda, now
 from weaver.visibility import VISIBILITY_PRIVATE, VISIBILITY_PUBLIC, VISIBILITY_VALUES
 from weaver.wps.utils import get_wps_url
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+    from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
     from pymongo.collection import Collection
 
     from weaver.store.base import JobCategoriesAndCount, JobListAndCount
-    from weaver.typedefs import AnyProcess, AnyProcessType
+    from weaver.typedefs import AnyProcess, AnyProcessType, JSON
 
 LOGGER = logging.getLogger(__name__)
 
+# delay (seconds) after which log entries reserved by a job update but still not inserted are considered lost
+JOB_LOG_INSERT_TIMEOUT = 60
+
 
 class MongodbStore(object):
     """
@@ -82,6 +96,30 @@ class MongodbStore(object):
         sane_name_config = kwargs.get("sane_name_config", None)
         return tuple([collection]), {"sane_name_config": sane_name_config}
 
+    @staticmethod
+    def _get_cursor_filter(cursor, field, order):
+        # type: (str, str, int) -> Dict[str, Any]
+        """
+        Obtains the search filter matching items that follow the position of the cursor in the sorted listing.
+
+        Items are considered sorted by ``field`` in specified ``order`` followed by their ``id`` in the same order.
+        Missing or ``null`` values are sorted before any other value.
+
+        :raises ValueError: if the cursor is invalid or was generated for another sorting field.
+        """
+        value, item_id = decode_cursor(cursor, field)
+        op = "$gt" if order == ASCENDING else "$lt"
+        if field == "id":
+            return {"id": {op: item_id}}
+        following = [{field: value, "id": {op: item_id}}]
+        if value is None and order == ASCENDING:
+            following.insert(0, {field: {"$ne": None}})
+        elif value is not None:
+            following.insert(0, {field: {op: value}})
+            if order == DESCENDING:
+                following.append({field: None})
+        return {"$or": following}
+
 
 class MongodbServiceStore(StoreServices, MongodbStore):
     """
@@ -184,6 +222,12 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         default_processes = kwargs.get("default_processes")
         self.default_host = get_weaver_url(settings)
         self.default_wps_endpoint = get_wps_url(settings)
+        # cache of decoded processes, reused only while their revision in storage remains the same
+        cache_size = settings.get("weaver.process_cache_size")
+        cache_size = int(cache_size) if cache_size not in (None, "") else 100
+        cache_expire = settings.get("weaver.process_cache_expire")
+        cache_expire = float(cache_expire) if cache_expire not in (None, "") else 30
+        self._cache = LRUCache(max_size=cache_size, expire=cache_expire) if cache_size and cache_expire else None
 
         # enforce default process re-registration to receive any applicable update
         if default_processes:
@@ -209,6 +253,8 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         new_process["processEndpointWPS1"] = self._get_process_endpoint_wps1(process)
         new_process["visibility"] = new_process.visibility
         self.collection.insert_one(new_process.params())
+        if self._cache is not None:
+            self._cache.pop(new_process.identifier)
 
     @staticmethod
     def _get_process_field(process, function_dict):
@@ -279,7 +325,10 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         process = self.fetch_by_id(sane_name, visibility=visibility)
         if not process:
             raise ProcessNotFound("Process '{}' could not be found.".format(sane_name))
-        return bool(self.collection.delete_one({"identifier": sane_name}).deleted_count)
+        deleted = bool(self.collection.delete_one({"identifier": sane_name}).deleted_count)
+        if self._cache is not None:
+            self._cache.pop(sane_name)
+        return deleted
 
     def list_processes(self, visibility=None):
         # type: (Optional[str]) -> List[Process]
@@ -289,7 +338,30 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         :param visibility: One value amongst `weaver.visibility`.
         """
         db_processes = []
-        search_filters = {}
+        search_filters = self._get_visibility_filter(visibility)
+        for process in self.collection.find(search_filters).sort("identifier", pymongo.ASCENDING):
+            db_processes.append(Process(process))
+        return db_processes
+
+    def list_process_revisions(self, visibility=None):
+        # type: (Optional[str]) -> Dict[str, str]
+        """
+        Lists the revision of every process in database, optionally filtered by `visibility`.
+
+        Every modification of a process replaces its document, which provides a new revision. Modified processes can
+        therefore be detected without retrieving their complete definition.
+
+        :param visibility: One value amongst `weaver.visibility`.
+        :return: revisions of processes by identifier, ordered by identifier.
+        """
+        search_filters = self._get_visibility_filter(visibility)
+        processes = self.collection.find(search_filters, projection={"identifier": True})
+        return OrderedDict((process["identifier"], str(process["_id"]))
+                           for process in processes.sort("identifier", pymongo.ASCENDING))
+
+    @staticmethod
+    def _get_visibility_filter(visibility):
+        # type: (Optional[str]) -> JSON
         if visibility is None:
             visibility = VISIBILITY_VALUES
         if isinstance(visibility, str):
@@ -298,10 +370,7 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
             if v not in VISIBILITY_VALUES:
                 raise ValueError("Invalid visibility value '{0!s}' is not one of {1!s}"
                                  .format(v, list(VISIBILITY_VALUES)))
-        search_filters["visibility"] = {"$in": list(visibility)}
-        for process in self.collection.find(search_filters).sort("identifier", pymongo.ASCENDING):
-            db_processes.append(Process(process))
-        return db_processes
+        return {"visibility": {"$in": list(visibility)}}
 
     def fetch_by_id(self, process_id, visibility=None):
         # type: (str, Optional[str]) -> Process
@@ -309,15 +378,32 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         Get process for given `process_id` from storage, optionally filtered by `visibility`.
         If ``visibility=None``, the process is retrieved (if existing) regardless of its visibility value.
 
+        Retrieved processes are cached once decoded, and reused by subsequent calls as long as their revision in storage
+        remains the same. Only the revision of cached processes is retrieved, such that modifications applied by any
+        worker are considered immediately without retrieving and decoding unmodified definitions again.
+
+        Fields of the returned process can be replaced, but their nested definitions (package, payload, inputs, etc.)
+        are shared with the cache and must be copied before modification.
+
         :param process_id: process identifier
         :param visibility: one value amongst `weaver.visibility`.
         :return: An instance of :class:`weaver.datatype.Process`.
         """
         sane_name = get_sane_name(process_id, **self.sane_name_config)
-        process = self.collection.find_one({"identifier": sane_name})
-        if not process:
-            raise ProcessNotFound("Process '{}' could not be found.".format(sane_name))
-        process = Process(process)
+        process = self._cache.get(sane_name) if self._cache is not None else None
+        if process is not None:
+            revision = self.collection.find_one({"identifier": sane_name}, projection={"_id": True})
+            if not revision or revision["_id"] != process.get("_id"):
+                self._cache.pop(sane_name)
+                process = None
+        if process is None:
+            process = self.collection.find_one({"identifier": sane_name})
+            if not process:
+                raise ProcessNotFound("Process '{}' could not be found.".format(sane_name))
+            process = Process(process)
+            if self._cache is not None:
+                self._cache.set(sane_name, process)
+        process = copy(process)  # only top-level fields, to preserve the cached process if they get replaced
         if visibility is not None and process.visibility != visibility:
             raise ProcessNotAccessible("Process '{}' cannot be accessed.".format(sane_name))
         return process
@@ -351,6 +437,8 @@ class MongodbProcessStore(StoreProcesses, MongodbStore):
         """
         Clears all processes from the store.
         """
+        if self._cache is not None:
+            self._cache.clear()
         self.collection.drop()
         return True
 
@@ -363,6 +451,7 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         db_args, db_kwargs = MongodbStore.get_args_kwargs(*args, **kwargs)
         StoreJobs.__init__(self)
         MongodbStore.__init__(self, *db_args, **db_kwargs)
+        self.log_collection = self.collection.database.job_logs  # type: Collection
 
     def save_job(self,
                  task_id,                   # type: str
@@ -418,16 +507,48 @@ class MongodbJobStore(StoreJobs, MongodbStore):
             raise JobRegistrationError("Failed to retrieve registered job.")
         return job
 
-    def update_job(self, job):
-        # type: (Job) -> Job
+    def update_job(self, job, refresh=True):
+        # type: (Job, bool) -> Job
         """
         Updates a job parameters in `MongoDB` storage.
+
+        Only fields modified since the job was retrieved or last updated are written. New log entries are inserted in
+        the job log collection with their sequence number reserved using the ``log_count`` of the job document.
+
         :param job: instance of ``weaver.datatype.Job``.
+        :param refresh: retrieve the updated job from storage, otherwise return the same (synchronized) instance.
         """
         try:
-            result = self.collection.update_one({"id": job.id}, {"$set": job.params()})
-            if result.acknowledged and result.matched_count == 1:
-                return self.fetch_by_id(job.id)
+            fields, logs = job.get_changes()
+            update = {}
+            if fields:
+                update["$set"] = fields
+            if not update and not logs:
+                return self.fetch_by_id(job.id) if refresh else job
+            if logs:
+                update["$inc"] = {"log_count": len(logs)}
+                # sequence numbers are reserved only once embedded log entries of older jobs are moved
+                search = {"id": job.id, "logs": {"$exists": False}}
+                options = dict(projection={"_id": False, "log_count": True}, return_document=ReturnDocument.AFTER)
+                result = self.collection.find_one_and_update(search, update, **options)
+                if result is None and self._move_embedded_logs(job.id):
+                    result = self.collection.find_one_and_update(search, update, **options)
+                updated = result is not None
+                if updated:
+                    first_seq = result["log_count"] - len(logs)
+                    created = now()
+                    self.log_collection.insert_many([
+                        {"job": job.id, "seq": first_seq + i, "log": log, "created": created}
+                        for i, log in enumerate(logs)
+                    ])
+            else:
+                result = self.collection.update_one({"id": job.id}, update)
+                updated = result.acknowledged and result.matched_count == 1
+            if updated:
+                if refresh:
+                    return self.fetch_by_id(job.id)
+                job.reset_changes()
+                return job
         except Exception as ex:
             raise JobUpdateError("Error occurred during job update: [{}]".format(repr(ex)))
         raise JobUpdateError("Failed to update specified job: '{}'".format(str(job)))
@@ -435,9 +556,10 @@ class MongodbJobStore(StoreJobs, MongodbStore):
     def delete_job(self, job_id):
         # type: (str) -> bool
         """
-        Removes job from `MongoDB` storage.
+        Removes job and its logs from `MongoDB` storage.
         """
         self.collection.delete_one({"id": job_id})
+        self.log_collection.delete_many({"job": job_id})
         return True
 
     def fetch_by_id(self, job_id):
@@ -445,11 +567,75 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         """
         Gets job for given ``job_id`` from `MongoDB` storage.
         """
-        job = self.collection.find_one({"id": job_id})
+        job = self.collection.find_one({"id": job_id}, {"logs": False})
         if not job:
             raise JobNotFound("Could not find job matching: '{}'".format(job_id))
         return Job(job)
 
+    def fetch_logs(self, job_id, since=0, limit=None):
+        # type: (str, int, Optional[int]) -> List[Tuple[int, str]]
+        """
+        Gets log entries of the job for given ``job_id`` from `MongoDB` storage.
+
+        Log entries are identified by contiguous sequence numbers in the order they were added to the job log.
+        Entries following ones reserved by a concurrent job update but not yet inserted are not returned, such that
+        retrieving the following entries from the next sequence number does not skip them.
+        Jobs saved before logs were stored in a dedicated collection have their embedded log entries moved to it.
+
+        :param job_id: job for which to retrieve log entries.
+        :param since: sequence number of the first log entry to retrieve.
+        :param limit: maximum number of log entries to retrieve (all remaining entries if not specified).
+        :returns: pairs of sequence number and log entry.
+        """
+        search = {"job": job_id, "seq": {"$gte": since}}
+        fields = {"_id": False, "seq": True, "log": True, "created": True}
+        found = list(self.log_collection.find(search, fields).sort("seq", ASCENDING).limit(limit or 0))
+        if not found:
+            job = self.collection.find_one({"id": job_id}, {"_id": False, "id": True, "logs": True})
+            if not job:
+                raise JobNotFound("Could not find job matching: '{}'".format(job_id))
+            if "logs" not in job or not self._move_embedded_logs(job_id):
+                return []
+            found = list(self.log_collection.find(search, fields).sort("seq", ASCENDING).limit(limit or 0))
+        logs = []
+        expected_seq = since
+        inserted_before = now() - timedelta(seconds=JOB_LOG_INSERT_TIMEOUT)
+        for entry in found:
+            created = entry.get("created")
+            if created is not None and created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            if entry["seq"] != expected_seq and created and created > inserted_before:
+                break
+            logs.append((entry["seq"], entry["log"]))
+            expected_seq = entry["seq"] + 1
+        return logs
+
+    def _move_embedded_logs(self, job_id):
+        # type: (str) -> bool
+        """
+        Moves log entries embedded in the document of a job saved before logs were stored in a dedicated collection.
+
+        Concurrent calls for the same job insert each entry only once.
+
+        :returns: whether the job exists.
+        """
+        job = self.collection.find_one({"id": job_id}, {"_id": False, "logs": True})
+        if not job:
+            return False
+        if "logs" not in job:
+            return True
+        logs = job["logs"] or []
+        if logs:
+            created = now()
+            self.log_collection.bulk_write([
+                UpdateOne({"job": job_id, "seq": seq},
+                          {"$setOnInsert": {"job": job_id, "seq": seq, "log": log, "created": created}}, upsert=True)
+                for seq, log in enumerate(logs)
+            ], ordered=False)
+        self.collection.update_one({"id": job_id, "logs": {"$exists": True}},
+                                   {"$unset": {"logs": ""}, "$max": {"log_count": len(logs)}})
+        return True
+
     def list_jobs(self):
         # type: () -> List[Job]
         """
@@ -457,7 +643,7 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         For user-specific access to available jobs, use :meth:`MongodbJobStore.find_jobs` instead.
         """
         jobs = []
-        for job in self.collection.find().sort("id", ASCENDING):
+        for job in self.collection.find({}, {"logs": False}).sort("id", ASCENDING):
             jobs.append(Job(job))
         return jobs
 
@@ -473,6 +659,8 @@ class MongodbJobStore(StoreJobs, MongodbStore):
                   limit=10,                 # type: int
                   group_by=None,            # type: Optional[Union[str, List[str]]]
                   request=None,             # type: Optional[Request]
+                  fields=None,              # type: Optional[Iterable[str]]
+                  cursor=None,              # type: Optional[str]
                   ):                        # type: (...) -> Union[JobListAndCount, JobCategoriesAndCount]
         """
         Finds all jobs in `MongoDB` storage matching search filters to obtain results with requested paging or grouping.
@@ -488,6 +676,12 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         :param page: page number to return when using result paging (only when not using ``group_by``).
         :param limit: number of jobs per page when using result paging (only when not using ``group_by``).
         :param group_by: one or many fields specifying categories to form matching groups of jobs (paging disabled).
+        :param fields:
+            job fields to retrieve for matched jobs (all fields if not specified), ``id`` and ``task_id`` are always
+            retrieved to allow the creation of returned jobs, but other fields will be unavailable.
+        :param cursor:
+            token obtained from :meth:`make_cursor` with the last job of a previous page using the same ``sort``, to
+            retrieve the following jobs instead of skipping over ``page`` (only when not using ``group_by``).
 
         :returns: (list of jobs matching paging OR list of {categories, list of jobs, count}) AND total of matched job
 
@@ -561,7 +755,14 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         if sort not in JOB_SORT_VALUES:
             raise JobNotFound("Invalid sorting method: '{}'".format(repr(sort)))
         sort_order = DESCENDING if sort in (SORT_FINISHED, SORT_CREATED) else ASCENDING
-        sort_criteria = {sort: sort_order}
+        sort_criteria = {sort: sort_order, "id": sort_order}  # unique tie-breaker for consistent paging
+
+        # retrieve only requested fields, or otherwise all except embedded logs of older jobs
+        if fields:
+            projection = {field: True for field in set(fields) | {"id", "task_id", sort}}
+            projection["_id"] = False
+        else:
+            projection = {"logs": False}
 
         # minimal operation, only search for matches and sort them
         pipeline = [{"$match": search_filters}, {"$sort": sort_criteria}]
@@ -570,7 +771,11 @@ class MongodbJobStore(StoreJobs, MongodbStore):
         if group_by:
             group_by = [group_by] if isinstance(group_by, str) else group_by  # type: List[str]
             group_categories = {field: "$" + field for field in group_by}   # fields that can generate groups
+            if fields:
+                projection.update({field: True for field in group_by})
             pipeline.extend([{
+                "$project": projection
+            }, {
                 "$group": {
                     "_id": group_categories,        # grouping categories to aggregate corresponding jobs
                     "jobs": {"$push": "$$ROOT"},    # matched jobs for corresponding grouping categories
@@ -586,22 +791,49 @@ class MongodbJobStore(StoreJobs, MongodbStore):
             found = self.collection.aggregate(pipeline)
             items = [{k: (v if k != "jobs" else [Job(j) for j in v])    # convert to Job object where applicable
                       for k, v in i.items()} for i in found]
-
-        # results with paging
-        else:
-            pipeline.extend([{"$skip": page * limit}, {"$limit": limit}])
+            # every matched job is part of exactly one group
+            total = sum(group["count"] for group in items)
+
+        # results following the cursor position, resolved by index regardless of the depth in the listing
+        elif cursor:
+            try:
+                cursor_filters = self._get_cursor_filter(cursor, sort, sort_order)
+            except ValueError as exc:
+                raise JobNotFound(str(exc))
+            pipeline[0] = {"$match": {"$and": [search_filters, cursor_filters]}}
+            pipeline.extend([{"$limit": limit}, {"$project": projection}])
             found = self.collection.aggregate(pipeline)
             items = [Job(item) for item in list(found)]
+            total = self.collection.count_documents(search_filters)
 
-        total = self.collection.count_documents(search_filters)
+        # results with paging, counting matches within the same query
+        else:
+            pipeline.append({
+                "$facet": {
+                    "items": [{"$skip": page * limit}, {"$limit": limit}, {"$project": projection}],
+                    "total": [{"$count": "total"}],
+                }
+            })
+            found = list(self.collection.aggregate(pipeline))[0]
+            items = [Job(item) for item in found["items"]]
+            total = found["total"][0]["total"] if found["total"] else 0
         return items, total
 
+    def make_cursor(self, job, sort=None):
+        # type: (Job, Optional[str]) -> str
+        if sort is None:
+            sort = SORT_CREATED
+        elif sort == SORT_USER:
+            sort = "user_id"
+        return encode_cursor(job, sort)
+
     def clear_jobs(self):
         # type: () -> bool
         """
-        Removes all jobs from `MongoDB` storage.
+        Removes all jobs and their logs from `MongoDB` storage.
         """
         self.collection.drop()
+        self.log_collection.drop()
         return True
 
 
@@ -650,13 +882,16 @@ class MongodbQuoteStore(StoreQuotes, MongodbStore):
             quotes.append(Quote(quote))
         return quotes
 
-    def find_quotes(self, process_id=None, page=0, limit=10, sort=None):
-        # type: (Optional[str], int, int, Optional[str]) -> Tuple[List[Quote], int]
+    def find_quotes(self, process_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Quote], int]
         """
         Finds all quotes in `MongoDB` storage matching search filters.
 
         Returns a tuple of filtered ``items`` and their ``count``, where ``items`` can have paging and be limited
         to a maximum per page, but ``count`` always indicate the `total` number of matches.
+
+        When a ``cursor`` obtained from :meth:`make_cursor` is provided, ``items`` following it are returned instead
+        of the ``page``.
         """
         search_filters = {}
 
@@ -670,11 +905,24 @@ class MongodbQuoteStore(StoreQuotes, MongodbStore):
 
         sort_order = ASCENDING
         sort_criteria = [(sort, sort_order)]
-        found = self.collection.find(search_filters)
-        count = found.count()
-        items = [Quote(item) for item in list(found.skip(page * limit).limit(limit).sort(sort_criteria))]
+        if sort != SORT_ID:
+            sort_criteria.append(("id", sort_order))  # unique tie-breaker for consistent paging
+        count = self.collection.count_documents(search_filters)
+        if cursor:
+            try:
+                search_filters = {"$and": [search_filters, self._get_cursor_filter(cursor, sort, sort_order)]}
+            except ValueError as exc:
+                raise QuoteNotFound(str(exc))
+            found = self.collection.find(search_filters)
+        else:
+            found = self.collection.find(search_filters).skip(page * limit)
+        items = [Quote(item) for item in list(found.limit(limit).sort(sort_criteria))]
         return items, count
 
+    def make_cursor(self, quote, sort=None):
+        # type: (Quote, Optional[str]) -> str
+        return encode_cursor(quote, sort or SORT_ID)
+
 
 class MongodbBillStore(StoreBills, MongodbStore):
     """
@@ -721,13 +969,16 @@ class MongodbBillStore(StoreBills, MongodbStore):
             bills.append(Bill(bill))
         return bills
 
-    def find_bills(self, quote_id=None, page=0, limit=10, sort=None):
-        # type: (Optional[str], int, int, Optional[str]) -> Tuple[List[Bill], int]
+    def find_bills(self, quote_id=None, page=0, limit=10, sort=None, cursor=None):
+        # type: (Optional[str], int, int, Optional[str], Optional[str]) -> Tuple[List[Bill], int]
         """
         Finds all bills in `MongoDB` storage matching search filters.
 
         Returns a tuple of filtered ``items`` and their ``count``, where ``items`` can have paging and be limited
         to a maximum per page, but ``count`` always indicate the `total` number of matches.
+
+        When a ``cursor`` obtained from :meth:`make_cursor` is provided, ``items`` following it are returned instead
+        of the ``page``.
         """
         search_filters = {}
 
@@ -741,7 +992,20 @@ class MongodbBillStore(StoreBills, MongodbStore):
 
         sort_order = ASCENDING
         sort_criteria = [(sort, sort_order)]
-        found = self.collection.find(search_filters)
-        count = found.count()
-        items = [Bill(item) for item in list(found.skip(page * limit).limit(limit).sort(sort_criteria))]
+        if sort != SORT_ID:
+            sort_criteria.append(("id", sort_order))  # unique tie-breaker for consistent paging
+        count = self.collection.count_documents(search_filters)
+        if cursor:
+            try:
+                search_filters = {"$and": [search_filters, self._get_cursor_filter(cursor, sort, sort_order)]}
+            except ValueError as exc:
+                raise BillNotFound(str(exc))
+            found = self.collection.find(search_filters)
+        else:
+            found = self.collection.find(search_filters).skip(page * limit)
+        items = [Bill(item) for item in list(found.limit(limit).sort(sort_criteria))]
         return items, count
+
+    def make_cursor(self, bill, sort=None):
+        # type: (Bill, Optional[str]) -> str
+        return encode_cursor(bill, sort or SORT_ID)
@@ -1,15 +1,26 @@
+import base64
+import ctypes
+import ctypes.util
 import errno
+import functools
+import hashlib
 import inspect
 import logging
 import os
 import re
+import select
 import shutil
 import sys
+import threading
 import time
 import types
+import uuid
 import warnings
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
 from typing import TYPE_CHECKING
 from urllib.parse import ParseResult, parse_qs, urlparse, urlunsplit
 
@@ -20,13 +31,20 @@ import requests
 from celery.app import Celery
 from lxml import etree
 from pyramid.config import Configurator
-from pyramid.httpexceptions import HTTPError as PyramidHTTPError, HTTPGatewayTimeout, HTTPTooManyRequests
+from pyramid.httpexceptions import (
+    HTTPError as PyramidHTTPError,
+    HTTPGatewayTimeout,
+    HTTPPartialContent,
+    HTTPTooManyRequests
+)
 from pyramid.registry import Registry
 from pyramid.request import Request
 from pyramid.settings import asbool, aslist
 from requests import HTTPError as RequestsHTTPError, Response
+from requests.adapters import HTTPAdapter
 from requests.structures import CaseInsensitiveDict
 from requests_file import FileAdapter
+from urllib3.util.retry import Retry
 from urlmatch import urlmatch
 from webob.headers import EnvironHeaders, ResponseHeaders
 
@@ -34,7 +52,7 @@ from weaver.status import map_status
 from weaver.warning import TimeZoneInfoAlreadySetWarning
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Iterable, Optional, Type, Union
+    from typing import Any, Callable, Dict, List, Iterable, Iterator, Optional, Tuple, Type, Union
 
     from weaver.typedefs import (
         AnyKey,
@@ -95,6 +113,65 @@ class _NullType(metaclass=_Singleton):
 null = _NullType()
 
 
+class LRUCache(object):
+    """
+    Thread-safe mapping of limited size that discards least recently used items and items older than ``expire``.
+
+    :param max_size: maximum number of stored items, unlimited if zero.
+    :param expire: seconds after which an item is discarded, never if zero.
+    """
+
+    def __init__(self, max_size=128, expire=0):
+        # type: (int, Number) -> None
+        self.max_size = max_size
+        self.expire = expire
+        self._items = OrderedDict()  # type: OrderedDict[AnyKey, Tuple[float, Any]]
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        # type: (AnyKey, Any) -> Any
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            timestamp, value = item
+            if self.expire and time.monotonic() - timestamp > self.expire:
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        # type: (AnyKey, Any) -> None
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while self.max_size and len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        # type: (AnyKey, Any) -> Any
+        with self._lock:
+            item = self._items.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._items.clear()
+
+    def values(self):
+        # type: () -> List[Any]
+        with self._lock:
+            return [value for _, value in self._items.values()]
+
+    def __contains__(self, key):
+        return self.get(key, null) is not null
+
+    def __len__(self):
+        return len(self._items)
+
+
 def get_weaver_url(container):
     # type: (AnySettingsContainer) -> str
     """Retrieves the home URL of the `weaver` application."""
@@ -270,6 +347,128 @@ def wait_secs(run_step=-1):
     return secs_list[run_step]
 
 
+def get_poll_intervals(settings=None):
+    # type: (Optional[AnySettingsContainer]) -> Iterator[float]
+    """
+    Generates delays (seconds) between successive status polling requests of a remote job.
+
+    Delays increase from ``weaver.remote_job_poll_min_interval`` up to ``weaver.remote_job_poll_max_interval``
+    such that short jobs are detected as completed quickly while long jobs are not checked needlessly often.
+
+    .. seealso::
+        :func:`get_retry_after` to employ the delay requested by the remote server instead, when provided.
+    """
+    settings = get_settings(settings) or {}
+    min_interval = float(settings.get("weaver.remote_job_poll_min_interval", 2))
+    max_interval = max(min_interval, float(settings.get("weaver.remote_job_poll_max_interval", 30)))
+    interval = min_interval
+    while True:
+        yield interval
+        interval = min(interval * 1.5, max_interval)
+
+
+def get_retry_after(response):
+    # type: (Response) -> Optional[float]
+    """
+    Obtains the delay (seconds) requested by the ``Retry-After`` header of the response, either as seconds or date.
+    """
+    after = str(response.headers.get("Retry-After", "")).strip()
+    if not after:
+        return None
+    if after.isdigit():
+        return float(after)
+    try:
+        date = parsedate_to_datetime(after)
+    except (TypeError, ValueError):
+        LOGGER.debug("Ignoring invalid header [Retry-After=%s]", after)
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=pytz.utc)
+    return max((date - datetime.now(pytz.utc)).total_seconds(), 0.0)
+
+
+# inotify events of files written and closed, moved into, or with modified attributes in the watched directory
+INOTIFY_FILE_EVENTS = 0x00000008 | 0x00000080 | 0x00000004  # IN_CLOSE_WRITE | IN_MOVED_TO | IN_ATTRIB
+INOTIFY_INIT_FLAGS = 0o4000 | 0o2000000  # IN_NONBLOCK | IN_CLOEXEC
+
+
+@functools.lru_cache(maxsize=None)
+def get_inotify():
+    # type: () -> Optional[ctypes.CDLL]
+    """
+    Obtains the C library functions of the Linux ``inotify`` file system notifications, or ``None`` if not available.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError, TypeError):  # not Linux or missing library
+        return None
+    return libc
+
+
+def watch_file_events(path):
+    # type: (str) -> Optional[int]
+    """
+    Obtains a file descriptor that becomes readable when the file is written, replaced or modified.
+
+    :returns: ``inotify`` file descriptor to be closed by the caller, or ``None`` if notifications are not available.
+    """
+    libc = get_inotify()
+    if libc is None:
+        return None
+    watch_fd = libc.inotify_init1(INOTIFY_INIT_FLAGS)
+    if watch_fd < 0:  # instances limit reached
+        LOGGER.debug("Failed creating inotify instance. [errno=%s]", ctypes.get_errno())
+        return None
+    # watch the directory to consider a file that does not exist yet or that gets replaced
+    watch_dir = os.path.dirname(os.path.abspath(path)).encode()
+    if libc.inotify_add_watch(watch_fd, watch_dir, INOTIFY_FILE_EVENTS) < 0:  # missing directory or watches limit
+        LOGGER.debug("Failed watching inotify events of [%s]. [errno=%s]", path, ctypes.get_errno())
+        os.close(watch_fd)
+        return None
+    return watch_fd
+
+
+def wait_file_change(path, signature=None, timeout=60, interval=0.25):
+    # type: (str, Optional[Tuple[int, int]], float, float) -> Optional[Tuple[int, int]]
+    """
+    Blocks until the file is modified compared to its previous signature, or until the timeout is reached.
+
+    The file is watched by its modification time and size only, such that its contents are not read nor parsed while
+    waiting. A file that does not exist yet is considered modified as soon as it gets created. The signature is
+    verified again when notified by ``inotify`` that the file was written, and otherwise periodically when such
+    notifications are not available.
+
+    :param path: local file path to watch.
+    :param signature: signature of the file previously obtained by this function (``None`` if not yet obtained).
+    :param timeout: maximum duration (seconds) to wait for a modification.
+    :param interval: duration (seconds) between verifications of the file signature without notifications.
+    :returns: new signature of the modified file, or ``None`` if it was not modified within the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    watch_fd = watch_file_events(path)  # before the first verification to avoid missing any modification
+    try:
+        while True:
+            try:
+                stat = os.stat(path)
+                current = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                current = None
+            if current is not None and current != signature:
+                return current
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if watch_fd is None:
+                time.sleep(min(interval, remaining))
+            elif select.select([watch_fd], [], [], remaining)[0]:
+                os.read(watch_fd, 2 ** 16)  # discard events, the signature indicates if the file was modified
+    finally:
+        if watch_fd is not None:
+            os.close(watch_fd)
+
+
 def expires_at(hours=1):
     # type: (Optional[int]) -> int
     return now_secs() + hours * 3600
@@ -643,6 +842,74 @@ def get_request_options(method, url, settings):
     return request_options
 
 
+# sessions shared by requests of the current process to the same host, to reuse their kept-alive connections
+_REQUEST_SESSIONS = LRUCache(max_size=100)
+_REQUEST_SESSIONS_LOCK = threading.Lock()
+
+
+def get_request_session(url, settings=None, verify=True):
+    # type: (str, Optional[AnySettingsContainer], Union[bool, str]) -> requests.Session
+    """
+    Obtains the session shared by requests of the current process with the same scheme, host and SSL verification.
+
+    Shared sessions keep their connections alive between requests to avoid establishing a new connection (and TLS
+    handshake) for each of them. Cookies returned by responses are never stored in shared sessions to avoid leaking
+    them to unrelated requests. Following settings are applied to created sessions:
+
+        - ``weaver.request_keep_alive``: share sessions between requests, otherwise a new session is returned.
+        - ``weaver.request_pool_size``: number of connections kept alive per host for concurrent requests.
+        - ``weaver.request_pool_retries``: attempts of failed connections with the host retried by the HTTP adapter.
+
+    .. seealso::
+        - :func:`get_request_session_stats`
+    """
+    settings = get_settings(settings) if settings else {}
+    url_parts = urlparse(url)
+    scheme = url_parts.scheme or "file"
+    key = (os.getpid(), scheme, url_parts.netloc, verify)
+    keep_alive = asbool(settings.get("weaver.request_keep_alive", True))
+    with _REQUEST_SESSIONS_LOCK:
+        session = _REQUEST_SESSIONS.get(key) if keep_alive else None
+        if session is None:
+            session = requests.Session()
+            session.verify = verify
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            if scheme == "file":
+                session.mount("file://", FileAdapter())
+            else:
+                retries = int(settings.get("weaver.request_pool_retries", 0))
+                pool_size = int(settings.get("weaver.request_pool_size", 10))
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                                      max_retries=Retry(retries, read=False, backoff_factor=0.3))
+                session.mount("{}://".format(scheme), adapter)
+            if keep_alive:
+                _REQUEST_SESSIONS.set(key, session)
+    return session
+
+
+def get_request_session_stats():
+    # type: () -> Dict[str, int]
+    """
+    Counts requests and connections of sessions shared by the current process.
+
+    Requests that reused a kept-alive connection (``reused``) avoided establishing a new connection and TLS handshake.
+    """
+    stats = {"sessions": 0, "requests": 0, "connections": 0}
+    for session in _REQUEST_SESSIONS.values():
+        stats["sessions"] += 1
+        for adapter in session.adapters.values():
+            pool_manager = getattr(adapter, "poolmanager", None)
+            if pool_manager is None:
+                continue
+            for pool_key in pool_manager.pools.keys():
+                pool = pool_manager.pools.get(pool_key)
+                if pool is not None:
+                    stats["requests"] += pool.num_requests
+                    stats["connections"] += pool.num_connections
+    stats["reused"] = max(0, stats["requests"] - stats["connections"])
+    return stats
+
+
 def request_extra(method,                       # type: str
                   url,                          # type: str
                   retries=None,                 # type: Optional[int]
@@ -719,6 +986,15 @@ def request_extra(method,                       # type: str
         - :func:`get_request_options`
         - :func:`get_ssl_verify_option`
 
+    Connection Reuse
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Requests are sent with the session shared by the current process for the same host such that their connections
+    are kept alive and reused by following requests, including retries.
+
+    .. seealso::
+        - :func:`get_request_session`
+
     :param method: HTTP method to set request.
     :param url: URL of the request to execute.
     :param retries: Number of request retries to attempt if first attempt failed (according to allowed codes or error).
@@ -726,7 +1002,7 @@ def request_extra(method,                       # type: str
     :param intervals: Explicit intervals in seconds between retries.
     :param retry_after: If enabled, honor ``Retry-After`` response header of provided by a failing request attempt.
     :param allowed_codes: HTTP status codes that are considered valid to stop retrying (default: any non-4xx/5xx code).
-    :param ssl_verify: Explicit parameter to disable SSL verification (overrides any settings, default: True).
+    :param ssl_verify: Explicit ``False`` disables SSL verification (overrides any settings and ``verify`` keyword).
     :param settings: Additional settings from which to retrieve configuration details for requests.
     :param only_server_errors:
         Only HTTP status codes in the 5xx values will be considered for retrying the request (default: True).
@@ -753,10 +1029,16 @@ def request_extra(method,                       # type: str
         retries = [0] + list(range(retries))
     no_retries = len(retries) == 1
     # SSL verification settings
-    # ON by default, disable accordingly with any variant if matched
+    # ON by default (or explicit certificate bundle path), disable accordingly with any variant if matched
     kw_ssl_verify = get_ssl_verify_option(method, url, settings, request_options=request_options)
-    ssl_verify = False if not kw_ssl_verify or not ssl_verify else True  # pylint: disable=R1719
-    request_options.update({"verify": ssl_verify})
+    verify = request_options.pop("ssl_verify", request_options.pop("verify", None))
+    verify = True if verify is None else verify
+    if ssl_verify is False or not kw_ssl_verify or not verify:
+        verify = False
+    request_options["verify"] = verify
+    keep_alive = asbool(settings.get("weaver.request_keep_alive", True))
+    if urlparse(url).scheme in ["", "file"] and not url.startswith("file://"):
+        url = "file://{}".format(os.path.abspath(url))
     # process request
     resp = None
     failures = []
@@ -764,19 +1046,19 @@ def request_extra(method,                       # type: str
         if retry:
             delay = 0
             if retry_after and resp and resp.status_code in [HTTPTooManyRequests.code]:
-                after = resp.headers.get("Retry-After", "")
-                delay = int(after) if str(after).isdigit() else 0
-                LOGGER.debug("Received header [Retry-After=%ss] for [%s %s]", after, method, url)
+                delay = get_retry_after(resp) or 0
+                LOGGER.debug("Received header [Retry-After=%ss] for [%s %s]", delay, method, url)
             if not delay:
                 delay = (backoff * (2 ** (retry + 1))) or intervals[retry]
             LOGGER.debug("Retrying failed request after delay=%s for [%s %s]", delay, method, url)
             time.sleep(delay)
         try:
-            with requests.Session() as request_session:
-                if urlparse(url).scheme in ["", "file"]:
-                    url = "file://{}".format(os.path.abspath(url)) if not url.startswith("file://") else url
-                    request_session.mount("file://", FileAdapter())
-                resp = request_session.request(method, url, **request_kwargs)
+            request_session = get_request_session(url, settings, verify=verify)
+            try:
+                resp = request_session.request(method, url, **request_options)
+            finally:
+                if not keep_alive:
+                    request_session.close()
             if allowed_codes and len(allowed_codes):
                 if resp.status_code in allowed_codes:
                     return resp
@@ -802,6 +1084,252 @@ def request_extra(method,                       # type: str
     return err
 
 
+def download_file(url, file_path, settings=None, resume=3, **request_kwargs):
+    # type: (str, str, Optional[AnySettingsContainer], int, **Any) -> Optional[str]
+    """
+    Downloads the content of a remote URL to the local file path.
+
+    If the transfer is interrupted, up to :paramref:`resume` new requests are attempted to obtain only the remaining
+    content with a ``Range`` header, made conditional to the ``ETag`` or ``Last-Modified`` value of the file with
+    ``If-Range``. When the server does not support partial content, does not identify the file version, or if the file
+    was modified in the meantime, the download restarts from the beginning instead. The transfer is also considered
+    interrupted if the received size does not match the announced content length. Once completed, the file is verified
+    against the ``Digest`` header checksum if provided.
+
+    :param url: remote ``http(s)://`` URL of the file.
+    :param file_path: local path where to write the file.
+    :param settings: Additional request-related settings from the application configuration (notably request-options).
+    :param resume: Number of attempts to resume the transfer after interruption.
+    :param request_kwargs: Additional keywords to forward to request call (if needed).
+    :returns: ``ETag`` or ``Last-Modified`` value of the downloaded content, or ``None`` if not identified.
+    :raises HTTPException: applicable HTTP-based exception if any occurred during the operation.
+    """
+    request_kwargs.pop("stream", None)
+    headers = dict(request_kwargs.pop("headers", None) or {})
+    size = 0
+    version = None
+    content_version = None
+    for attempt in range(resume + 1):
+        if size and version:
+            # remaining content only if the file was not modified since, otherwise the complete new version is returned
+            headers.update({"Range": "bytes={}-".format(size), "If-Range": version})
+        else:
+            size = 0
+            headers.pop("Range", None)
+            headers.pop("If-Range", None)
+        resp = request_extra("get", url, stream=True, retries=3, settings=settings, headers=headers, **request_kwargs)
+        if resp.status_code >= 400:
+            raise resp
+        if size and (resp.status_code != HTTPPartialContent.code or
+                     not resp.headers.get("Content-Range", "").startswith("bytes {}-".format(size))):
+            LOGGER.debug("Partial content not supported by [%s] or file modified, restarting download.", url)
+            size = 0
+        if not size:
+            # weak entity tags cannot be employed to combine partial contents
+            etag = resp.headers.get("ETag")
+            version = etag if etag and not etag.startswith("W/") else resp.headers.get("Last-Modified")
+            content_version = etag or resp.headers.get("Last-Modified") or None
+        # size of the complete file, unknown if content is encoded since it gets decoded while written
+        total = None
+        if not resp.headers.get("Content-Encoding"):
+            if resp.status_code == HTTPPartialContent.code:
+                total = resp.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            else:
+                total = resp.headers.get("Content-Length")
+            total = int(total) if str(total).isdigit() else None
+        try:
+            with open(file_path, "ab" if size else "wb") as file:
+                # NOTE:
+                #   Setting 'chunk_size=None' lets the request find a suitable size according to
+                #   available memory. Without this, it defaults to 1 which is extremely slow.
+                for chunk in resp.iter_content(chunk_size=None):
+                    file.write(chunk)
+            received = os.path.getsize(file_path)
+            if total is not None and received != total:
+                raise requests.exceptions.ChunkedEncodingError(
+                    "Received {} bytes instead of {} bytes.".format(received, total)
+                )
+            check_file_digest(file_path, resp.headers)
+            return content_version
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as exc:
+            if attempt >= resume:
+                raise
+            size = os.path.getsize(file_path)
+            LOGGER.warning("Download of [%s] interrupted after %s bytes, resuming (%s/%s). [%r]",
+                           url, size, attempt + 1, resume, exc)
+        finally:
+            resp.close()
+
+
+def check_file_digest(file_path, headers):
+    # type: (str, AnyHeadersContainer) -> None
+    """
+    Verifies the content of a downloaded file against the checksums of the ``Digest`` header (``SHA-256`` or ``MD5``),
+    if provided by the response.
+
+    :raises IOError: if the content of the file does not match the checksum.
+    """
+    digests = {}
+    for digest in str(get_header("Digest", headers) or "").split(","):
+        algorithm, _, value = digest.strip().partition("=")
+        digests[algorithm.lower()] = value
+    for algorithm, hash_name in [("sha-256", "sha256"), ("md5", "md5")]:
+        if not digests.get(algorithm):
+            continue
+        file_hash = hashlib.new(hash_name)
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(2 ** 20), b""):
+                file_hash.update(block)
+        if base64.b64encode(file_hash.digest()).decode("ascii") != digests[algorithm]:
+            raise IOError("Content of file [{}] does not match its {} digest.".format(file_path, algorithm.upper()))
+        return
+
+
+def get_remote_file_version(url, settings=None):
+    # type: (str, Optional[AnySettingsContainer]) -> Optional[str]
+    """
+    Obtains the ``ETag`` or ``Last-Modified`` value identifying the current content of a remote file.
+
+    :returns: version of the file, or ``None`` if it cannot be identified.
+    """
+    try:
+        resp = request_extra("head", url, allow_redirects=True, settings=settings)
+    except requests.RequestException as exc:
+        LOGGER.debug("Failed obtaining version of [%s]. [%r]", url, exc)
+        return None
+    if resp.status_code >= 400:
+        return None
+    return resp.headers.get("ETag") or resp.headers.get("Last-Modified") or None
+
+
+def fetch_cached_file(file_reference, file_path, version, fetch, settings=None):
+    # type: (str, str, Optional[str], Callable[[str], Optional[str]], Optional[AnySettingsContainer]) -> None
+    """
+    Places a file at the specified path from the input cache shared by all jobs, fetching it in the cache if missing.
+
+    Files are cached under the directory defined by setting ``weaver.input_cache_dir`` by their reference and version,
+    and hard linked to their location to avoid any copy (copied if the cache is located on another device). Cached
+    files are read-only such that jobs cannot modify the content shared with other jobs. Least recently used files
+    are removed once the total size of the cache exceeds ``weaver.input_cache_size`` (megabytes), except the file
+    being placed. Files are fetched directly to the specified path without caching if no cache directory is defined or
+    if their version cannot be identified. Fetched files are cached under the version returned by :paramref:`fetch`
+    when provided, since the file could have been modified after the version used to look up the cache was obtained.
+
+    :param file_reference: reference of the file.
+    :param file_path: local path where to place the file.
+    :param version: identifier of the file content such as an ``ETag`` or ``Last-Modified`` value.
+    :param fetch:
+        function that retrieves the file content to the local path it is called with, and optionally returns the
+        version of the retrieved content.
+    :param settings: application settings with the input cache configuration.
+    """
+    settings = get_settings(settings) if settings else {}
+    cache_dir = settings.get("weaver.input_cache_dir")
+    if not cache_dir or not version:
+        fetch(file_path)
+        return
+    cache_path = get_cached_file_path(cache_dir, file_reference, version, file_path)
+    try:
+        link_cached_file(cache_path, file_path)
+    except FileNotFoundError:  # not cached, or removed concurrently
+        pass
+    else:
+        LOGGER.debug("Fetch file resolved from input cache: [%s]", cache_path)
+        try:
+            os.utime(cache_path)  # mark as recently used
+        except OSError:
+            pass
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    # fetch under temporary name for the cached file to appear atomically to concurrent jobs,
+    # and place it before it becomes visible to avoid its removal by their cleanup in the meantime
+    tmp_path = os.path.join(cache_dir, "{}.{}.part".format(os.path.basename(file_path), uuid.uuid4()))
+    try:
+        fetched_version = fetch(tmp_path)
+        if fetched_version and fetched_version != version:
+            LOGGER.debug("File [%s] modified from version [%s] to [%s] before being fetched.",
+                         file_reference, version, fetched_version)
+            cache_path = get_cached_file_path(cache_dir, file_reference, fetched_version, file_path)
+        os.chmod(tmp_path, 0o444)
+        link_cached_file(tmp_path, file_path)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    clean_cached_files(cache_dir, float(settings.get("weaver.input_cache_size", 10240)) * 2 ** 20, keep=[cache_path])
+
+
+def get_cached_file_path(cache_dir, file_reference, version, file_path):
+    # type: (str, str, str, str) -> str
+    """
+    Obtains the location in the input cache of a file identified by its reference and version.
+    """
+    key = hashlib.sha256("{}\n{}".format(file_reference, version).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key[:2], key, os.path.basename(file_path))
+
+
+def link_cached_file(cache_path, file_path):
+    # type: (str, str) -> None
+    """
+    Places a file of the input cache at the specified path with a hard link, or a copy across devices.
+
+    A symbolic link is never used across devices, since the cached file could be removed by the cache cleanup while the
+    job still uses it. The copy doubles the disk usage of the file, which is avoided by placing the cache directory on
+    the same device as job directories.
+
+    :raises FileNotFoundError: if the cached file does not exist.
+    """
+    if os.path.lexists(file_path):
+        os.remove(file_path)
+    try:
+        os.link(cache_path, file_path)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        LOGGER.warning("Input cache [%s] is located on another device than [%s], copying cached file instead of "
+                       "linking it.", cache_path, file_path)
+        shutil.copyfile(cache_path, file_path)
+
+
+def clean_cached_files(cache_dir, max_size, keep=None):
+    # type: (str, Number, Optional[Iterable[str]]) -> None
+    """
+    Removes least recently used files of the input cache until its total size does not exceed the maximum size.
+
+    Files fetched by jobs from the cache through a hard link remain available to them after removal.
+
+    :param cache_dir: directory of the input cache.
+    :param max_size: maximum total size of cached files (bytes).
+    :param keep: cached files that must not be removed.
+    """
+    keep = set(keep or [])
+    cached_files = []
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if name.endswith(".part"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed concurrently
+                continue
+            cached_files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in cached_files)
+    for _, size, path in sorted(cached_files):
+        if total <= max_size:
+            break
+        if path in keep:
+            continue
+        LOGGER.debug("Removing least recently used file from input cache: [%s]", path)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+        total -= size
+
+
 def fetch_file(file_reference, file_outdir, settings=None, **request_kwargs):
     # type: (str, str, Optional[AnySettingsContainer], **Any) -> str
     """
@@ -846,7 +1374,17 @@ def fetch_file(file_reference, file_outdir, settings=None, **request_kwargs):
         s3 = boto3.resource("s3")
         bucket_name, file_key = file_reference[5:].split("/", 1)
         bucket = s3.Bucket(bucket_name)
-        bucket.download_file(file_key, file_path)
+        version = None
+        extra_args = None
+        if get_settings(settings or {}).get("weaver.input_cache_dir"):
+            s3_object = s3.Object(bucket_name, file_key)
+            s3_object.load()
+            version = s3_object.version_id or s3_object.e_tag
+            if s3_object.version_id:
+                # retrieve the same version as identified for the cache even if the object was modified since
+                extra_args = {"VersionId": s3_object.version_id}
+        fetch_cached_file(file_href, file_path, version,
+                          lambda path: bucket.download_file(file_key, path, ExtraArgs=extra_args), settings)
     elif file_reference.startswith("http"):
         if file_reference.startswith("https://s3."):
             s3 = boto3.resource("s3")
@@ -862,16 +1400,12 @@ def fetch_file(file_reference, file_outdir, settings=None, **request_kwargs):
                 return fetch_file(file_ref_updated, file_outdir, settings=settings, **request_kwargs)
 
         LOGGER.debug("Fetch file resolved as remote URL reference.")
-        request_kwargs.pop("stream", None)
-        with open(file_path, "wb") as file:
-            resp = request_extra("get", file_reference, stream=True, retries=3, settings=settings, **request_kwargs)
-            if resp.status_code >= 400:
-                raise resp
-            # NOTE:
-            #   Setting 'chunk_size=None' lets the request find a suitable size according to
-            #   available memory. Without this, it defaults to 1 which is extremely slow.
-            for chunk in resp.iter_content(chunk_size=None):
-                file.write(chunk)
+        version = None
+        if get_settings(settings or {}).get("weaver.input_cache_dir"):
+            version = get_remote_file_version(file_reference, settings=settings)
+        fetch_cached_file(file_href, file_path, version,
+                          lambda path: download_file(file_reference, path, settings=settings, **request_kwargs),
+                          settings)
     else:
         scheme = file_reference.split("://")
         scheme = "<none>" if len(scheme) < 2 else scheme[0]
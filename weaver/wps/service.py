@@ -1,35 +1,39 @@
 import logging
 import os
+import threading
+from collections.abc import Mapping
 from configparser import ConfigParser
 from typing import TYPE_CHECKING
 
 from owslib.wps import WPSExecution
 from pyramid.httpexceptions import HTTPBadRequest, HTTPSeeOther
+from pyramid.registry import Registry
 from pyramid_celery import celery_app as app
 from pywps.app import Process as ProcessWPS, WPSRequest
 from pywps.app.Service import Service as ServiceWPS
 from pywps.inout.storage import StorageAbstract
-from pywps.response import WPSResponse
+from pywps.response import WPSResponse, get_response
 from pywps.response.execute import ExecuteResponse
 
 from weaver.database import get_db
 from weaver.exceptions import handle_known_exceptions
 from weaver.formats import CONTENT_TYPE_APP_JSON
 from weaver.owsexceptions import OWSNoApplicableCode
-from weaver.processes.convert import wps2json_job_payload
+from weaver.processes.convert import json2wps_field, wps2json_job_payload
 from weaver.processes.execution import submit_job_handler
 from weaver.processes.types import PROCESS_WORKFLOW
 from weaver.processes.utils import get_job_submission_response, get_process
 from weaver.store.base import StoreProcesses
-from weaver.utils import get_header, get_settings, get_weaver_url
+from weaver.utils import get_header, get_registry, get_settings, get_weaver_url
 from weaver.visibility import VISIBILITY_PUBLIC
 from weaver.wps.utils import check_wps_status, get_wps_local_status_location, load_pywps_config
 from weaver.wps_restapi import swagger_definitions as sd
 
 LOGGER = logging.getLogger(__name__)
 if TYPE_CHECKING:
-    from typing import Any, Optional, Union
-    from weaver.typedefs import HTTPValid, JSON, SettingsType
+    from typing import Any, Dict, Iterator, Optional, Union
+    from weaver.datatype import Process
+    from weaver.typedefs import AnySettingsContainer, HTTPValid, JSON, SettingsType
 
 
 class ReferenceStatusLocationStorage(StorageAbstract):
@@ -82,6 +86,100 @@ class WorkerExecuteResponse(ExecuteResponse):
         self._update_status_doc()      # generate 'doc' property with XML content for response
 
 
+class WorkerProcessSummary(object):
+    """
+    Minimal details of a process employed by `PyWPS` to list it in ``GetCapabilities`` responses.
+
+    Avoids the creation of the complete `PyWPS` process with all its I/O definitions only to list it.
+    """
+
+    def __init__(self, process):
+        # type: (Process) -> None
+        self.identifier = process.identifier
+        self.json = {
+            "identifier": process.identifier,
+            "title": process.title,
+            "abstract": process.abstract,
+            "keywords": process.keywords,
+            "metadata": [json2wps_field(meta, "metadata").json for meta in process.metadata],
+            "version": process.version,
+            "translations": {},
+        }
+
+
+class WorkerProcesses(Mapping):
+    """
+    Public processes offered by the `PyWPS` service, updated according to their revision in the process store.
+
+    Only processes that were modified since the previous :meth:`refresh` are retrieved again from the store.
+    Their `PyWPS` definition is created only once requested (e.g.: by ``DescribeProcess`` or ``Execute``), and reused
+    by following requests until the process gets modified.
+    """
+
+    def __init__(self, container):
+        # type: (AnySettingsContainer) -> None
+        self.settings = get_settings(container)
+        self._lock = threading.RLock()
+        self._revisions = {}    # type: Dict[str, str]
+        self._definitions = {}  # type: Dict[str, Process]
+        self._summaries = {}    # type: Dict[str, WorkerProcessSummary]
+        self._processes = {}    # type: Dict[str, ProcessWPS]
+
+    def refresh(self):
+        # type: () -> None
+        """
+        Updates the processes that were deployed, removed or modified since the last refresh.
+        """
+        store = get_db(self.settings).get_store(StoreProcesses)
+        revisions = store.list_process_revisions(visibility=VISIBILITY_PUBLIC)
+        with self._lock:
+            modified = [pid for pid, rev in revisions.items() if self._revisions.get(pid) != rev]
+            if modified:
+                # revisions are obtained first, more recent definitions only cause another refresh on next call
+                processes = {process.identifier: process
+                             for process in store.list_processes(visibility=VISIBILITY_PUBLIC)}
+                for pid in modified:
+                    self._processes.pop(pid, None)
+                    self._summaries.pop(pid, None)
+                    if pid in processes:
+                        self._definitions[pid] = processes[pid]
+                    else:
+                        revisions.pop(pid)
+            for pid in set(self._definitions) - set(revisions):
+                self._definitions.pop(pid)
+                self._summaries.pop(pid, None)
+                self._processes.pop(pid, None)
+            self._revisions = revisions
+
+    def summaries(self):
+        # type: () -> Dict[str, WorkerProcessSummary]
+        """
+        Obtains the summaries of processes, sufficient to list them without creating their `PyWPS` definition.
+        """
+        with self._lock:
+            for pid in self._revisions:
+                if pid not in self._summaries:
+                    self._summaries[pid] = WorkerProcessSummary(self._definitions[pid])
+            return {pid: self._summaries[pid] for pid in self._revisions}
+
+    def __getitem__(self, process_id):
+        # type: (str) -> ProcessWPS
+        with self._lock:
+            if process_id not in self._revisions:
+                raise KeyError(process_id)
+            if process_id not in self._processes:
+                self._processes[process_id] = self._definitions[process_id].wps()
+            return self._processes[process_id]
+
+    def __iter__(self):
+        # type: () -> Iterator[str]
+        return iter(list(self._revisions))
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._revisions)
+
+
 class WorkerService(ServiceWPS):
     """
     Dispatches PyWPS requests from *older* WPS-1/2 XML endpoint to WPS-REST as appropriate.
@@ -117,13 +215,20 @@ class WorkerService(ServiceWPS):
             return resp
         return None
 
-    def get_capabilities(self, wps_request, *_, **__):
-        # type: (WPSRequest, Any, Any) -> Union[WPSResponse, HTTPValid]
+    def get_capabilities(self, wps_request, uuid, *_, **__):
+        # type: (WPSRequest, str, Any, Any) -> Union[WPSResponse, HTTPValid]
         """
         Redirect to WPS-REST endpoint if requested ``Content-Type`` is JSON or handle ``GetCapabilities`` normally.
+
+        Processes are listed using their summary to avoid creating the complete definition of every process.
         """
-        resp = self._get_capabilities_redirect(wps_request, *_, **__)
-        return resp or super(WorkerService, self).get_capabilities(wps_request, *_, **__)
+        resp = self._get_capabilities_redirect(wps_request, uuid, *_, **__)
+        if resp:
+            return resp
+        if not isinstance(self.processes, WorkerProcesses):
+            return super(WorkerService, self).get_capabilities(wps_request, uuid, *_, **__)
+        response_cls = get_response("capabilities")
+        return response_cls(wps_request, uuid, version=wps_request.version, processes=self.processes.summaries())
 
     @handle_known_exceptions
     def _describe_process_redirect(self, wps_request, *_, **__):
@@ -238,7 +343,10 @@ class WorkerService(ServiceWPS):
 
 def get_pywps_service(environ=None, is_worker=False):
     """
-    Generates the PyWPS Service that provides *older* WPS-1/2 XML endpoint.
+    Obtains the PyWPS Service that provides *older* WPS-1/2 XML endpoint.
+
+    The service is kept in the registry when available to be reused by following calls of the process that created it,
+    with its processes refreshed on each call to consider the ones deployed, removed or modified since then.
     """
     environ = environ or {}
     try:
@@ -249,10 +357,18 @@ def get_pywps_service(environ=None, is_worker=False):
             load_pywps_config(app, config=pywps_cfg)
 
         # call pywps application with processes filtered according to the adapter's definition
-        process_store = get_db(app).get_store(StoreProcesses)
-        processes_wps = [process.wps() for process in
-                         process_store.list_processes(visibility=VISIBILITY_PUBLIC)]
-        service = WorkerService(processes_wps, is_worker=is_worker, settings=settings)
+        registry = get_registry(app, nothrow=True)
+        services = getattr(registry, "pywps_services", None)
+        if not isinstance(registry, Registry) or services is None or services[0] != os.getpid():
+            services = (os.getpid(), {})
+            if isinstance(registry, Registry):
+                registry.pywps_services = services
+        service = services[1].get(is_worker)
+        if service is None:
+            service = WorkerService(is_worker=is_worker, settings=settings)
+            service.processes = WorkerProcesses(settings)
+            services[1][is_worker] = service
+        service.processes.refresh()
     except Exception as ex:
         LOGGER.exception("Error occurred during PyWPS Service and/or Processes setup.")
         raise OWSNoApplicableCode("Failed setup of PyWPS Service and/or Processes. Error [{!r}]".format(ex))
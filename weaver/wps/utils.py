@@ -1,26 +1,42 @@
 import logging
 import os
 import tempfile
+import threading
+import time
 from configparser import ConfigParser
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 import lxml.etree
-from owslib.wps import WPSExecution
+from owslib.wps import WebProcessingService, WPSExecution
 from pyramid.httpexceptions import HTTPNotFound
 from pywps import configuration as pywps_config
 
 from weaver.config import get_weaver_configuration
-from weaver.utils import get_settings, get_url_without_query, get_weaver_url, is_uuid, make_dirs, request_extra
+from weaver.utils import (
+    LRUCache,
+    get_settings,
+    get_url_without_query,
+    get_weaver_url,
+    is_uuid,
+    make_dirs,
+    request_extra
+)
 
 LOGGER = logging.getLogger(__name__)
 if TYPE_CHECKING:
-    from typing import Dict, Union, Optional
+    from typing import Any, Dict, Union, Optional, Tuple
 
     from pyramid.request import Request
-    from owslib.wps import WebProcessingService
 
-    from weaver.typedefs import AnySettingsContainer, XML
+    from weaver.typedefs import AnySettingsContainer, HeadersType, XML
+
+    # XML document, ETag, Last-Modified, retrieval time
+    WpsDocument = Tuple[bytes, Optional[str], Optional[str], float]
+
+# GetCapabilities and DescribeProcess documents of remote providers shared by every client of the process
+_WPS_DOCUMENT_CACHE = None  # type: Optional[LRUCache]
+_WPS_DOCUMENT_LOCK = threading.Lock()
 
 
 def _get_settings_or_wps_config(container,                  # type: AnySettingsContainer
@@ -158,6 +174,10 @@ def check_wps_status(location=None,     # type: Optional[str]
     if response:
         LOGGER.debug("Retrieving WPS status from XML response document...")
         xml = response
+    elif location and os.path.isfile(location.replace("file://", "")):
+        LOGGER.debug("Retrieving WPS status from local file...")
+        with open(location.replace("file://", ""), "r") as status_file:
+            xml = status_file.read()
     elif location:
         xml_resp = HTTPNotFound()
         try:
@@ -316,3 +336,99 @@ def set_wps_language(wps, accept_language=None, request=None):
             if language.lower().startswith(accept):
                 wps.language = language
                 return
+
+
+def _get_wps_document_cache(container):
+    # type: (AnySettingsContainer) -> LRUCache
+    global _WPS_DOCUMENT_CACHE  # pylint: disable=W0603,global-statement
+
+    with _WPS_DOCUMENT_LOCK:
+        if _WPS_DOCUMENT_CACHE is None:
+            # expired entries are revalidated rather than removed, only the amount of documents is limited here
+            size = int(get_settings(container).get("weaver.wps_client_cache_size", 100))
+            _WPS_DOCUMENT_CACHE = LRUCache(max_size=max(size, 1))
+    return _WPS_DOCUMENT_CACHE
+
+
+def get_wps_document(url, params, headers=None, verify=True, timeout=None, container=None):
+    # type: (str, Dict[str, str], Optional[HeadersType], bool, Optional[int], Optional[AnySettingsContainer]) -> bytes
+    """
+    Obtains a WPS XML document from a remote provider, reusing the cached copy if still valid.
+
+    Documents are cached per provider URL, request parameters (including language) and request headers during the
+    delay defined by setting ``weaver.wps_client_cache_expire`` (seconds, ``0`` disables the cache). Once expired, the
+    document is revalidated with a conditional request using its ``ETag`` or ``Last-Modified`` values to avoid
+    transferring it again if unmodified. Only successful responses that are not WPS exception reports are cached.
+    """
+    settings = get_settings(container) if container else {}
+    expire = float(settings.get("weaver.wps_client_cache_expire", 300))
+    cache = _get_wps_document_cache(settings) if expire > 0 else None
+    headers = dict(headers or {})
+    key = (url, tuple(sorted(params.items())), tuple(sorted(headers.items())))
+    cached = cache.get(key) if cache is not None else None  # type: Optional[WpsDocument]
+    if cached:
+        xml, etag, modified, retrieved = cached
+        if time.monotonic() - retrieved < expire:
+            return xml
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+    resp = request_extra("get", url, params=params, headers=headers, verify=verify, timeout=timeout,
+                         settings=settings)
+    if cached and resp.status_code == 304:
+        LOGGER.debug("Revalidated cached WPS document [%s] with parameters %s", url, params)
+        cache.set(key, (xml, etag, modified, time.monotonic()))
+        return xml
+    resp.raise_for_status()
+    xml = resp.content
+    if cache is not None:
+        try:
+            is_exception = lxml.etree.QName(lxml.etree.fromstring(xml)).localname == "ExceptionReport"
+        except lxml.etree.XMLSyntaxError:
+            is_exception = True
+        if not is_exception:
+            cache.set(key, (xml, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), time.monotonic()))
+    return xml
+
+
+class CachedWebProcessingService(WebProcessingService):
+    """
+    Client of a remote WPS provider retrieving its ``GetCapabilities`` and ``DescribeProcess`` documents with
+    :func:`get_wps_document` to avoid fetching them again for every request or job submitted to the same provider.
+    """
+
+    def __init__(self, url, container=None, **kwargs):
+        # type: (str, Optional[AnySettingsContainer], **Any) -> None
+        self.settings = get_settings(container) if container else {}
+        super(CachedWebProcessingService, self).__init__(url, **kwargs)
+
+    def _get_document(self, params):
+        # type: (Dict[str, str]) -> bytes
+        params = dict(params, service="WPS", version=self.version)
+        if self.language:
+            params["language"] = self.language
+        return get_wps_document(self.url, params, headers=self.headers, verify=self.auth.verify,
+                                timeout=self.timeout, container=self.settings)
+
+    def getcapabilities(self, xml=None):
+        if xml is None:
+            xml = self._get_document({"request": "GetCapabilities"})
+        super(CachedWebProcessingService, self).getcapabilities(xml=xml)
+
+    def describeprocess(self, identifier, xml=None):
+        if xml is None:
+            xml = self._get_document({"request": "DescribeProcess", "identifier": identifier})
+        return super(CachedWebProcessingService, self).describeprocess(identifier, xml=xml)
+
+
+def get_wps_client(url, container=None, **kwargs):
+    # type: (str, Optional[AnySettingsContainer], **Any) -> WebProcessingService
+    """
+    Obtains a client of the remote WPS provider that employs cached documents of the provider.
+
+    :param url: WPS provider endpoint.
+    :param container: any settings container to retrieve cache and request options.
+    :param kwargs: additional parameters passed to :class:`owslib.wps.WebProcessingService` (e.g.: ``headers``).
+    """
+    return CachedWebProcessingService(url, container=container, **kwargs)
@@ -130,8 +130,11 @@ def get_queried_jobs(request):
     }
     groups = request.params.get("groups", "")
     groups = groups.split(",") if groups else None
+    # retrieve only the fields needed for the listing representation rather than complete jobs
+    fields = Job.json_fields if detail else ["id"]
     store = get_db(request).get_store(StoreJobs)
-    items, total = store.find_jobs(request=request, group_by=groups, **filters)
+    cursor = request.params.get("cursor") or None
+    items, total = store.find_jobs(request=request, group_by=groups, fields=fields, cursor=cursor, **filters)
     body = {"total": total}
 
     def _job_list(jobs):
@@ -143,6 +146,8 @@ def get_queried_jobs(request):
         body.update({"groups": items})
     else:
         body.update({"jobs": _job_list(items), "page": page, "limit": limit})
+        if items and len(items) == limit:
+            body["next"] = store.make_cursor(items[-1], filters["sort"])
     body = sd.GetQueriedJobsSchema().deserialize(body)
     return HTTPOk(json=body)
 
@@ -180,7 +185,7 @@ def cancel_job(request):
     store = get_db(request).get_store(StoreJobs)
     job.status_message = "Job dismissed."
     job.status = status.map_status(status.STATUS_DISMISSED)
-    store.update_job(job)
+    store.update_job(job, refresh=False)
 
     return HTTPOk(json={
         "jobID": job.id,
@@ -249,9 +254,26 @@ def get_job_exceptions(request):
 def get_job_logs(request):
     """
     Retrieve the logs of a job.
+
+    Log entries can be paged using ``since`` and ``limit`` query parameters. When more entries could be available
+    following the returned ones, the ``Link`` header provides the location to retrieve the next ones.
     """
     job = get_job(request)
-    return HTTPOk(json=job.logs)
+    try:
+        since = int(request.params.get("since", "0"))
+        limit = request.params.get("limit", None)
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise HTTPBadRequest("Invalid log paging query parameters.")
+    if since < 0 or (limit is not None and limit <= 0):
+        raise HTTPBadRequest("Invalid log paging query parameters.")
+    store = get_db(request).get_store(StoreJobs)
+    entries = store.fetch_logs(job.id, since=since, limit=limit)
+    resp = HTTPOk(json=[log for _, log in entries])
+    if limit and len(entries) == limit:
+        next_query = "since={}&limit={}".format(entries[-1][0] + 1, limit)
+        resp.headers["Link"] = "<{}?{}>; rel=\"next\"".format(request.path_url, next_query)
+    return resp
 
 
 # TODO: https://github.com/crim-ca/weaver/issues/18
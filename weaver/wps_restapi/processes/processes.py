@@ -1,8 +1,8 @@
 import logging
+from copy import deepcopy
 from typing import TYPE_CHECKING
 
 import colander
-from owslib.wps import WebProcessingService
 from pyramid.httpexceptions import (
     HTTPBadRequest,
     HTTPForbidden,
@@ -24,14 +24,15 @@ from weaver.processes.execution import submit_job
 from weaver.processes.types import PROCESS_BUILTIN
 from weaver.processes.utils import deploy_process_from_payload, get_job_submission_response, get_process
 from weaver.store.base import StoreProcesses, StoreServices
-from weaver.utils import get_any_id, get_cookie_headers, get_settings, parse_request_query, request_extra
+from weaver.utils import get_any_id, get_header, get_settings, parse_request_query
 from weaver.visibility import VISIBILITY_PUBLIC, VISIBILITY_VALUES
 from weaver.wps.utils import set_wps_language
 from weaver.wps_restapi import swagger_definitions as sd
+from weaver.wps_restapi.providers.providers import get_provider_client, get_provider_summary, map_providers
 
 if TYPE_CHECKING:
-    from weaver.typedefs import JSON
-    from typing import List, Tuple
+    from weaver.typedefs import AnyHeadersContainer, AnySettingsContainer, JSON
+    from typing import List, Optional, Tuple
 
 LOGGER = logging.getLogger(__name__)
 
@@ -51,16 +52,22 @@ def submit_provider_job(request):
     return get_job_submission_response(body)
 
 
-def list_remote_processes(service, request):
-    # type: (Service, Request) -> List[Process]
+def list_remote_processes(service, container, headers=None):
+    # type: (Service, AnySettingsContainer, Optional[AnyHeadersContainer]) -> List[Process]
     """
     Obtains a list of remote service processes in a compatible :class:`weaver.datatype.Process` format.
 
     Note: remote processes won't be stored to the local process storage.
+
+    :param service: provider of the processes.
+    :param container: request or settings of the application.
+    :param headers: request headers with cookies and language to employ (default: headers of the request container).
     """
-    wps = WebProcessingService(url=service.url, headers=get_cookie_headers(request.headers))
-    set_wps_language(wps, request=request)
-    settings = get_settings(request)
+    if headers is None and isinstance(container, Request):
+        headers = container.headers
+    wps = get_provider_client(service, container, headers)
+    set_wps_language(wps, accept_language=get_header("Accept-Language", headers))
+    settings = get_settings(container)
     return [Process.from_ows(service, process, settings) for process in wps.processes]
 
 
@@ -90,7 +97,7 @@ def describe_provider_process(request):
     process_id = request.matchdict.get("process_id")
     store = get_db(request).get_store(StoreServices)
     service = store.fetch_by_name(provider_id)
-    wps = WebProcessingService(url=service.url, headers=get_cookie_headers(request.headers))
+    wps = get_provider_client(service, request)
     set_wps_language(wps, request=request)
     process = wps.describeprocess(process_id)
     return Process.from_ows(service, process, get_settings(request))
@@ -154,20 +161,14 @@ def get_processes(request):
         if get_weaver_configuration(settings) == WEAVER_CONFIGURATION_EMS:
             queries = parse_request_query(request)
             if "providers" in queries and asbool(queries["providers"][0]) is True:
-                prov_url = "{host}/providers".format(host=request.host_url)
-                providers_response = request_extra("GET", prov_url, settings=settings,
-                                                   headers=request.headers, cookies=request.cookies)
-                providers = providers_response.json()
-                response_body.update({"providers": providers})
-                for i, provider in enumerate(providers):
-                    provider_id = get_any_id(provider)
-                    proc_url = "{host}/providers/{prov}/processes".format(host=request.host_url, prov=provider_id)
-                    response = request_extra("GET", proc_url, settings=settings,
-                                             headers=request.headers, cookies=request.cookies)
-                    processes = response.json().get("processes", [])
-                    response_body["providers"][i].update({
-                        "processes": processes if detail else [get_any_id(p) for p in processes]
-                    })
+                def get_provider_with_processes(service, _settings, _headers):
+                    summary = get_provider_summary(service, _settings, _headers)
+                    summaries = [p.process_summary() for p in list_remote_processes(service, _settings, _headers)]
+                    summary["processes"] = summaries if detail else [get_any_id(p) for p in summaries]
+                    return summary
+
+                providers = map_providers(request, get_provider_with_processes)
+                response_body["providers"] = [provider for _, provider in providers]
         return HTTPOk(json=response_body)
     except colander.Invalid as ex:
         raise HTTPBadRequest("Invalid schema: [{!s}]".format(ex))
@@ -192,7 +193,9 @@ def get_local_process(request):
     """
     try:
         process = get_process(request=request)
-        process["inputs"] = opensearch.replace_inputs_describe_process(process.inputs, process.payload)
+        # inputs are shared with the cached process definition, copy them since they get updated
+        inputs = deepcopy(process.inputs)
+        process["inputs"] = opensearch.replace_inputs_describe_process(inputs, process.payload)
         process_offering = process.process_offering()
         return HTTPOk(json=process_offering)
     except colander.Invalid as ex:
@@ -1,10 +1,12 @@
 import logging
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING
 
-from owslib.wps import WebProcessingService
 from pyramid.httpexceptions import HTTPCreated, HTTPNoContent, HTTPNotFound, HTTPOk
+from pyramid.request import Request
 
-from utils import get_cookie_headers
 from weaver.database import get_db
 from weaver.datatype import Service
 from weaver.exceptions import ServiceNotFound, log_unhandled_exceptions
@@ -12,11 +14,17 @@ from weaver.formats import OUTPUT_FORMAT_JSON
 from weaver.owsexceptions import OWSMissingParameterValue, OWSNotImplemented
 from weaver.processes.types import PROCESS_WPS
 from weaver.store.base import StoreServices
-from weaver.utils import get_any_id, get_settings
+from weaver.utils import get_any_id, get_cookie_headers, get_settings
 from weaver.warning import NonBreakingExceptionWarning
+from weaver.wps.utils import get_wps_client
 from weaver.wps_restapi import swagger_definitions as sd
 from weaver.wps_restapi.utils import get_wps_restapi_base_url
 
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple
+    from owslib.wps import WebProcessingService
+    from weaver.typedefs import AnyHeadersContainer, AnySettingsContainer, HeadersType, JSON, SettingsType
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -27,35 +35,106 @@ def get_providers(request):
     """
     Lists registered providers.
     """
+    providers = [summary for _, summary in map_providers(request, get_provider_summary)]
+    return HTTPOk(json={"providers": providers})
+
+
+def get_provider_client(service, container, headers=None):
+    # type: (Service, AnySettingsContainer, Optional[AnyHeadersContainer]) -> WebProcessingService
+    """
+    Obtains the WPS client of a provider with request cookies and the timeout of setting
+    ``weaver.provider_request_timeout``.
+
+    :param service: provider for which to obtain the client.
+    :param container: request or settings of the application.
+    :param headers: request headers with cookies to forward (default: headers of the request container).
+    """
+    settings = get_settings(container)
+    if headers is None and isinstance(container, Request):
+        headers = container.headers
+    timeout = float(settings.get("weaver.provider_request_timeout", 10))
+    return get_wps_client(service.url, settings, headers=get_cookie_headers(headers), timeout=timeout)
+
+
+def get_provider_summary(service, container, headers=None):
+    # type: (Service, AnySettingsContainer, Optional[AnyHeadersContainer]) -> JSON
+    """
+    Summary of a wps provider as listed by providers.
+    """
+    wps = get_provider_client(service, container, headers)
+    return dict(
+        id=service.name,
+        title=getattr(wps.identification, "title", ""),
+        abstract=getattr(wps.identification, "abstract", ""),
+        url="{base_url}/providers/{provider_id}".format(
+            base_url=get_wps_restapi_base_url(get_settings(container)),
+            provider_id=service.name),
+        public=service.public)
+
+
+def map_providers(request, function):
+    # type: (Request, Callable[[Service, SettingsType, HeadersType], Any]) -> List[Tuple[Service, Any]]
+    """
+    Applies the function concurrently to every registered wps provider.
+
+    Providers are queried by a pool of at most ``weaver.provider_request_workers`` threads. Providers that fail, or that
+    do not respond within ``weaver.provider_request_timeout`` seconds from the moment they started being queried, are
+    reported with a warning and omitted from the results, such that a single unresponsive provider does not prevent
+    listing the others. The function is called with the application settings and a copy of the request headers since
+    the request itself must not be shared across threads.
+
+    :returns: pairs of provider and function result, in the order of registered providers.
+    """
+    settings = get_settings(request)
+    timeout = float(settings.get("weaver.provider_request_timeout", 10))
+    workers = int(settings.get("weaver.provider_request_workers", 8))
     store = get_db(request).get_store(StoreServices)
-    providers = []
-
-    for service in store.list_services():
-        try:
-            if service.type.lower() != "wps":
-                continue
-
-            wps = WebProcessingService(url=service.url, headers=get_cookie_headers(request.headers))
-            providers.append(dict(
-                id=service.name,
-                title=getattr(wps.identification, "title", ""),
-                abstract=getattr(wps.identification, "abstract", ""),
-                url="{base_url}/providers/{provider_id}".format(
-                    base_url=get_wps_restapi_base_url(get_settings(request)),
-                    provider_id=service.name),
-                public=service.public))
-        except Exception as exc:
-            warnings.warn("Exception occurred while fetching wps {0} : {1!r}".format(service.url, exc),
-                          NonBreakingExceptionWarning)
+    services = [service for service in store.list_services() if service.type.lower() == "wps"]
+    if not services:
+        return []
 
-    return HTTPOk(json={"providers": providers})
+    headers = dict(request.headers)
+    started = {}  # type: Dict[int, float]
+
+    def apply(index, service):
+        # type: (int, Service) -> Any
+        started[index] = time.monotonic()
+        return function(service, settings, headers)
+
+    results = []
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(services))))
+    try:
+        futures = [(service, executor.submit(apply, i, service)) for i, service in enumerate(services)]
+        for index, (service, future) in enumerate(futures):
+            try:
+                while True:
+                    # providers queued behind others get their full timeout once they start being queried
+                    start = started.get(index)
+                    wait = timeout if start is None else start + timeout - time.monotonic()
+                    try:
+                        results.append((service, future.result(timeout=max(0.0, wait))))
+                        break
+                    except FutureTimeoutError:
+                        if start is not None:
+                            raise
+            except FutureTimeoutError:
+                future.cancel()
+                warnings.warn("Timeout occurred while fetching wps {0}".format(service.url),
+                              NonBreakingExceptionWarning)
+            except Exception as exc:
+                warnings.warn("Exception occurred while fetching wps {0} : {1!r}".format(service.url, exc),
+                              NonBreakingExceptionWarning)
+    finally:
+        # do not wait for timed out providers, their pending requests terminate by themselves with the client timeout
+        executor.shutdown(wait=False)
+    return results
 
 
 def get_capabilities(service, request):
     """
     GetCapabilities of a wps provider.
     """
-    wps = WebProcessingService(url=service.url, headers=get_cookie_headers(request.headers))
+    wps = get_provider_client(service, request)
     settings = get_settings(request)
     return dict(
         id=service.name,
@@ -2,6 +2,7 @@ import logging
 
 from pyramid.httpexceptions import HTTPNotFound, HTTPOk
 
+from weaver import sort
 from weaver.database import get_db
 from weaver.exceptions import BillNotFound, log_unhandled_exceptions
 from weaver.formats import OUTPUT_FORMAT_JSON
@@ -18,9 +19,26 @@ def get_bill_list(request):
     """
     Get list of bills IDs.
     """
+    page = int(request.params.get("page", "0"))
+    limit = int(request.params.get("limit", "10"))
+    filters = {
+        "quote_id": request.params.get("quote", None),
+        "page": page,
+        "limit": limit,
+        "sort": request.params.get("sort", sort.SORT_ID),
+        "cursor": request.params.get("cursor") or None,
+    }
     store = get_db(request).get_store(StoreBills)
-    bills = store.list_bills()
-    return HTTPOk(json={"bills": [b.id for b in bills]})
+    items, count = store.find_bills(**filters)
+    body = {
+        "count": count,
+        "page": page,
+        "limit": limit,
+        "bills": [bill.id for bill in items]
+    }
+    if items and len(items) == limit:
+        body["next"] = store.make_cursor(items[-1], filters["sort"])
+    return HTTPOk(json=body)
 
 
 @sd.bill_service.get(tags=[sd.TAG_BILL_QUOTE], renderer=OUTPUT_FORMAT_JSON,
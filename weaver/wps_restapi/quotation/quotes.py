@@ -116,15 +116,19 @@ def get_quote_list(request):
         "page": page,
         "limit": limit,
         "sort": request.params.get("sort", sort.SORT_CREATED),
+        "cursor": request.params.get("cursor") or None,
     }
     store = get_db(request).get_store(StoreQuotes)
     items, count = store.find_quotes(**filters)
-    return HTTPOk(json={
+    body = {
         "count": count,
         "page": page,
         "limit": limit,
         "quotes": [quote.id for quote in items]
-    })
+    }
+    if items and len(items) == limit:
+        body["next"] = store.make_cursor(items[-1], filters["sort"])
+    return HTTPOk(json=body)
 
 
 @sd.process_quote_service.get(tags=[sd.TAG_BILL_QUOTE, sd.TAG_PROCESSES], renderer=OUTPUT_FORMAT_JSON,
@@ -35,7 +35,7 @@ from weaver.execute import (
 )
 from weaver.formats import CONTENT_TYPE_APP_JSON, CONTENT_TYPE_APP_XML, CONTENT_TYPE_TEXT_HTML, CONTENT_TYPE_TEXT_PLAIN
 from weaver.owsexceptions import OWSMissingParameterValue
-from weaver.sort import JOB_SORT_VALUES, QUOTE_SORT_VALUES, SORT_CREATED, SORT_ID, SORT_PROCESS
+from weaver.sort import BILL_SORT_VALUES, JOB_SORT_VALUES, QUOTE_SORT_VALUES, SORT_CREATED, SORT_ID, SORT_PROCESS
 from weaver.status import JOB_STATUS_CATEGORIES, STATUS_ACCEPTED, STATUS_COMPLIANT_OGC
 from weaver.visibility import VISIBILITY_PUBLIC, VISIBILITY_VALUES
 from weaver.wps_restapi.colander_extras import (
@@ -608,6 +608,19 @@ class QuoteSortEnum(SchemaNode):
             **kwargs)
 
 
+class BillSortEnum(SchemaNode):
+    schema_type = String
+
+    def __init__(self, *args, **kwargs):    # noqa: E811
+        kwargs.pop("validator", None)  # ignore passed argument and enforce the validator
+        super(BillSortEnum, self).__init__(
+            self.schema_type(),
+            default=kwargs.get("default", SORT_ID),
+            example=kwargs.get("example", SORT_CREATED),
+            validator=OneOf(list(BILL_SORT_VALUES)),
+            **kwargs)
+
+
 class LaunchJobQuerystring(MappingSchema):
     tags = SchemaNode(String(), default=None, missing=drop,
                       description="Comma separated tags that can be used to filter jobs later")
@@ -750,16 +763,26 @@ class ProcessExceptionsEndpoint(ProcessPath, JobPath):
     header = AcceptHeader()
 
 
+class GetJobLogsQueries(MappingSchema):
+    since = SchemaNode(Integer(), missing=drop, default=0,
+                       description="Sequence number of the first log entry to retrieve.")
+    limit = SchemaNode(Integer(), missing=drop, default=None,
+                       description="Maximum number of log entries to retrieve (all remaining entries if omitted).")
+
+
 class FullLogsEndpoint(ProviderPath, ProcessPath, JobPath):
     header = AcceptHeader()
+    querystring = GetJobLogsQueries()
 
 
 class ShortLogsEndpoint(JobPath):
     header = AcceptHeader()
+    querystring = GetJobLogsQueries()
 
 
 class ProcessLogsEndpoint(ProcessPath, JobPath):
     header = AcceptHeader()
+    querystring = GetJobLogsQueries()
 
 
 ##################################################################
@@ -893,10 +916,17 @@ class CreatedQuotedJobStatusSchema(CreatedJobStatusSchema):
     bill = SchemaNode(String(), example="d88fda5c-52cc-440b-9309-f2cd20bcd6a2", description="ID of the created bill.")
 
 
+class PagingCursor(SchemaNode):
+    schema_type = String
+    description = "Cursor to provide as query parameter to retrieve the following items of the listing."
+    missing = drop
+
+
 class GetPagingJobsSchema(MappingSchema):
     jobs = JobCollection()
     limit = SchemaNode(Integer())
     page = SchemaNode(Integer())
+    next = PagingCursor()
 
 
 class GroupedJobsCategorySchema(MappingSchema):
@@ -1042,6 +1072,7 @@ class QuotationList(SequenceSchema):
 
 class QuotationListSchema(MappingSchema):
     quotations = QuotationList()
+    next = PagingCursor()
 
 
 class BillSchema(MappingSchema):
@@ -1061,6 +1092,7 @@ class BillList(SequenceSchema):
 
 class BillListSchema(MappingSchema):
     bills = BillList()
+    next = PagingCursor()
 
 
 class SupportedValues(MappingSchema):
@@ -1261,6 +1293,8 @@ class GetJobsQueries(MappingSchema):
                         default=False, example="process,service", missing=drop)
     page = SchemaNode(Integer(), missing=drop, default=0)
     limit = SchemaNode(Integer(), missing=drop, default=10)
+    cursor = SchemaNode(String(), missing=drop, description="Cursor of the listing position obtained from a previous "
+                                                            "listing with the same sorting, instead of page.")
     status = JobStatusEnum(missing=drop)
     process = SchemaNode(String(), missing=drop, default=None)
     provider = SchemaNode(String(), missing=drop, default=None)
@@ -1294,8 +1328,18 @@ class DeleteProcessJobEndpoint(ProcessPath):
     header = AcceptHeader()
 
 
+class GetBillsQueries(MappingSchema):
+    page = SchemaNode(Integer(), missing=drop, default=0)
+    limit = SchemaNode(Integer(), missing=drop, default=10)
+    cursor = SchemaNode(String(), missing=drop, description="Cursor of the listing position obtained from a previous "
+                                                            "listing with the same sorting, instead of page.")
+    quote = SchemaNode(String(), missing=drop, default=None)
+    sort = BillSortEnum(missing=drop)
+
+
 class BillsEndpoint(MappingSchema):
     header = AcceptHeader()
+    querystring = GetBillsQueries()
 
 
 class BillEndpoint(BillPath):
@@ -1313,6 +1357,8 @@ class ProcessQuoteEndpoint(ProcessPath, QuotePath):
 class GetQuotesQueries(MappingSchema):
     page = SchemaNode(Integer(), missing=drop, default=0)
     limit = SchemaNode(Integer(), missing=drop, default=10)
+    cursor = SchemaNode(String(), missing=drop, description="Cursor of the listing position obtained from a previous "
+                                                            "listing with the same sorting, instead of page.")
     process = SchemaNode(String(), missing=drop, default=None)
     sort = QuoteSortEnum(missing=drop)
 